@@ -0,0 +1,237 @@
+import threading
+import time
+from collections import deque
+
+from fmcw.metrics import REGISTRY
+
+
+class FrameRing:
+    """
+    고정 크기 프레임 링 버퍼 (생산자 1 : 소비자 N)
+    - 가장 오래된 프레임은 자동으로 밀려남
+    - 각 프레임에 단조 증가 seq 번호 부여
+    """
+    def __init__(self, capacity: int = 8):
+        self.capacity = capacity
+        self._frames = deque(maxlen=capacity)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def push(self, frame) -> int:
+        with self._lock:
+            self._seq += 1
+            self._frames.append((self._seq, frame))
+            return self._seq
+
+    def latest(self):
+        """(seq, frame) 반환. 아직 프레임이 없으면 (0, None)"""
+        with self._lock:
+            if not self._frames:
+                return 0, None
+            return self._frames[-1]
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+
+    @property
+    def seq(self) -> int:
+        return self._seq
+
+
+class AcquisitionWorker:
+    """
+    수신(sdr.rx) + DSP 전용 백그라운드 스레드
+    - 레이더 인스턴스(FMCWDetector / MotionDetector)를 소유하고
+      process_frame() 결과를 FrameRing 에 쌓는다.
+    - asyncio 핸들러는 링 버퍼만 읽으므로 이벤트 루프가 막히지 않는다.
+    - listener(seq, frame) 는 프레임당 1회 수신 스레드에서 호출된다.
+    - 캘리브레이션도 이 스레드에서 실행 (SDR 을 읽는 스레드는 항상 하나)
+      진행 상황은 event_listener(event) 로 전달되고, 그동안 링에는
+      마지막 프레임이 그대로 남아 있다.
+    """
+    PROGRESS_INTERVAL = 0.1   # 진행률 이벤트 최소 간격 (초)
+
+    def __init__(self, ring: FrameRing = None, idle_sleep: float = 0.005):
+        self.ring = ring if ring is not None else FrameRing()
+        self.idle_sleep = idle_sleep
+
+        self.radar = None
+        self.mode = None
+
+        self.listeners = []
+        self.event_listeners = []
+
+        # 캘리브레이션 요청 / 상태
+        self._calibrate_request = None
+        self.calibration = {"state": "idle", "mode": None, "progress": 0.0}
+        self._last_progress_emit = 0.0
+
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        self.m_empty = None
+        self.m_errors = None
+
+    # --------------------------------------------------
+    # 수명 관리
+    # --------------------------------------------------
+    def start(self, radar, mode: str, calibrate: bool = True):
+        """
+        레이더 소유권을 넘겨받고 수신 스레드 시작
+        calibrate=True 면 첫 프레임 전에 (캐시가 없으면) 배경 학습
+        """
+        self.stop()
+        with self._lock:
+            self.radar = radar
+            self.mode = mode
+            self._calibrate_request = False if calibrate else None
+        labels = {"mode": mode, "uri": getattr(radar, "SDR_IP", "")}
+        self.m_empty = REGISTRY.counter(
+            "radar_empty_frames_total", "결과 없이 끝난 수신 루프 (짧은 버퍼 / 오류 / 파이프라인 채우는 중)",
+            **labels)
+        self.m_errors = REGISTRY.counter(
+            "radar_errors_total", "처리 중 무시한 예외 수", stage="acquisition", **labels)
+        self._resync(radar)
+        self.ring.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name=f"acq-{mode}", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 3.0):
+        """수신 스레드 정지. 레이더 인스턴스는 그대로 반환"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        return self.radar
+
+    def release(self):
+        """스레드 정지 후 레이더 소유권 해제 (close 는 호출자가 담당)"""
+        radar = self.stop()
+        with self._lock:
+            self.radar = None
+            self.mode = None
+        return radar
+
+    def add_listener(self, callback):
+        self.listeners.append(callback)
+
+    def add_event_listener(self, callback):
+        self.event_listeners.append(callback)
+
+    def request_calibration(self, force: bool = True) -> bool:
+        """다음 루프에서 캘리브레이션 실행 (이미 진행 중이면 False)"""
+        with self._lock:
+            if self.radar is None or self.calibration["state"] == "running":
+                return False
+            self._calibrate_request = force
+        return True
+
+    @property
+    def calibrating(self) -> bool:
+        return self.calibration["state"] == "running"
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    # --------------------------------------------------
+    # 후처리 (프레임당 1회)
+    # --------------------------------------------------
+    def _annotate(self, result: dict, mode: str) -> dict:
+        result["current_mode"] = mode
+        result["timestamp"] = time.time()
+
+        # CW → probability 계산
+        if mode == "CW":
+            score = result.get("score", 0)
+            max_score = result.get("max_score", 20)
+            result["probability"] = min((score / max_score) * 100, 100)
+
+        # FMCW → ratio 변환
+        elif mode == "FMCW":
+            ratio = result.get("ratio", 0)
+            result["probability"] = min(ratio * 100, 100)
+
+        return result
+
+    # --------------------------------------------------
+    # 캘리브레이션 (수신 스레드)
+    # --------------------------------------------------
+    def _emit(self, event: dict):
+        for callback in self.event_listeners:
+            try:
+                callback(event)
+            except Exception:
+                pass
+
+    def _set_calibration(self, **fields):
+        self.calibration = dict(self.calibration, **fields)
+        self._emit(dict(self.calibration, type="calibration"))
+
+    def _progress(self, done: int, total: int):
+        now = time.monotonic()
+        if done < total and now - self._last_progress_emit < self.PROGRESS_INTERVAL:
+            return
+        self._last_progress_emit = now
+        self._set_calibration(progress=done / total)
+
+    def _calibrate(self, radar, mode: str, force: bool):
+        self._set_calibration(state="running", mode=mode, progress=0.0,
+                              started=time.time(), finished=None)
+        try:
+            ok = radar.calibrate(force=force, progress=self._progress)
+        except Exception as e:
+            print(f"❌ [{mode}] 캘리브레이션 오류: {e}")
+            ok = False
+        self._set_calibration(state="done" if ok is not False else "failed",
+                              progress=1.0, finished=time.time())
+        self._resync(radar)
+
+    @staticmethod
+    def _resync(radar):
+        """수신이 끊겼던 구간(캘리브레이션 / 재시작)을 버퍼 누락으로 세지 않도록 rx 기준 시각 재설정"""
+        clock = getattr(radar, "rx_clock", None)
+        if clock is not None:
+            clock.reset()
+
+    # --------------------------------------------------
+    # 메인 루프
+    # --------------------------------------------------
+    def _run(self):
+        while not self._stop.is_set():
+            with self._lock:
+                radar = self.radar
+                mode = self.mode
+                force = self._calibrate_request
+                self._calibrate_request = None
+
+            if radar is None:
+                time.sleep(0.1)
+                continue
+
+            if force is not None:
+                self._calibrate(radar, mode, force)
+                continue
+
+            try:
+                result = radar.process_frame()
+            except Exception:
+                self.m_errors.inc()
+                result = None
+
+            if result:
+                frame = self._annotate(result, mode)
+                seq = self.ring.push(frame)
+                for callback in self.listeners:
+                    try:
+                        callback(seq, frame)
+                    except Exception:
+                        pass
+            else:
+                self.m_empty.inc()
+                time.sleep(self.idle_sleep)
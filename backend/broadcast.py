@@ -0,0 +1,257 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import wire_format
+from fmcw.metrics import REGISTRY
+from fmcw.trace import TRACER
+
+
+class Subscription:
+    """
+    클라이언트 1개당 1칸짜리 우편함 (latest-value-wins)
+    - 아직 보내지 못한 프레임이 있는데 새 프레임이 오면 덮어쓰고 dropped 증가
+    - 느린 클라이언트가 있어도 메모리는 늘어나지 않는다
+    - 이벤트(캘리브레이션 진행률 등)는 덮어쓰지 않고 작은 큐로 프레임보다 먼저 전달
+    - rate(Hz) 를 주면 마감 시각(deadline) 기준으로 그 이하로만 내보냄
+      기다리는 동안 온 프레임은 최신 것만 남기고 건너뜀 (skipped) → 지연이 쌓이지 않는다
+    """
+    EVENT_QUEUE = 16
+
+    def __init__(self, fmt: str = wire_format.FORMAT_JSON, rate: float = None,
+                 products: frozenset = wire_format.ALL_PRODUCTS):
+        self.fmt = fmt
+        self.products = products
+        self.key = (fmt, products)      # 같은 key 의 구독자는 직렬화 결과를 공유
+        self.period = 1.0 / rate if rate else 0.0
+        self._slot = None
+        self._events = deque(maxlen=self.EVENT_QUEUE)
+        self._event = asyncio.Event()
+        self._deadline = 0.0
+        self._throttled = False
+        self.delivered = 0
+        self.dropped = 0
+        self.skipped = 0
+
+    def offer(self, seq: int, payload) -> bool:
+        """
+        이벤트 루프 스레드에서만 호출. 보내지 못한 프레임을 덮어썼으면 True
+        (rate 때문에 기다리는 중 덮어쓴 것은 의도한 건너뜀이라 skipped 로만 셈)
+        """
+        dropped = self._slot is not None
+        if dropped and self._throttled:
+            self.skipped += 1
+            dropped = False
+        elif dropped:
+            self.dropped += 1
+        self._slot = (seq, payload)
+        self._event.set()
+        return dropped
+
+    def offer_event(self, payload):
+        # 이벤트 루프 스레드에서만 호출
+        self._events.append(payload)
+        self._event.set()
+
+    async def get(self):
+        """다음 (seq, payload) 가 올 때까지 대기 (이벤트는 seq=-1, rate 제한 없음)"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._event.wait()
+            if self._events:
+                payload = self._events.popleft()
+                if not self._events and self._slot is None:
+                    self._event.clear()
+                return -1, payload
+
+            now = loop.time()
+            if self.period and now < self._deadline:
+                # 마감 전: 잠들었다가 그때 가장 최신 프레임을 보냄
+                self._throttled = True
+                try:
+                    await asyncio.sleep(self._deadline - now)
+                finally:
+                    self._throttled = False
+                continue
+
+            self._event.clear()
+            item = self._slot
+            self._slot = None
+            if item is None:
+                continue
+            if self.period:
+                # 마감 주기를 유지하되, 한 주기 넘게 밀렸으면 지금부터 다시 셈 (몰아서 보내지 않음)
+                deadline = self._deadline + self.period
+                self._deadline = deadline if deadline > now else now + self.period
+            self.delivered += 1
+            return item
+
+
+class BroadcastHub:
+    """
+    단일 생산자 → 다중 구독자 팬아웃
+    - 수신 스레드가 publish() 로 프레임을 넘기면 직렬화는 프레임당
+      "구독 중인 포맷별로" 1회만 수행 (JSON / f32 / u8)
+    - 구독자 전달은 이벤트 루프 스레드에서 처리 (call_soon_threadsafe)
+    - 구독자들이 원하는 product 합집합(demand)이 바뀌면 on_demand(demand) 호출
+      → 레이더는 아무도 원하지 않는 비싼 product 를 계산하지 않는다
+    """
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._subs = set()
+        self._key_counts = {}           # (format, products) → 구독자 수
+        self.base_demand = wire_format.SCALARS   # 구독자와 무관하게 항상 필요한 것 (waterfall 등)
+        self.demand = self.base_demand
+        self.on_demand = None
+        self._loop = None
+        self._lock = threading.Lock()
+        self._pending = None
+        self._scheduled = False
+        self._last = None
+        self._last_frame = None
+
+        # 지표 (/metrics)
+        self._serialize_hist = {}
+        self.m_published = REGISTRY.counter(
+            "radar_published_frames_total", "구독자에게 발행한 프레임 수", device=name)
+        self.m_dropped = REGISTRY.counter(
+            "radar_client_dropped_frames_total",
+            "느린 클라이언트에게 보내기 전에 새 프레임으로 덮어쓴 수", device=name)
+
+    def bind_loop(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+
+    # --------------------------------------------------
+    # 구독 관리 (이벤트 루프 스레드)
+    # --------------------------------------------------
+    def subscribe(self, fmt: str = wire_format.FORMAT_JSON, rate: float = None,
+                  products: frozenset = wire_format.ALL_PRODUCTS) -> Subscription:
+        sub = Subscription(fmt, rate, products)
+        self._subs.add(sub)
+        self._key_counts[sub.key] = self._key_counts.get(sub.key, 0) + 1
+        self._update_demand()
+
+        # 접속 직후 화면이 비지 않도록 마지막 프레임 바로 전달
+        last_frame = self._last_frame
+        if last_frame is not None:
+            seq, frame = last_frame
+            if self._last is None or self._last[0] != seq:
+                self._last = (seq, {})
+            payloads = self._last[1]
+            if sub.key not in payloads:
+                payloads[sub.key] = self.serialize(frame, seq, fmt, products)
+            sub.offer(seq, payloads[sub.key])
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        if sub not in self._subs:
+            return
+        self._subs.discard(sub)
+        count = self._key_counts.get(sub.key, 0) - 1
+        if count > 0:
+            self._key_counts[sub.key] = count
+        else:
+            self._key_counts.pop(sub.key, None)
+        self._update_demand()
+
+    def require(self, *products):
+        """구독자와 무관하게 항상 계산할 product 추가 (서버 안의 소비자용, 예: waterfall)"""
+        self.base_demand = self.base_demand | frozenset(products)
+        self._update_demand()
+
+    def _update_demand(self):
+        demand = frozenset(self.base_demand).union(*(products for _, products in self._key_counts))
+        if demand == self.demand:
+            return
+        self.demand = demand
+        if self.on_demand is not None:
+            self.on_demand(demand)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subs)
+
+    # --------------------------------------------------
+    # 발행 (수신 스레드)
+    # --------------------------------------------------
+    def serialize(self, frame: dict, seq: int, fmt: str,
+                  products: frozenset = wire_format.ALL_PRODUCTS):
+        return wire_format.encode(wire_format.select(frame, products), seq, fmt)
+
+    def publish(self, seq: int, frame: dict):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+
+        self._last_frame = (seq, frame)
+        # 구독자가 없으면 직렬화 비용도 들이지 않는다
+        if not self._subs:
+            return
+
+        payloads = {}
+        for key in list(self._key_counts):
+            fmt, products = key
+            t0 = time.perf_counter()
+            payloads[key] = self.serialize(frame, seq, fmt, products)
+            t1 = time.perf_counter()
+            self._serialize_timer(fmt).observe(t1 - t0)
+            if TRACER.enabled:
+                TRACER.record("serialize", t0, t1, format=fmt, seq=seq)
+        self.m_published.inc()
+
+        # 루프가 밀려 있으면 최신 프레임만 남기고 콜백은 한 번만 예약
+        with self._lock:
+            self._pending = (seq, payloads)
+            if self._scheduled:
+                return
+            self._scheduled = True
+
+        try:
+            loop.call_soon_threadsafe(self._deliver)
+        except RuntimeError:
+            # 종료 중인 루프
+            with self._lock:
+                self._scheduled = False
+
+    def _serialize_timer(self, fmt: str):
+        hist = self._serialize_hist.get(fmt)
+        if hist is None:
+            hist = self._serialize_hist[fmt] = REGISTRY.histogram(
+                "radar_serialize_seconds", "프레임 직렬화 시간 (포맷별, 초)",
+                device=self.name, format=fmt)
+        return hist
+
+    def publish_event(self, event: dict):
+        """
+        프레임이 아닌 상태 이벤트 → 모든 구독자에게 JSON 텍스트로 전달
+        (바이너리 포맷 클라이언트도 텍스트 메시지로 구분 가능)
+        """
+        loop = self._loop
+        if loop is None or loop.is_closed() or not self._subs:
+            return
+        payload = wire_format.encode_json(event)
+        try:
+            loop.call_soon_threadsafe(self._deliver_event, payload)
+        except RuntimeError:
+            pass
+
+    def _deliver_event(self, payload):
+        for sub in list(self._subs):
+            sub.offer_event(payload)
+
+    def _deliver(self):
+        with self._lock:
+            item = self._pending
+            self._pending = None
+            self._scheduled = False
+
+        if item is None:
+            return
+
+        self._last = item
+        seq, payloads = item
+        for sub in list(self._subs):
+            payload = payloads.get(sub.key)
+            if payload is not None and sub.offer(seq, payload):
+                self.m_dropped.inc()
@@ -0,0 +1,517 @@
+"""
+다중 Pluto 장치 관리
+
+장치(URI)마다 RadarController 하나가 레이더 / 모드 / 수신 스레드를 소유한다.
+기본적으로 장치마다 별도 프로세스에서 실행해 DSP 가 GIL 을 나눠 쓰지 않도록 한다
+(장치 수만큼 코어를 사용). 부모 프로세스(FastAPI)는 결과 프레임을 받아
+장치별 BroadcastHub 로 팬아웃만 한다.
+
+    registry = DeviceRegistry.from_env()      # RADAR_DEVICES="left=ip:192.168.2.1;right=ip:192.168.3.1"
+    await registry.start(loop, mode="CW")
+    device = registry.get("left")
+    await device.set_mode("FMCW")
+    sub = device.hub.subscribe(fmt)
+
+RADAR_DEVICES 가 없으면 PLUTO_URI 하나로 "radar0" 장치를 만든다.
+RADAR_PROCESSES=0 이면 모든 장치를 현재 프로세스의 스레드로 실행 (디버깅용).
+FMCW_DSP_PROCESS=1 이면 FMCW DSP 를 장치마다 추가 프로세스로 분리 (dsp_offload.py).
+"""
+import asyncio
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+scripts_dir = os.path.join(current_dir, "scripts")
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+if scripts_dir not in sys.path:
+    sys.path.append(scripts_dir)
+
+from acquisition import AcquisitionWorker, FrameRing
+from broadcast import BroadcastHub
+from dsp_offload import DSP_OFFLOAD, OffloadedFMCW, close_worker, worker_metrics
+from fmcw.metrics import REGISTRY
+from fmcw.trace import TRACER
+from fmcw.sdr_session import get_session
+
+try:
+    from cw_logic import MotionDetector as CWRadar
+    from fmcw_logic import FMCWDetector as FMCWRadar
+except ImportError as e:
+    print(f"⚠️ 모듈 로드 실패: {e}")
+    CWRadar = None
+    FMCWRadar = None
+
+RADAR_CLASSES = {"CW": CWRadar, "FMCW": FMCWRadar}
+
+# 자식 → 부모 프레임 큐 크기 (부모가 밀리면 오래된 프레임은 자식에서 버림)
+FRAME_QUEUE = 4
+
+
+# ------------------------------------------------------
+# 장치 1개 제어 (자식 프로세스 안 또는 같은 프로세스)
+# ------------------------------------------------------
+class RadarController:
+    """
+    세션 1개 + 레이더 1개 + 수신 스레드 1개
+    모든 메서드는 블로킹 (서버에서는 스레드 / 자식 프로세스에서 호출)
+    """
+    def __init__(self, uri: str, products=None):
+        self.uri = uri
+        self.session = get_session(uri)
+        self.worker = AcquisitionWorker(FrameRing(capacity=8))
+        self.radar = None
+        self.mode = None
+        # 계산할 product (None 이면 전부) — 서버 구독자들의 합집합
+        self.products = None if products is None else frozenset(products)
+
+    def set_mode(self, mode: str) -> dict:
+        mode = mode.upper()
+        if mode == self.mode and self.radar is not None:
+            return {"status": "Already in this mode", "current_mode": mode}
+
+        radar_class = RADAR_CLASSES.get(mode)
+        if radar_class is None:
+            return {"status": "Error", "message": "Module Not Found"}
+
+        # 수신 스레드 정지 후 기존 레이더 분리 (연결은 세션이 유지)
+        self.worker.release()
+        if self.radar:
+            try:
+                self.radar.close()
+            except Exception:
+                pass
+            self.radar = None
+            self.mode = None
+
+        radar = radar_class(self.uri, session=self.session)
+        if mode == "FMCW" and DSP_OFFLOAD:
+            # FFT / CFAR 는 DSP 프로세스에서 (프레임은 공유 메모리로 전달)
+            radar = OffloadedFMCW(radar)
+        radar.products = self.products
+        if not radar.connect():
+            return {"status": "Connection Failed"}
+        self.radar = radar
+        self.mode = mode
+
+        # 캘리브레이션은 수신 스레드에서 백그라운드로
+        self.worker.start(radar, mode, calibrate=True)
+        return {"status": "Mode Changed", "current_mode": mode}
+
+    def recalibrate(self) -> dict:
+        if self.radar is None:
+            return {"status": "Error", "message": "Radar not ready"}
+        if not self.worker.request_calibration(force=True):
+            return {"status": "Busy", "calibration": self.worker.calibration}
+        return {"status": "Calibrating", "mode": self.mode}
+
+    def status(self) -> dict:
+        return {
+            "uri": self.uri,
+            "mode": self.mode,
+            "running": self.worker.running,
+            "calibration": self.worker.calibration,
+        }
+
+    def set_products(self, products) -> dict:
+        """구독자가 원하는 product 가 바뀜 → 다음 프레임부터 그것만 계산"""
+        self.products = None if products is None else frozenset(products)
+        radar = self.radar
+        if radar is not None:
+            radar.products = self.products
+        return {"products": None if products is None else sorted(self.products)}
+
+    def metrics(self) -> list:
+        """이 프로세스 + DSP 프로세스들의 지표 snapshot"""
+        return [REGISTRY.snapshot()] + worker_metrics()
+
+    def trace(self, seconds: float = None) -> list:
+        """이 프로세스 (+ DSP 프로세스에서 넘어온) span → Chrome trace 이벤트 목록"""
+        return TRACER.export(seconds)["traceEvents"]
+
+    def set_tracing(self, enabled: bool) -> dict:
+        TRACER.enabled = bool(enabled)
+        if enabled:
+            TRACER.clear()
+        return {"tracing": TRACER.enabled}
+
+    def close(self):
+        self.worker.release()
+        if self.radar:
+            try:
+                self.radar.close()
+            except Exception:
+                pass
+            self.radar = None
+        close_worker(self.uri)
+        self.session.close()
+
+
+def _device_main(uri: str, mode: str, conn, frames, products=None):
+    """자식 프로세스 진입점: 프레임 / 이벤트는 frames 큐로, 명령은 conn 으로"""
+    TRACER.process_name = f"device:{uri}"
+    controller = RadarController(uri, products)
+    dropped = REGISTRY.counter(
+        "radar_device_queue_dropped_total", "서버 프로세스가 밀려 장치 프로세스에서 버린 프레임 수",
+        uri=uri)
+
+    def send_frame(seq, frame):
+        item = ("frame", seq, frame)
+        try:
+            frames.put_nowait(item)
+            return
+        except queue.Full:
+            pass
+        # 큐가 가득 참 → 가장 오래된 항목을 버리고 최신 프레임을 넣음
+        try:
+            oldest = frames.get_nowait()
+        except queue.Empty:
+            oldest = None
+        if oldest is not None:
+            dropped.inc()
+            if oldest[0] != "frame":
+                # 이벤트는 버리지 않음 (빈 자리에 다시 넣고 이번 프레임을 버림)
+                item = oldest
+        try:
+            frames.put_nowait(item)
+        except queue.Full:
+            if oldest is None:
+                dropped.inc()
+
+    def send_event(event):
+        try:
+            frames.put(("event", event), timeout=0.5)
+        except queue.Full:
+            pass
+
+    controller.worker.add_listener(send_frame)
+    controller.worker.add_event_listener(send_event)
+
+    conn.send(controller.set_mode(mode) if mode else {"status": "Idle"})
+    try:
+        while True:
+            try:
+                cmd, args = conn.recv()
+            except (EOFError, OSError):
+                break
+            if cmd == "stop":
+                break
+            try:
+                reply = getattr(controller, cmd)(*args)
+                if cmd == "status":
+                    reply["dropped"] = dropped.value
+            except Exception as e:
+                reply = {"status": "Error", "message": str(e)}
+            conn.send(reply)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        controller.close()
+        frames.cancel_join_thread()
+
+
+# ------------------------------------------------------
+# 부모 프로세스 쪽 장치 핸들
+# ------------------------------------------------------
+class RadarDevice:
+    """
+    장치 1개의 서버 쪽 상태: BroadcastHub, 프레임 listener, 모드 변경 락
+    use_process=True 면 RadarController 를 자식 프로세스에서 실행
+    hub 의 product 수요가 바뀌면 컨트롤러로 전달 (아무도 원하지 않는 것은 계산 안 함)
+    """
+    def __init__(self, name: str, uri: str, use_process: bool = True):
+        self.name = name
+        self.uri = uri
+        self.use_process = use_process
+
+        self.hub = BroadcastHub(name)
+        self.hub.on_demand = self._on_demand
+        self.listeners = [self.hub.publish]
+        self.event_listeners = [self.hub.publish_event]
+        self.mode_lock = asyncio.Lock()
+
+        self.mode = None
+        self.calibration = {"state": "idle", "mode": None, "progress": 0.0}
+        self.frames = 0
+
+        self._controller = None
+        self._process = None
+        self._conn = None
+        self._queue = None
+        self._pump_thread = None
+        self._stop = threading.Event()
+        self._call_lock = threading.Lock()
+        self._products_lock = threading.Lock()
+
+    def add_listener(self, callback):
+        """callback(seq, frame) — 프레임당 1회 (부모 프로세스의 수신 스레드)"""
+        self.listeners.append(callback)
+
+    def add_event_listener(self, callback):
+        self.event_listeners.append(callback)
+
+    # --------------------------------------------------
+    # 수명 관리 (블로킹)
+    # --------------------------------------------------
+    def start(self, mode: str = None) -> dict:
+        self._stop.clear()
+        if not self.use_process:
+            self._controller = RadarController(self.uri, self.hub.demand)
+            self._controller.worker.add_listener(self._on_frame)
+            self._controller.worker.add_event_listener(self._on_event)
+            reply = self._controller.set_mode(mode) if mode else {"status": "Idle"}
+        else:
+            # fork 는 부모의 스레드 / 이벤트 루프 상태를 복제하므로 spawn 사용
+            ctx = multiprocessing.get_context("spawn")
+            self._conn, child_conn = ctx.Pipe()
+            self._queue = ctx.Queue(maxsize=FRAME_QUEUE)
+            self._process = ctx.Process(
+                target=_device_main,
+                args=(self.uri, mode, child_conn, self._queue, self.hub.demand),
+                name=f"radar-{self.name}",
+                # daemon 프로세스는 자식(DSP 프로세스)을 만들 수 없음
+                # 부모가 비정상 종료되면 파이프가 닫혀 자식도 스스로 종료한다
+                daemon=False,
+            )
+            self._process.start()
+            child_conn.close()
+            self._pump_thread = threading.Thread(
+                target=self._pump, name=f"pump-{self.name}", daemon=True
+            )
+            self._pump_thread.start()
+            reply = self._conn.recv()
+        self._update_mode(reply)
+        return reply
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        if self._controller is not None:
+            self._controller.close()
+            self._controller = None
+        if self._process is not None:
+            try:
+                with self._call_lock:
+                    self._conn.send(("stop", ()))
+            except (OSError, BrokenPipeError):
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process = None
+        if self._pump_thread is not None:
+            self._pump_thread.join(timeout=1.0)
+            self._pump_thread = None
+        self.mode = None
+
+    @property
+    def alive(self) -> bool:
+        if self.use_process:
+            return self._process is not None and self._process.is_alive()
+        return self._controller is not None
+
+    # --------------------------------------------------
+    # 명령
+    # --------------------------------------------------
+    def call(self, cmd: str, *args) -> dict:
+        """RadarController 메서드 호출 (자식 프로세스면 파이프로 전달, 블로킹)"""
+        if self._controller is not None:
+            return getattr(self._controller, cmd)(*args)
+        if not self.alive:
+            return {"status": "Error", "message": f"Device {self.name} not running"}
+        with self._call_lock:
+            self._conn.send((cmd, args))
+            return self._conn.recv()
+
+    async def set_mode(self, mode: str) -> dict:
+        async with self.mode_lock:
+            reply = await asyncio.to_thread(self.call, "set_mode", mode)
+        self._update_mode(reply)
+        return reply
+
+    async def recalibrate(self) -> dict:
+        return await asyncio.to_thread(self.call, "recalibrate")
+
+    def status(self) -> dict:
+        return {
+            "device": self.name,
+            "uri": self.uri,
+            "mode": self.mode,
+            "alive": self.alive,
+            "process": self._process.pid if self._process is not None else None,
+            "frames": self.frames,
+            "clients": self.hub.subscriber_count,
+            "calibration": self.calibration,
+        }
+
+    def _on_demand(self, demand):
+        """hub 콜백 (이벤트 루프 스레드) → 파이프 전송은 스레드에서"""
+        if not self.alive:
+            return      # 시작할 때 그 시점의 수요를 넘겨줌
+        asyncio.get_running_loop().run_in_executor(None, self._push_products)
+
+    def _push_products(self):
+        # 여러 번 바뀌어도 마지막으로 보내는 값이 항상 최신 수요가 되도록 락 안에서 읽음
+        with self._products_lock:
+            if self.alive:
+                self.call("set_products", sorted(self.hub.demand))
+
+    def _update_mode(self, reply: dict):
+        if reply.get("status") in ("Mode Changed", "Already in this mode"):
+            self.mode = reply.get("current_mode", self.mode)
+        elif reply.get("status") == "Connection Failed":
+            self.mode = None
+
+    # --------------------------------------------------
+    # 프레임 / 이벤트 수신
+    # --------------------------------------------------
+    def _on_frame(self, seq, frame):
+        frame["device"] = self.name
+        self.frames += 1
+        for callback in self.listeners:
+            try:
+                callback(seq, frame)
+            except Exception:
+                pass
+
+    def _on_event(self, event):
+        event["device"] = self.name
+        if event.get("type") == "calibration":
+            self.calibration = {k: v for k, v in event.items() if k not in ("type", "device")}
+        for callback in self.event_listeners:
+            try:
+                callback(event)
+            except Exception:
+                pass
+
+    def _pump(self):
+        """자식 프로세스 → 부모: 프레임 큐를 비우며 listener 호출"""
+        while not self._stop.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                if self._process is not None and not self._process.is_alive():
+                    print(f"❌ [{self.name}] 장치 프로세스 종료됨 (exit={self._process.exitcode})")
+                    self.mode = None
+                    return
+                continue
+            except (EOFError, OSError):
+                return
+            if item[0] == "frame":
+                self._on_frame(item[1], item[2])
+            elif item[0] == "event":
+                self._on_event(item[1])
+
+
+# ------------------------------------------------------
+# 장치 목록
+# ------------------------------------------------------
+def parse_devices(spec: str) -> dict:
+    """
+    "left=ip:192.168.2.1;right=ip:192.168.3.1" → {"left": uri, "right": uri}
+    이름을 생략하면 radar0, radar1 ... (URI 안의 쉼표는 sim 옵션이므로 구분자는 ";")
+    """
+    devices = {}
+    for i, token in enumerate(filter(None, (t.strip() for t in spec.split(";")))):
+        eq, colon = token.find("="), token.find(":")
+        if eq > 0 and (colon < 0 or eq < colon):
+            name, uri = token[:eq].strip(), token[eq + 1:].strip()
+        else:
+            name, uri = f"radar{i}", token
+        devices[name] = uri
+    return devices
+
+
+class DeviceRegistry:
+    def __init__(self, devices: dict, use_process: bool = True):
+        self.devices = {
+            name: RadarDevice(name, uri, use_process) for name, uri in devices.items()
+        }
+
+    @classmethod
+    def from_env(cls) -> "DeviceRegistry":
+        spec = os.environ.get("RADAR_DEVICES")
+        if not spec:
+            spec = "radar0=" + os.environ.get("PLUTO_URI", "ip:192.168.2.1")
+        use_process = os.environ.get("RADAR_PROCESSES", "1") != "0"
+        return cls(parse_devices(spec), use_process)
+
+    @property
+    def default(self) -> RadarDevice:
+        return next(iter(self.devices.values()))
+
+    def get(self, key: str):
+        """이름 또는 URI 로 찾기 (없으면 None)"""
+        device = self.devices.get(key)
+        if device is None:
+            device = next((d for d in self.devices.values() if d.uri == key), None)
+        return device
+
+    def __iter__(self):
+        return iter(self.devices.values())
+
+    def __len__(self):
+        return len(self.devices)
+
+    async def start(self, loop, mode: str = "CW"):
+        """모든 장치를 동시에 시작 (프로세스 기동 / 연결은 스레드에서)"""
+        for device in self:
+            device.hub.bind_loop(loop)
+        t0 = time.perf_counter()
+        replies = await asyncio.gather(
+            *(asyncio.to_thread(device.start, mode) for device in self)
+        )
+        for device, reply in zip(self, replies):
+            ok = "✔" if reply.get("status") == "Mode Changed" else "❌"
+            print(f"{ok} [{device.name}] {device.uri} → {reply.get('status')}")
+        print(f">>> 장치 {len(self)}개 시작 ({time.perf_counter() - t0:.1f}s)")
+
+    def metrics_snapshots(self) -> list:
+        """
+        /metrics 용 지표 snapshot 목록 (블로킹)
+        - 이 프로세스 (직렬화 / 전송, RADAR_PROCESSES=0 이면 레이더 전체)
+        - 장치 프로세스마다 1개 이상 (장치 + 그 장치의 DSP 프로세스)
+        """
+        snapshots = [REGISTRY.snapshot()]
+        in_process = False
+        for device in self:
+            if not device.use_process:
+                in_process = True
+            elif device.alive:
+                try:
+                    snapshots += device.call("metrics")
+                except (EOFError, OSError):
+                    pass
+        if in_process:
+            snapshots += worker_metrics()
+        return snapshots
+
+    def _process_calls(self, cmd: str, *args) -> list:
+        """장치 프로세스마다 cmd 호출 결과 목록 (죽은 프로세스는 건너뜀, 블로킹)"""
+        replies = []
+        for device in self:
+            if device.use_process and device.alive:
+                try:
+                    replies.append(device.call(cmd, *args))
+                except (EOFError, OSError):
+                    pass
+        return replies
+
+    def set_tracing(self, enabled: bool) -> dict:
+        """이 프로세스와 모든 장치 프로세스의 tracer 켜기 / 끄기 (켤 때 링 비움)"""
+        TRACER.enabled = bool(enabled)
+        if enabled:
+            TRACER.clear()
+        self._process_calls("set_tracing", enabled)
+        return {"tracing": TRACER.enabled}
+
+    def trace(self, seconds: float = None) -> dict:
+        """최근 seconds 초 span → Chrome / Perfetto trace JSON (모든 프로세스 합침)"""
+        return TRACER.export(seconds, extra=self._process_calls("trace", seconds))
+
+    def stop(self):
+        for device in self:
+            device.stop()
@@ -0,0 +1,353 @@
+"""
+FMCW DSP 를 별도 프로세스에서 실행 (선택 사항, FMCW_DSP_PROCESS=1)
+
+수신 스레드는 sdr.rx() 버퍼를 공유 메모리 슬롯에 복사하고 슬롯 번호만 보낸다.
+DSP 프로세스는 같은 슬롯을 그대로 읽어 FMCWDetector.process_buffer() 를 실행하고
+작은 결과 dict (signal / detections / rd_map 등)만 돌려준다.
+→ 128x1024 프레임은 pickle 되지 않고, FFT / CFAR 가 수신 스레드·이벤트 루프와 GIL 을 다투지 않는다.
+
+수신과 DSP 는 PIPELINE_DEPTH 프레임만큼 겹쳐서 진행 (결과는 1 프레임 늦게 나온다).
+
+    radar = OffloadedFMCW(FMCWDetector(uri, session=session))
+    radar.connect(); radar.calibrate()
+    result = radar.process_frame()
+"""
+import atexit
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+scripts_dir = os.path.join(current_dir, "scripts")
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+if scripts_dir not in sys.path:
+    sys.path.append(scripts_dir)
+
+from fmcw.metrics import REGISTRY
+from fmcw.trace import TRACER
+from fmcw_logic import FMCWDetector
+
+DSP_OFFLOAD = os.environ.get("FMCW_DSP_PROCESS", "0") == "1"
+
+# DSP 프로세스가 결과에 지표 snapshot 을 붙여 보내는 간격 (초)
+METRICS_INTERVAL = 1.0
+
+
+# ------------------------------------------------------
+# 공유 메모리 슬롯
+# ------------------------------------------------------
+class SharedSlots:
+    """[slots, samples] complex64 공유 메모리 배열 (name 을 주면 기존 블록에 연결)"""
+    def __init__(self, slots: int, samples: int, name: str = None):
+        self.slots = slots
+        self.samples = samples
+        size = slots * samples * np.dtype(np.complex64).itemsize
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # spawn 자식은 부모의 resource tracker 를 공유 → 해제(unlink)는 만든 쪽만
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray((slots, samples), dtype=np.complex64, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def close(self, unlink: bool = False):
+        self.array = None
+        self.shm.close()
+        if unlink:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _dsp_main(ip: str, shm_name: str, slots: int, samples: int, conn):
+    """DSP 프로세스: ("frame", slot, tracing, products) → ("result", slot, dict, metrics, trace)"""
+    ring = SharedSlots(slots, samples, name=shm_name)
+    detector = FMCWDetector(ip)     # SDR 은 열지 않음 (process_buffer 만 사용)
+    last_metrics = 0.0
+    TRACER.process_name = f"dsp:{ip}"
+    trace_cursor = 0
+    try:
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                break
+            kind = msg[0]
+            if kind == "frame":
+                slot = msg[1]
+                TRACER.enabled = msg[2]
+                detector.products = msg[3]
+                result = detector.process_buffer(ring.array[slot])
+                # 단계별 지표는 가끔씩만 결과에 실어 보냄 (/metrics 에서 합산)
+                metrics = None
+                now = time.monotonic()
+                if now - last_metrics >= METRICS_INTERVAL:
+                    metrics = REGISTRY.snapshot()
+                    last_metrics = now
+                # span 은 켜져 있을 때만 프레임마다 새로 생긴 것을 실어 보냄 (부모 tracer 에 합침)
+                trace = None
+                if TRACER.enabled:
+                    trace = TRACER.drain(trace_cursor)
+                    trace_cursor = trace[1]
+                conn.send(("result", slot, result, metrics, trace))
+            elif kind == "clutter":
+                detector.clutter_map = msg[1]
+                conn.send(("ok",))
+            elif kind == "background":
+                detector.background = msg[1]
+                conn.send(("ok",))
+            elif kind == "get_clutter":
+                conn.send(("clutter", detector.clutter_map))
+            elif kind == "reset":
+                detector = FMCWDetector(ip)
+                conn.send(("ok",))
+            elif kind == "stop":
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        ring.close()
+
+
+# ------------------------------------------------------
+# DSP 프로세스 (URI 별 1개, 모드 전환 사이에도 유지)
+# ------------------------------------------------------
+class DSPWorker:
+    def __init__(self, ip: str, samples: int, slots: int = 4):
+        self.ip = ip
+        self.ring = SharedSlots(slots, samples)
+        self._free = list(range(slots))
+        self._pending = 0
+        self.metrics = None         # DSP 프로세스의 마지막 지표 snapshot
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_dsp_main,
+            args=(ip, self.ring.name, slots, samples, child_conn),
+            name=f"dsp-{ip}",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def submit(self, rx, products=None) -> bool:
+        """rx 를 빈 슬롯에 복사하고 처리 요청 (빈 슬롯이 없으면 False)"""
+        if not self._free:
+            return False
+        slot = self._free.pop()
+        self.ring.array[slot] = rx[:self.ring.samples]
+        self._conn.send(("frame", slot, TRACER.enabled, products))
+        self._pending += 1
+        return True
+
+    def collect(self, block: bool = True):
+        """가장 먼저 요청한 프레임의 결과 (없으면 None, block=False 면 기다리지 않음)"""
+        if self._pending == 0 or (not block and not self._conn.poll(0)):
+            return None
+        _, slot, result, metrics, trace = self._conn.recv()
+        if metrics is not None:
+            self.metrics = metrics
+        if trace is not None:
+            spans, _, threads, processes = trace
+            TRACER.extend(spans, threads, processes)
+        self._free.append(slot)
+        self._pending -= 1
+        return result
+
+    def drain(self):
+        while self._pending:
+            self.collect()
+
+    def request(self, *msg):
+        """제어 명령 (처리 중인 프레임을 모두 받은 뒤 전송)"""
+        self.drain()
+        self._conn.send(msg)
+        return self._conn.recv()
+
+    def close(self):
+        if self._process is None:
+            return
+        try:
+            self.drain()
+            self._conn.send(("stop",))
+        except (EOFError, OSError):
+            pass
+        self._process.join(timeout=3.0)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._process = None
+        self._conn.close()
+        self.ring.close(unlink=True)
+
+
+_workers = {}
+_workers_lock = threading.Lock()
+
+
+def get_worker(ip: str, samples: int) -> DSPWorker:
+    with _workers_lock:
+        worker = _workers.get(ip)
+        if worker is not None and (not worker.alive or worker.ring.samples != samples):
+            worker.close()
+            worker = None
+        if worker is None:
+            worker = DSPWorker(ip, samples)
+            _workers[ip] = worker
+        return worker
+
+
+def worker_metrics():
+    """이 프로세스가 띄운 DSP 프로세스들의 지표 snapshot 목록"""
+    with _workers_lock:
+        return [w.metrics for w in _workers.values() if w.metrics is not None]
+
+
+def close_worker(ip: str):
+    with _workers_lock:
+        worker = _workers.pop(ip, None)
+    if worker is not None:
+        worker.close()
+
+
+@atexit.register
+def close_all():
+    with _workers_lock:
+        workers = list(_workers.values())
+        _workers.clear()
+    for worker in workers:
+        worker.close()
+
+
+# ------------------------------------------------------
+# 레이더 래퍼 (AcquisitionWorker 입장에서는 FMCWDetector 와 동일)
+# ------------------------------------------------------
+class OffloadedFMCW:
+    """
+    연결 / 캘리브레이션은 원래 detector 가 수신 스레드에서 수행하고
+    프레임 DSP 만 DSPWorker 로 넘긴다. clutter map / 빈 방 배경은 캘리브레이션 후 DSP 프로세스로 보내고
+    close() 때 (적응된 값을) 다시 받아와 세션에 저장한다.
+    rx stamp (버퍼 번호 / 캡처 시각) 는 제출 순서대로 보관했다가 늦게 나온 결과에 붙인다.
+    """
+    PIPELINE_DEPTH = 2
+
+    def __init__(self, detector: FMCWDetector):
+        self.detector = detector
+        self.worker = None
+        self._stamps = deque()
+
+    def __getattr__(self, name):
+        return getattr(self.detector, name)
+
+    @property
+    def products(self):
+        return self.detector.products
+
+    @products.setter
+    def products(self, value):
+        # 프레임마다 DSP 프로세스로 같이 보냄 (다음 프레임부터 적용)
+        self.detector.products = value
+
+    def connect(self) -> bool:
+        if not self.detector.connect():
+            return False
+        self.worker = get_worker(self.detector.SDR_IP, self.detector.TOTAL_SAMPLES)
+        self.worker.request("reset")
+        self._stamps.clear()
+        return True
+
+    def calibrate(self, force: bool = False, progress=None) -> bool:
+        if self.worker is not None:
+            self.worker.drain()
+        self._stamps.clear()
+        ok = self.detector.calibrate(force=force, progress=progress)
+        if self.worker is not None and self.detector.clutter_map is not None:
+            self.worker.request("clutter", self.detector.clutter_map)
+            self.worker.request("background", self.detector.background)
+        return ok
+
+    def process_frame(self):
+        sdr = self.detector.sdr
+        if not sdr:
+            return None
+        stages = self.detector.stages
+        try:
+            stages.start()
+            rx = sdr.rx()
+            stamp = self.detector.rx_clock.tick()
+            stages.lap("rx")
+        except Exception:
+            self.detector.m_rx_errors.inc()
+            return None
+        return self.process_buffer(rx, stamp)
+
+    def _finish(self, result, stamp):
+        """결과에 rx stamp 를 붙임 (결과 없이 끝난 버퍼는 버린 것으로 집계)"""
+        if stamp is None:
+            return result
+        if result is None:
+            self.detector.rx_clock.discard()
+        else:
+            result.update(stamp)
+        return result
+
+    def _collect(self, block: bool):
+        pending = self.worker.pending
+        result = self.worker.collect(block=block)
+        if self.worker.pending == pending:
+            return None         # 아직 결과 없음
+        return self._finish(result, self._stamps.popleft())
+
+    def process_buffer(self, rx, stamp=None):
+        if self.worker is None:
+            return self._finish(self.detector.process_buffer(rx), stamp)
+        if len(rx) != self.detector.TOTAL_SAMPLES:
+            self.detector.m_short.inc()
+            return self._finish(None, stamp)
+        try:
+            products = self.detector.products
+            ready = None
+            if not self.worker.submit(rx, products):
+                # 빈 슬롯이 없음 → 가장 오래된 결과를 받아 자리를 비움 (이번 반환값으로 사용)
+                ready = self._collect(block=True)
+                self.worker.submit(rx, products)
+            self._stamps.append(stamp)
+            if ready is not None:
+                return ready
+            # 파이프라인이 찼으면 가장 오래된 결과를 기다림 (그동안 다음 rx 는 아직 안 읽음)
+            block = self.worker.pending >= self.PIPELINE_DEPTH
+            return self._collect(block=block)
+        except (EOFError, OSError):
+            print("❌ [FMCW] DSP 프로세스 종료됨 → 현재 스레드에서 처리")
+            self.worker = None
+            self._stamps.clear()
+            return self._finish(self.detector.process_buffer(rx), stamp)
+
+    def close(self):
+        if self.worker is not None:
+            try:
+                _, clutter = self.worker.request("get_clutter")
+                if clutter is not None:
+                    self.detector.clutter_map = clutter
+            except (EOFError, OSError):
+                pass
+            self.worker = None
+        self.detector.close()
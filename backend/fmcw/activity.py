@@ -0,0 +1,230 @@
+"""
+마이크로 도플러 기반 걷기 / 서 있기 분류
+
+    model = ActivityModel.load("models/activity_model.npz")
+    clf = ActivityClassifier(model)
+    activity, confidence = clf.update(doppler_profile_db)   # 프레임당 1회, 창이 차기 전에는 (None, 0.0)
+
+특징 (window: [bins, T] dB 스펙트로그램)
+    - 프레임별 중앙값을 빼서 이득/거리 차이 제거
+    - 0 Hz 기준으로 ± 를 접어서 |속도| 축으로 만든 뒤 N_BANDS 개 대역으로 묶음
+    - 대역별 시간 평균 / 시간 표준편차
+    - 스칼라: 도플러 폭, |속도| 무게중심, 에너지 시간 변동, peak-to-median
+모델은 표준화 + 다항 로지스틱 회귀 (numpy 만 사용, 추론은 행렬곱 1번)
+"""
+import numpy as np
+
+from .dataset import window_starts
+from .spectrogram import SpectrogramRing
+
+N_BANDS = 16
+CLASS_NAMES = ("Walking", "Standing")
+
+
+# ------------------------------------------------------
+# 특징 추출
+# ------------------------------------------------------
+def _fold(window: np.ndarray) -> np.ndarray:
+    """[bins, ...] fftshift 된 도플러 축을 0 Hz 기준으로 접기 → [bins//2, ...]"""
+    n = window.shape[0]
+    center = n // 2
+    half = min(center, n - center - 1)
+    pos = window[center + 1:center + 1 + half]
+    neg = window[center - half:center][::-1]
+    return np.maximum(pos, neg)
+
+
+def feature_size(n_bins: int) -> int:
+    return 2 * min(N_BANDS, n_bins // 2 - 1) + 4
+
+
+def doppler_features(window: np.ndarray) -> np.ndarray:
+    """
+    window: [bins, T] (dB) → 1차원 특징 벡터
+    여러 창을 한 번에: [N, bins, T] → [N, F]
+    """
+    w = np.asarray(window, dtype=np.float32)
+    single = w.ndim == 2
+    if single:
+        w = w[None]
+
+    # 프레임별 중앙값 제거 (이득 / 거리 / 윈도우 보정 차이 무시)
+    w = w - np.median(w, axis=1, keepdims=True)
+
+    # [N, bins, T] → [N, bins/2, T] (|속도|)
+    folded = np.moveaxis(_fold(np.moveaxis(w, 1, 0)), 0, 1)
+    half = folded.shape[1]
+    bands = min(N_BANDS, half)
+    usable = half // bands * bands
+    banded = folded[:, :usable].reshape(w.shape[0], bands, usable // bands, -1).mean(axis=2)
+
+    band_mean = banded.mean(axis=2)
+    band_std = banded.std(axis=2)
+
+    # 스칼라 특징
+    lin = np.power(10.0, folded / 20.0)
+    v = np.arange(1, half + 1, dtype=np.float32)[None, :, None]
+    energy = lin.sum(axis=1)                                     # [N, T]
+    centroid = (lin * v).sum(axis=1) / np.maximum(energy, 1e-9)  # [N, T]
+    spread = (folded > 6.0).sum(axis=1)                          # 중앙값 +6 dB 이상 bin 수
+    peak = folded.max(axis=1)
+
+    scalars = np.stack([
+        spread.mean(axis=1) / half,
+        centroid.mean(axis=1) / half,
+        np.log10(energy).std(axis=1),
+        peak.mean(axis=1),
+    ], axis=1)
+
+    feats = np.concatenate([band_mean, band_std, scalars], axis=1).astype(np.float32)
+    return feats[0] if single else feats
+
+
+def sliding_windows(profiles: np.ndarray, labels: np.ndarray, window: int,
+                    stride: int = 1, segment_ids: np.ndarray = None):
+    """
+    프레임 시퀀스 [rows, bins] → (창 [N, bins, window], 라벨 [N], 시작 행 [N])
+    같은 라벨(및 같은 segment)이 window 개 연속된 구간에서만 창을 만든다.
+    창은 sliding_window_view 이므로 복사 없음.
+    """
+    profiles = np.asarray(profiles, dtype=np.float32)
+    labels = np.asarray(labels)
+    rows = len(labels)
+    if rows < window:
+        return (np.zeros((0, profiles.shape[1], window), np.float32),
+                np.zeros(0, labels.dtype), np.zeros(0, np.int64))
+
+    key = None if segment_ids is None else labels.astype(np.int64) * 1_000_003 + segment_ids
+    starts = window_starts(labels, window, stride, key)
+
+    view = np.lib.stride_tricks.sliding_window_view(profiles, window, axis=0)  # [rows-w+1, bins, w]
+    return view[starts], labels[starts], starts
+
+
+# ------------------------------------------------------
+# 모델
+# ------------------------------------------------------
+class ActivityModel:
+    """표준화 + 다항 로지스틱 회귀"""
+
+    def __init__(self, n_bins: int, window: int, classes=CLASS_NAMES):
+        self.n_bins = int(n_bins)
+        self.window = int(window)
+        self.classes = tuple(classes)
+        n_feat = feature_size(self.n_bins)
+        self.mean = np.zeros(n_feat, dtype=np.float32)
+        self.scale = np.ones(n_feat, dtype=np.float32)
+        self.W = np.zeros((n_feat, len(self.classes)), dtype=np.float32)
+        self.b = np.zeros(len(self.classes), dtype=np.float32)
+
+    # --------------------------------------------------
+    # 학습
+    # --------------------------------------------------
+    def fit(self, X: np.ndarray, y: np.ndarray, l2: float = 1e-3, lr: float = 0.5,
+            epochs: int = 500, verbose: bool = False):
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.int64)
+        self.mean = X.mean(axis=0).astype(np.float32)
+        self.scale = (X.std(axis=0) + 1e-6).astype(np.float32)
+        Z = (X - self.mean) / self.scale
+
+        n, f = Z.shape
+        k = len(self.classes)
+        Y = np.zeros((n, k))
+        Y[np.arange(n), y] = 1.0
+        # 클래스 불균형 보정
+        counts = np.maximum(Y.sum(axis=0), 1)
+        sample_w = (n / (k * counts))[y][:, None]
+
+        W = np.zeros((f, k))
+        b = np.zeros(k)
+        for epoch in range(epochs):
+            P = _softmax(Z @ W + b)
+            G = (P - Y) * sample_w / n
+            W -= lr * (Z.T @ G + l2 * W)
+            b -= lr * G.sum(axis=0)
+            if verbose and epoch % 100 == 0:
+                loss = -np.sum(sample_w[:, 0] * np.log(P[np.arange(n), y] + 1e-12)) / n
+                print(f"  epoch {epoch:4d} loss {loss:.4f}")
+
+        self.W = W.astype(np.float32)
+        self.b = b.astype(np.float32)
+        return self
+
+    # --------------------------------------------------
+    # 추론
+    # --------------------------------------------------
+    def predict_proba(self, feats: np.ndarray) -> np.ndarray:
+        z = (feats - self.mean) / self.scale
+        return _softmax(z @ self.W + self.b)
+
+    def predict(self, feats: np.ndarray) -> np.ndarray:
+        return np.argmax(self.predict_proba(feats), axis=-1)
+
+    # --------------------------------------------------
+    # 저장 / 불러오기
+    # --------------------------------------------------
+    def save(self, path: str):
+        np.savez(
+            path,
+            n_bins=self.n_bins,
+            window=self.window,
+            classes=np.array(self.classes),
+            mean=self.mean,
+            scale=self.scale,
+            W=self.W,
+            b=self.b,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "ActivityModel":
+        with np.load(path, allow_pickle=False) as data:
+            model = cls(int(data["n_bins"]), int(data["window"]),
+                        [str(c) for c in data["classes"]])
+            model.mean = data["mean"]
+            model.scale = data["scale"]
+            model.W = data["W"]
+            model.b = data["b"]
+        return model
+
+
+def _softmax(z):
+    z = z - z.max(axis=-1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+# ------------------------------------------------------
+# 실시간 단계
+# ------------------------------------------------------
+class ActivityClassifier:
+    """
+    프레임별 도플러 프로파일을 받아 최근 window 프레임으로 분류
+    - 스펙트로그램은 SpectrogramRing (복사 없는 시간순 view)
+    - 결과는 EMA 로 살짝 평활화해 프레임마다 튀지 않게 함
+    """
+    def __init__(self, model: ActivityModel, smoothing: float = 0.3):
+        self.model = model
+        self.smoothing = smoothing
+        self.ring = SpectrogramRing(model.n_bins, model.window)
+        self._proba = None
+
+    def reset(self):
+        self.ring.clear()
+        self._proba = None
+
+    def update(self, profile_db, timestamp: float = 0.0):
+        """(activity 이름, confidence 0~1) — 창이 차기 전에는 (None, 0.0)"""
+        if len(profile_db) != self.model.n_bins:
+            return None, 0.0
+        self.ring.append(profile_db, timestamp)
+        if len(self.ring) < self.model.window:
+            return None, 0.0
+
+        proba = self.model.predict_proba(doppler_features(self.ring.view()))
+        if self._proba is None:
+            self._proba = proba
+        else:
+            self._proba = self._proba * (1 - self.smoothing) + proba * self.smoothing
+        idx = int(np.argmax(self._proba))
+        return self.model.classes[idx], float(self._proba[idx])
@@ -0,0 +1,68 @@
+"""
+학습된 배경(CW baseline / FMCW clutter map / FMCW 빈 방 complex 프레임 "FMCW_BG") 디스크 캐시
+
+    store = CalibrationStore()                 # RADAR_CALIB_DIR 또는 backend/calib_cache
+    store.save("FMCW", config, clutter_map)
+    state = store.load("FMCW", config)         # 설정이 다르면 None
+
+파일은 <kind>_<config hash>.npz 하나씩.
+config 는 LO / 대역폭 / 이득 / N_SAMPLES / NUM_CHIRPS 등 배경에 영향을 주는 설정 dict.
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "calib_cache")
+
+
+def config_hash(config: dict) -> str:
+    text = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class CalibrationStore:
+    def __init__(self, directory: str = None):
+        self.directory = directory or os.environ.get("RADAR_CALIB_DIR", DEFAULT_DIR)
+
+    def path(self, kind: str, config: dict) -> str:
+        return os.path.join(self.directory, f"{kind.lower()}_{config_hash(config)}.npz")
+
+    def save(self, kind: str, config: dict, state) -> str:
+        """원자적 저장 (임시 파일에 쓰고 교체) → 저장 중 종료돼도 파일이 깨지지 않음"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(kind, config)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            state=np.asarray(state),
+            config=json.dumps(config, sort_keys=True, default=str),
+            saved_at=time.time(),
+        )
+        os.replace(tmp, path)
+        return path
+
+    def load(self, kind: str, config: dict):
+        """저장된 배경 반환. 없거나 읽을 수 없으면 None"""
+        path = self.path(kind, config)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                # 해시 충돌 / 수동으로 바꾼 파일 방지
+                if str(data["config"]) != json.dumps(config, sort_keys=True, default=str):
+                    return None
+                state = data["state"]
+                return state.item() if state.ndim == 0 else state.copy()
+        except Exception as e:
+            print(f"⚠️ [Calib] 캐시 읽기 실패 ({path}): {e}")
+            return None
+
+    def remove(self, kind: str, config: dict):
+        try:
+            os.remove(self.path(kind, config))
+        except FileNotFoundError:
+            pass
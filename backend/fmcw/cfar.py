@@ -0,0 +1,239 @@
+"""
+CFAR (Constant False Alarm Rate) 검출
+
+입력은 선형 전력(|X|^2) 배열. 모든 함수는 (mask, threshold, noise) 를 반환한다.
+    mask      : 검출된 셀 True
+    threshold : 셀별 검출 임계값 (선형 전력)
+    noise     : 셀별 잡음 전력 추정 (threshold / alpha, OS 는 순서통계 기대값으로 보정)
+
+    CA-CFAR : 학습 셀 평균 × alpha   — 누적합(1D) / 누적합 테이블(2D) 로 O(N)
+    OS-CFAR : 학습 셀의 k 번째 순서통계 × alpha — 다중 표적 / 클러터 경계에 강함
+              (sliding_window_view + np.partition, 셀당 O(학습 셀 수))
+
+alpha 는 pfa(오경보 확률)로부터 계산한다 (Square-law 검파, 지수분포 잡음 가정).
+
+2D 입력은 fftshift 된 range-Doppler 맵 [doppler, range].
+Doppler 축은 주기적이므로 순환(wrap), range 축은 주기적이지 않으므로
+CA 는 배열 밖 학습 셀을 빼고(학습 창 축소), OS 는 1D 와 같이 반사 패딩한다.
+"""
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# ------------------------------------------------------
+# 임계 배수 (alpha)
+# ------------------------------------------------------
+def ca_alpha(n_train, pfa: float):
+    """CA-CFAR: Pfa = (1 + alpha/N)^-N → alpha = N (Pfa^(-1/N) - 1)"""
+    n = np.asarray(n_train, dtype=np.float64)
+    return n * (pfa ** (-1.0 / n) - 1.0)
+
+
+@lru_cache(maxsize=64)
+def os_alpha(n_train: int, k: int, pfa: float) -> float:
+    """OS-CFAR: Pfa = prod_{i=0}^{k-1} (N-i) / (N-i+alpha) 를 이분법으로 풀이"""
+    i = np.arange(k)
+    num = n_train - i
+
+    def pfa_of(alpha):
+        return float(np.prod(num / (num + alpha)))
+
+    lo, hi = 0.0, 1.0
+    while pfa_of(hi) > pfa:
+        hi *= 2.0
+    for _ in range(60):
+        mid = 0.5 * (lo + hi)
+        if pfa_of(mid) > pfa:
+            lo = mid
+        else:
+            hi = mid
+    return hi
+
+
+def _default_k(n_train: int) -> int:
+    # 관례적으로 학습 셀의 3/4 지점
+    return max(1, int(round(0.75 * n_train)))
+
+
+def os_scale(n_train: int, k: int) -> float:
+    """지수분포 잡음에서 k 번째 순서통계의 기대값 / 평균 = sum_{i=N-k+1}^{N} 1/i"""
+    return float(np.sum(1.0 / np.arange(n_train - k + 1, n_train + 1)))
+
+
+# ------------------------------------------------------
+# 1D
+# ------------------------------------------------------
+def ca_cfar_1d(power, guard: int = 2, train: int = 8, pfa: float = 1e-4):
+    x = np.asarray(power, dtype=np.float64)
+    n = x.size
+    c = np.zeros(n + 1)
+    np.cumsum(x, out=c[1:])
+
+    idx = np.arange(n)
+    # 왼쪽 학습 구간 [i-g-t, i-g), 오른쪽 [i+g+1, i+g+t+1) — 배열 밖은 잘라냄
+    l0 = np.clip(idx - guard - train, 0, n)
+    l1 = np.clip(idx - guard, 0, n)
+    r0 = np.clip(idx + guard + 1, 0, n)
+    r1 = np.clip(idx + guard + train + 1, 0, n)
+
+    total = (c[l1] - c[l0]) + (c[r1] - c[r0])
+    count = (l1 - l0) + (r1 - r0)
+    count = np.maximum(count, 1)
+
+    noise = total / count
+    threshold = ca_alpha(count, pfa) * noise
+    return x > threshold, threshold, noise
+
+
+def os_cfar_1d(power, guard: int = 2, train: int = 8, pfa: float = 1e-4, k: int = None):
+    x = np.asarray(power, dtype=np.float64)
+    half = guard + train
+    padded = np.pad(x, half, mode="reflect" if x.size > half else "edge")
+
+    # 셀마다 [왼쪽 학습 t개 | guard | CUT | guard | 오른쪽 학습 t개]
+    win = sliding_window_view(padded, 2 * half + 1)
+    cells = np.concatenate((win[:, :train], win[:, -train:]), axis=1)
+
+    n_train = 2 * train
+    k = k or _default_k(n_train)
+    stat = np.partition(cells, k - 1, axis=1)[:, k - 1]
+
+    threshold = os_alpha(n_train, k, pfa) * stat
+    return x > threshold, threshold, stat / os_scale(n_train, k)
+
+
+# ------------------------------------------------------
+# 2D (range-Doppler map, [doppler, range])
+# ------------------------------------------------------
+def _box_sum(table, r0, r1, c0, c1):
+    return table[r1, c1] - table[r0, c1] - table[r1, c0] + table[r0, c0]
+
+
+def _integral(x):
+    table = np.zeros((x.shape[0] + 1, x.shape[1] + 1))
+    np.cumsum(np.cumsum(x, axis=0), axis=1, out=table[1:, 1:])
+    return table
+
+
+def ca_cfar_2d(power, guard=(1, 2), train=(4, 8), pfa: float = 1e-4):
+    x = np.asarray(power, dtype=np.float64)
+    gr, gc = guard
+    tr, tc = train
+    hr, hc = gr + tr, gc + tc
+    rows, cols = x.shape
+
+    # Doppler 축은 순환, range 축은 0 으로 채우고 실제 셀 수를 따로 센다
+    pad = ((0, 0), (hc, hc))
+    padded = np.pad(np.pad(x, ((hr, hr), (0, 0)), mode="wrap"), pad)
+    valid = np.pad(np.ones((rows + 2 * hr, cols)), pad)
+    table = _integral(padded)
+    count_table = _integral(valid)
+
+    r = np.arange(rows)[:, None] + hr
+    c = np.arange(cols)[None, :] + hc
+    outer = (r - hr, r + hr + 1, c - hc, c + hc + 1)
+    inner = (r - gr, r + gr + 1, c - gc, c + gc + 1)
+    total = _box_sum(table, *outer) - _box_sum(table, *inner)
+    count = _box_sum(count_table, *outer) - _box_sum(count_table, *inner)
+    count = np.maximum(count, 1)
+
+    noise = total / count
+    threshold = ca_alpha(count, pfa) * noise
+    return x > threshold, threshold, noise
+
+
+def os_cfar_2d(power, guard=(1, 2), train=(4, 8), pfa: float = 1e-4, k: int = None,
+               chunk_rows: int = 16):
+    x = np.asarray(power, dtype=np.float64)
+    gr, gc = guard
+    tr, tc = train
+    hr, hc = gr + tr, gc + tc
+    rows, cols = x.shape
+
+    padded = np.pad(x, ((hr, hr), (0, 0)), mode="wrap")
+    padded = np.pad(padded, ((0, 0), (hc, hc)), mode="reflect" if cols > hc else "edge")
+    win = sliding_window_view(padded, (2 * hr + 1, 2 * hc + 1))
+
+    # 창 안에서 guard + CUT 영역을 뺀 학습 셀 위치
+    train_mask = np.ones((2 * hr + 1, 2 * hc + 1), dtype=bool)
+    train_mask[tr:tr + 2 * gr + 1, tc:tc + 2 * gc + 1] = False
+    flat_idx = np.flatnonzero(train_mask)
+    n_train = flat_idx.size
+    k = k or _default_k(n_train)
+
+    stat = np.empty_like(x)
+    # 메모리 절약을 위해 행 단위 청크로 처리 (Jetson 4GB)
+    for r0 in range(0, rows, chunk_rows):
+        r1 = min(rows, r0 + chunk_rows)
+        block = win[r0:r1].reshape(r1 - r0, cols, -1)[:, :, flat_idx]
+        stat[r0:r1] = np.partition(block, k - 1, axis=2)[:, :, k - 1]
+
+    threshold = os_alpha(n_train, k, pfa) * stat
+    return x > threshold, threshold, stat / os_scale(n_train, k)
+
+
+# ------------------------------------------------------
+# 검출 목록
+# ------------------------------------------------------
+CFAR_1D = {"CA": ca_cfar_1d, "OS": os_cfar_1d}
+CFAR_2D = {"CA": ca_cfar_2d, "OS": os_cfar_2d}
+
+
+def _local_peaks(mask, power):
+    """검출 셀 중 이웃보다 큰 셀만 남김 (한 표적이 여러 bin 으로 번지는 것 방지)"""
+    peaks = mask.copy()
+    for axis in range(power.ndim):
+        n = power.shape[axis]
+        if n < 2:
+            continue
+        fwd = [slice(None)] * power.ndim
+        bwd = [slice(None)] * power.ndim
+        fwd[axis], bwd[axis] = slice(1, None), slice(None, -1)
+        fwd, bwd = tuple(fwd), tuple(bwd)
+        peaks[fwd] &= power[fwd] >= power[bwd]
+        peaks[bwd] &= power[bwd] >= power[fwd]
+    return peaks
+
+
+def detect_1d(power, method: str = "CA", guard: int = 2, train: int = 8,
+              pfa: float = 1e-4, max_detections: int = 8, offset: int = 0):
+    """
+    1D CFAR 검출 → [{"bin", "snr_db", "margin_db"}, ...] (SNR 내림차순)
+        snr_db    : 잡음 추정 대비 전력 (dB)
+        margin_db : 검출 임계값을 넘은 정도 (dB, 항상 > 0)
+    offset 은 반환 bin 번호에 더해진다 (부분 구간을 넣은 경우)
+    """
+    x = np.asarray(power, dtype=np.float64)
+    mask, threshold, noise = CFAR_1D[method.upper()](x, guard=guard, train=train, pfa=pfa)
+    idx = np.flatnonzero(_local_peaks(mask, x))
+    if idx.size == 0:
+        return []
+
+    snr = 10 * np.log10(x[idx] / np.maximum(noise[idx], 1e-30))
+    margin = 10 * np.log10(x[idx] / np.maximum(threshold[idx], 1e-30))
+    order = np.argsort(snr)[::-1][:max_detections]
+    return [
+        {"bin": int(idx[i] + offset), "snr_db": float(snr[i]), "margin_db": float(margin[i])}
+        for i in order
+    ]
+
+
+def detect_2d(power, method: str = "CA", guard=(1, 2), train=(4, 8),
+              pfa: float = 1e-4, max_detections: int = 8):
+    """2D CFAR 검출 → [{"doppler_bin", "range_bin", "snr_db", "margin_db"}, ...] (SNR 내림차순)"""
+    x = np.asarray(power, dtype=np.float64)
+    mask, threshold, noise = CFAR_2D[method.upper()](x, guard=guard, train=train, pfa=pfa)
+    rows, cols = np.nonzero(_local_peaks(mask, x))
+    if rows.size == 0:
+        return []
+
+    snr = 10 * np.log10(x[rows, cols] / np.maximum(noise[rows, cols], 1e-30))
+    margin = 10 * np.log10(x[rows, cols] / np.maximum(threshold[rows, cols], 1e-30))
+    order = np.argsort(snr)[::-1][:max_detections]
+    return [
+        {"doppler_bin": int(rows[i]), "range_bin": int(cols[i]),
+         "snr_db": float(snr[i]), "margin_db": float(margin[i])}
+        for i in order
+    ]
@@ -0,0 +1,211 @@
+"""
+라벨 달린 프로파일 데이터셋 (메모리맵)
+
+CSV 를 한 번만 변환해두면 이후에는 텍스트 파싱 없이 필요한 부분만 디스크에서 읽는다.
+4 GB Jetson 에서도 수 GB 수집 데이터를 처리할 수 있도록 전체를 메모리에 올리지 않는다.
+
+    convert_csv("micro_doppler_walk_stand.csv", "walk_stand.ds")
+    ds = ProfileDataset("walk_stand.ds")
+    for labels, timestamps, profiles in ds.iter_chunks(65536): ...
+    starts = ds.window_starts(window=16, stride=2)
+    train, val = ds.split(starts, val=0.2)
+    batch = ds.windows(train[:256], 16)          # [N, bins, 16]
+
+디렉터리 구조
+    meta.json        rows, bins, source, columns
+    profiles.f32     float32 [rows, bins] (row-major, 헤더 없음)
+    labels.i16       int16   [rows]       (-1 = 라벨 없음)
+    timestamps.f64   float64 [rows]       (CSV 에 없으면 NaN)
+"""
+import itertools
+import json
+import os
+
+import numpy as np
+
+from .profile_log import iter_chunks as iter_log_chunks
+
+PROFILES = "profiles.f32"
+LABELS = "labels.i16"
+TIMESTAMPS = "timestamps.f64"
+META = "meta.json"
+
+
+# ------------------------------------------------------
+# 변환
+# ------------------------------------------------------
+class _DatasetWriter:
+    """열 파일 3개에 행 묶음을 이어 붙임"""
+    def __init__(self, out_dir: str):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self._files = {
+            name: open(os.path.join(out_dir, name), "wb")
+            for name in (PROFILES, LABELS, TIMESTAMPS)
+        }
+        self.rows = 0
+        self.bins = None
+
+    def append(self, labels, timestamps, profiles):
+        profiles = np.ascontiguousarray(profiles, dtype=np.float32)
+        if self.bins is None:
+            self.bins = profiles.shape[1]
+        elif profiles.shape[1] != self.bins:
+            raise ValueError(f"bin 수 불일치: {profiles.shape[1]} != {self.bins}")
+        self._files[PROFILES].write(profiles.tobytes())
+        self._files[LABELS].write(np.asarray(labels, dtype=np.int16).tobytes())
+        self._files[TIMESTAMPS].write(np.asarray(timestamps, dtype=np.float64).tobytes())
+        self.rows += len(profiles)
+
+    def close(self, **meta):
+        for f in self._files.values():
+            f.close()
+        meta = dict(meta, rows=self.rows, bins=self.bins or 0)
+        with open(os.path.join(self.out_dir, META), "w") as f:
+            json.dump(meta, f, indent=2)
+
+
+def convert_csv(csv_path: str, out_dir: str, chunk_rows: int = 8192) -> "ProfileDataset":
+    """
+    Logger CSV (label, [timestamp,] doppler_0..) → 데이터셋
+    chunk_rows 행씩 스트리밍으로 파싱하므로 CSV 크기와 무관하게 메모리 사용량 일정
+    """
+    writer = _DatasetWriter(out_dir)
+    with open(csv_path) as f:
+        header = f.readline().strip().split(",")
+        has_ts = len(header) > 1 and header[1] == "timestamp"
+        first = 2 if has_ts else 1
+        while True:
+            lines = list(itertools.islice(f, chunk_rows))
+            if not lines:
+                break
+            data = np.loadtxt(lines, delimiter=",", dtype=np.float64, ndmin=2)
+            timestamps = data[:, 1] if has_ts else np.full(len(data), np.nan)
+            writer.append(data[:, 0], timestamps, data[:, first:])
+    writer.close(source=os.path.abspath(csv_path), columns=header[first:])
+    return ProfileDataset(out_dir)
+
+
+def convert_log(log_dir: str, out_dir: str) -> "ProfileDataset":
+    """Logger npz 청크 디렉터리 → 데이터셋"""
+    writer = _DatasetWriter(out_dir)
+    for labels, timestamps, profiles in iter_log_chunks(log_dir):
+        writer.append(labels, timestamps, profiles)
+    writer.close(source=os.path.abspath(log_dir))
+    return ProfileDataset(out_dir)
+
+
+# ------------------------------------------------------
+# 창 / 분할 (배열 연산만 사용)
+# ------------------------------------------------------
+def segment_ids(labels, timestamps=None, max_gap: float = 0.5) -> np.ndarray:
+    """라벨이 바뀌거나 시간 간격이 max_gap 을 넘으면 새 segment (녹화 1회 ≈ segment 1개)"""
+    labels = np.asarray(labels)
+    new = np.zeros(len(labels), dtype=bool)
+    new[1:] = labels[1:] != labels[:-1]
+    if timestamps is not None:
+        timestamps = np.asarray(timestamps)
+        gap = np.diff(timestamps) > max_gap     # NaN 비교는 False → 시간 정보 없으면 라벨만 사용
+        new[1:] |= gap
+    return np.cumsum(new)
+
+
+def window_starts(labels, window: int, stride: int = 1, segments=None) -> np.ndarray:
+    """같은 segment 안에 window 개가 모두 들어가고 라벨이 있는 창의 시작 행"""
+    labels = np.asarray(labels)
+    rows = len(labels)
+    if rows < window:
+        return np.zeros(0, dtype=np.int64)
+    key = labels if segments is None else segments
+    # 창 안의 key 가 모두 같은지: 변화 지점 누적합으로 O(rows) 판정
+    change = np.concatenate([[0], np.cumsum(key[1:] != key[:-1])])
+    starts = np.arange(0, rows - window + 1, stride, dtype=np.int64)
+    ok = (change[starts + window - 1] == change[starts]) & (labels[starts] >= 0)
+    return starts[ok]
+
+
+# ------------------------------------------------------
+# 데이터셋
+# ------------------------------------------------------
+class ProfileDataset:
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, META)) as f:
+            self.meta = json.load(f)
+        rows, bins = self.meta["rows"], self.meta["bins"]
+        self.n_bins = bins
+
+        def mm(name, dtype, shape):
+            if rows == 0:
+                return np.zeros(shape, dtype=dtype)
+            return np.memmap(os.path.join(path, name), dtype=dtype, mode="r", shape=shape)
+
+        self.profiles = mm(PROFILES, np.float32, (rows, bins))
+        self.labels = mm(LABELS, np.int16, (rows,))
+        self.timestamps = mm(TIMESTAMPS, np.float64, (rows,))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __repr__(self):
+        return f"<ProfileDataset {self.path} rows={len(self)} bins={self.n_bins}>"
+
+    # --------------------------------------------------
+    # 스트리밍
+    # --------------------------------------------------
+    def iter_chunks(self, chunk_rows: int = 65536, start: int = 0, stop: int = None):
+        """(labels, timestamps, profiles) 메모리맵 view 를 chunk_rows 행씩"""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for i in range(start, stop, chunk_rows):
+            j = min(stop, i + chunk_rows)
+            yield self.labels[i:j], self.timestamps[i:j], self.profiles[i:j]
+
+    # --------------------------------------------------
+    # 창
+    # --------------------------------------------------
+    def segments(self, max_gap: float = 0.5) -> np.ndarray:
+        return segment_ids(self.labels, self.timestamps, max_gap)
+
+    def window_starts(self, window: int, stride: int = 1, max_gap: float = 0.5) -> np.ndarray:
+        return window_starts(self.labels, window, stride, self.segments(max_gap))
+
+    def window(self, start: int, length: int) -> np.ndarray:
+        """[bins, length] (메모리맵 view, 복사 없음)"""
+        return self.profiles[start:start + length].T
+
+    def windows(self, starts, length: int) -> np.ndarray:
+        """여러 창을 한 번에 모음 → [N, bins, length] (복사본)"""
+        starts = np.asarray(starts, dtype=np.int64)
+        out = np.empty((len(starts), self.n_bins, length), dtype=np.float32)
+        for k, s in enumerate(starts):
+            out[k] = self.profiles[s:s + length].T
+        return out
+
+    def iter_windows(self, starts, length: int, batch: int = 512):
+        """
+        (창 [B, bins, length], 라벨 [B]) 배치 단위 — 메모리 사용량은 batch 에 비례
+        starts 가 오름차순(window_starts 결과)이면 디스크를 순차적으로 읽음
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        for i in range(0, len(starts), batch):
+            part = starts[i:i + batch]
+            yield self.windows(part, length), np.asarray(self.labels[part])
+
+    # --------------------------------------------------
+    # 분할
+    # --------------------------------------------------
+    def split(self, starts, val: float = 0.2, seed: int = 0, max_gap: float = 0.5):
+        """
+        창 시작 행을 segment 단위로 train / val 로 나눔
+        (겹치는 창이 양쪽에 동시에 들어가지 않도록)
+        """
+        starts = np.asarray(starts, dtype=np.int64)
+        groups = self.segments(max_gap)[starts]
+        unique = np.unique(groups)
+        rng = np.random.default_rng(seed)
+        n_val = int(round(len(unique) * val))
+        is_val = np.isin(groups, rng.choice(unique, size=n_val, replace=False))
+        if len(unique) < 2 or is_val.all() or not is_val.any():
+            # segment 가 너무 적으면 창 단위로 분할
+            is_val = rng.random(len(starts)) < val
+        return starts[~is_val], starts[is_val]
@@ -0,0 +1,143 @@
+import numpy as np
+
+from .fft_backend import get_backend
+
+
+class RangeDopplerEngine:
+    """
+    FMCW 프레임 처리 엔진 (Jetson Nano 최적화)
+    - 윈도우는 생성 시 1회만 계산 (float32)
+    - 작업 버퍼를 미리 할당하고 제자리 연산 → 프레임당 큰 배열 할당 없음
+    - 처음부터 끝까지 complex64 / float32 유지
+    - FFT 는 fft_backend 의 계획(plan)을 생성 시 받아두고 재사용
+
+    반환되는 배열은 엔진 내부 버퍼이므로 다음 호출에서 덮어쓴다.
+    보관하려면 호출자가 .copy() 해야 한다.
+    """
+    def __init__(self, num_chirps: int, n_samples: int, fft_size: int = None,
+                 backend=None):
+        self.num_chirps = int(num_chirps)
+        self.n_samples = int(n_samples)
+        self.fft_size = int(fft_size or n_samples)
+        self.total_samples = self.num_chirps * self.n_samples
+
+        # FFT 크기보다 긴 chirp 은 잘라서 사용 (np.fft.fft(n=...) 과 동일)
+        self.in_cols = min(self.n_samples, self.fft_size)
+
+        # 캐시된 윈도우
+        self.range_window = np.hanning(self.n_samples).astype(np.float32)[:self.in_cols]
+        self.doppler_window = np.hanning(self.num_chirps).astype(np.float32)[:, None]
+
+        # 작업 버퍼
+        self.spectrum = np.zeros((self.num_chirps, self.fft_size), dtype=np.complex64)
+        self.magnitude = np.empty((self.num_chirps, self.fft_size), dtype=np.float32)
+        self.profile = np.empty(self.fft_size, dtype=np.float32)
+        self._slow_mean = np.empty(self.fft_size, dtype=np.complex64)
+
+        # FFT 계획 (range: chirp 별 axis=1, doppler: chirp 축 axis=0)
+        self.backend = backend or get_backend()
+        shape = self.spectrum.shape
+        self._range_plan = self.backend.plan(shape, np.complex64, 1)
+        self._doppler_plan = self.backend.plan(shape, np.complex64, 0)
+
+    # --------------------------------------------------
+    # 입력
+    # --------------------------------------------------
+    def frame_view(self, rx) -> np.ndarray:
+        """1차원 rx 버퍼 → (num_chirps, n_samples) view (가능하면 복사 없음)"""
+        return np.asarray(rx)[:self.total_samples].reshape(self.num_chirps, self.n_samples)
+
+    # --------------------------------------------------
+    # Range FFT
+    # --------------------------------------------------
+    def apply_range_window(self, frame: np.ndarray) -> np.ndarray:
+        """윈도우 적용 (+ zero padding) → self.spectrum"""
+        cols = self.in_cols
+        np.multiply(frame[:, :cols], self.range_window, out=self.spectrum[:, :cols])
+        if cols < self.fft_size:
+            self.spectrum[:, cols:] = 0
+        return self.spectrum
+
+    def range_fft_inplace(self) -> np.ndarray:
+        """apply_range_window() 결과에 chirp 별 FFT (self.spectrum 제자리)"""
+        return self._range_plan(self.spectrum)
+
+    def range_fft(self, frame: np.ndarray) -> np.ndarray:
+        """윈도우 적용 + chirp 별 FFT → self.spectrum (complex64)"""
+        self.apply_range_window(frame)
+        return self.range_fft_inplace()
+
+    def range_profile(self, frame: np.ndarray) -> np.ndarray:
+        """chirp 평균 range 크기 프로파일 → self.profile (float32)"""
+        self.range_fft(frame)
+        return self.spectrum_profile()
+
+    def spectrum_profile(self) -> np.ndarray:
+        """range_fft() 결과의 chirp 평균 크기 → self.profile (float32)"""
+        np.abs(self.spectrum, out=self.magnitude)
+        np.add.reduce(self.magnitude, axis=0, out=self.profile)
+        self.profile *= np.float32(1.0 / self.num_chirps)
+        return self.profile
+
+    # --------------------------------------------------
+    # Doppler FFT
+    # --------------------------------------------------
+    def doppler_from_spectrum(self, remove_static: bool = False) -> np.ndarray:
+        """
+        range_fft() 결과(self.spectrum)에 chirp 축 FFT 를 이어서 수행
+        → fftshift 된 |RD map| (self.magnitude, [doppler, range])
+        remove_static=True 이면 chirp 평균을 빼서 정지 클러터(0 Hz)를 제거 (MTI)
+        """
+        if remove_static:
+            np.mean(self.spectrum, axis=0, out=self._slow_mean)
+            self.spectrum -= self._slow_mean
+        self.spectrum *= self.doppler_window
+        self._doppler_plan(self.spectrum)
+
+        # fftshift(axis=0) 를 abs 출력 위치로 처리 (추가 할당 없음)
+        m = self.num_chirps
+        h = m // 2
+        np.abs(self.spectrum[:m - h], out=self.magnitude[h:])
+        np.abs(self.spectrum[m - h:], out=self.magnitude[:h])
+        return self.magnitude
+
+    def doppler_map(self, frame: np.ndarray) -> np.ndarray:
+        self.range_fft(frame)
+        return self.doppler_from_spectrum()
+
+    # --------------------------------------------------
+    # 마이크로 도플러 프로파일 (활동 분류 특징)
+    # --------------------------------------------------
+    def micro_doppler_profile(self, frame: np.ndarray, background: np.ndarray = None) -> np.ndarray:
+        """
+        활동 분류 학습(Micro_Doppler_Logger) 과 실시간 추론이 함께 쓰는 유일한 정의
+        (frame - 학습된 빈 방 complex 배경) → 윈도우 없는 range / Doppler FFT
+        → fftshift → |.| 의 range 축 합 → dB  →  [num_chirps] float32
+        background 는 빈 방 raw 프레임들의 complex 평균 [num_chirps, n_samples] (None 이면 빼지 않음).
+        프레임마다 chirp 평균을 빼는 MTI 와 달리 가만히 서 있는 사람의 반사도 남는다.
+        spectrum / magnitude 와 별도 버퍼를 쓰므로 range_fft() 결과를 덮어쓰지 않는다.
+        """
+        if not hasattr(self, "_md_spectrum"):
+            self._md_spectrum = np.zeros_like(self.spectrum)
+            self._md_magnitude = np.empty_like(self.magnitude)
+            self._md_profile = np.empty(self.num_chirps, dtype=np.float32)
+        sig = self._md_spectrum
+        cols = self.in_cols
+        if background is None:
+            sig[:, :cols] = frame[:, :cols]
+        else:
+            np.subtract(frame[:, :cols], background[:, :cols], out=sig[:, :cols])
+        if cols < self.fft_size:
+            sig[:, cols:] = 0
+        self._range_plan(sig)
+        self._doppler_plan(sig)
+
+        m = self.num_chirps
+        h = m // 2
+        np.abs(sig[:m - h], out=self._md_magnitude[h:])
+        np.abs(sig[m - h:], out=self._md_magnitude[:h])
+        profile = np.add.reduce(self._md_magnitude, axis=1, out=self._md_profile)
+        profile += np.float32(1e-9)
+        np.log10(profile, out=profile)
+        profile *= np.float32(20)
+        return profile
@@ -0,0 +1,188 @@
+"""
+FFT 백엔드 선택 계층
+
+    backend = get_backend()            # 환경변수 / 설치된 라이브러리로 자동 선택
+    plan = backend.plan(shape, dtype, axis)
+    plan(a)                            # a 를 제자리 FFT (결과가 a 에 기록됨)
+    y = backend.fft(x, axis=1)         # 일반 (out-of-place) FFT
+
+환경변수
+    FMCW_FFT_BACKEND  auto | scipy | fftw | numpy   (기본 auto: scipy → fftw → numpy)
+    FMCW_FFT_WORKERS  FFT 스레드 수 (기본: CPU 코어 수, Jetson Nano = 4)
+
+plan 은 (shape, dtype, axis) 별로 캐시되어 매 프레임 재사용된다.
+"""
+import os
+import threading
+
+import numpy as np
+
+try:
+    import scipy.fft as _scipy_fft
+except ImportError:
+    _scipy_fft = None
+
+try:
+    import pyfftw
+    import pyfftw.builders
+except ImportError:
+    pyfftw = None
+
+# NumPy 2.0 부터 np.fft 가 complex64 를 유지하고 out= 을 지원한다
+_NP_FFT_OUT = np.lib.NumpyVersion(np.__version__) >= "2.0.0"
+
+
+def default_workers() -> int:
+    value = os.environ.get("FMCW_FFT_WORKERS")
+    if value:
+        return max(1, int(value))
+    return os.cpu_count() or 1
+
+
+class FFTBackend:
+    """백엔드 공통: plan 캐시 관리"""
+    name = "base"
+
+    def __init__(self, workers: int = None):
+        self.workers = workers or default_workers()
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    def plan(self, shape, dtype, axis: int):
+        key = (tuple(shape), np.dtype(dtype).str, axis)
+        plan = self._plans.get(key)
+        if plan is None:
+            with self._lock:
+                plan = self._plans.get(key)
+                if plan is None:
+                    plan = self._make_plan(tuple(shape), np.dtype(dtype), axis)
+                    self._plans[key] = plan
+        return plan
+
+    def fft_inplace(self, a: np.ndarray, axis: int) -> np.ndarray:
+        return self.plan(a.shape, a.dtype, axis)(a)
+
+    def _make_plan(self, shape, dtype, axis):
+        raise NotImplementedError
+
+    def fft(self, x, axis: int = -1):
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"<FFTBackend {self.name} workers={self.workers}>"
+
+
+class NumpyBackend(FFTBackend):
+    """기본 np.fft (단일 스레드)"""
+    name = "numpy"
+
+    def __init__(self, workers: int = None):
+        super().__init__(workers=1)
+
+    def _make_plan(self, shape, dtype, axis):
+        def run(a):
+            if _NP_FFT_OUT:
+                return np.fft.fft(a, axis=axis, out=a)
+            a[...] = np.fft.fft(a, axis=axis)
+            return a
+        return run
+
+    def fft(self, x, axis: int = -1):
+        return np.fft.fft(x, axis=axis)
+
+
+class ScipyBackend(FFTBackend):
+    """scipy.fft (pocketfft) - workers 로 배치 FFT 멀티스레드, complex64 유지"""
+    name = "scipy"
+
+    def _make_plan(self, shape, dtype, axis):
+        fft = _scipy_fft.fft
+        workers = self.workers
+
+        def run(a):
+            res = fft(a, axis=axis, overwrite_x=True, workers=workers)
+            if res is not a and not (res.ctypes.data == a.ctypes.data
+                                     and res.strides == a.strides):
+                a[...] = res
+            return a
+        return run
+
+    def fft(self, x, axis: int = -1):
+        return _scipy_fft.fft(x, axis=axis, workers=self.workers)
+
+
+class FFTWBackend(FFTBackend):
+    """pyFFTW - FFTW_MEASURE 로 계획을 세운 멀티스레드 FFT"""
+    name = "fftw"
+
+    def __init__(self, workers: int = None, planner_effort: str = "FFTW_MEASURE"):
+        super().__init__(workers)
+        self.planner_effort = planner_effort
+
+    def _make_plan(self, shape, dtype, axis):
+        buf = pyfftw.empty_aligned(shape, dtype=dtype)
+        fftw = pyfftw.builders.fft(buf, axis=axis, overwrite_input=True,
+                                   threads=self.workers,
+                                   planner_effort=self.planner_effort)
+
+        def run(a):
+            # 정렬된 내부 버퍼로 입력 복사 → 실행 → 결과를 a 에 기록
+            a[...] = fftw(a)
+            return a
+        return run
+
+    def fft(self, x, axis: int = -1):
+        x = np.asarray(x)
+        if not np.iscomplexobj(x):
+            x = x.astype(np.complex128)
+        out = np.array(x, copy=True)
+        return self.fft_inplace(out, axis)
+
+
+_BACKENDS = {
+    "numpy": NumpyBackend,
+    "scipy": ScipyBackend,
+    "fftw": FFTWBackend,
+}
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def available_backends():
+    names = ["numpy"]
+    if _scipy_fft is not None:
+        names.append("scipy")
+    if pyfftw is not None:
+        names.append("fftw")
+    return names
+
+
+def make_backend(name: str = "auto", workers: int = None) -> FFTBackend:
+    name = (name or "auto").lower()
+    if name == "auto":
+        if _scipy_fft is not None:
+            name = "scipy"
+        elif pyfftw is not None:
+            name = "fftw"
+        else:
+            name = "numpy"
+    if name not in available_backends():
+        print(f"⚠️ [FFT] '{name}' 백엔드 사용 불가 → numpy")
+        name = "numpy"
+    return _BACKENDS[name](workers=workers)
+
+
+def get_backend() -> FFTBackend:
+    """프로세스 공용 기본 백엔드 (FMCW_FFT_BACKEND / FMCW_FFT_WORKERS)"""
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = make_backend(os.environ.get("FMCW_FFT_BACKEND", "auto"))
+    return _default
+
+
+def set_backend(backend: FFTBackend):
+    global _default
+    _default = backend
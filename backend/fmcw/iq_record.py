@@ -0,0 +1,288 @@
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+# ------------------------------------------------------
+# 파일 구조
+#   [헤더 HEADER_SIZE 바이트]
+#       magic(8s) version(I) n_records(Q) meta_len(I) + meta JSON
+#   [레코드 x n_records]
+#       timestamp(f8) seq(u8) iq(c8 x rx_buffer_size)
+# ------------------------------------------------------
+IQ_MAGIC = b"PLUTOIQ1"
+IQ_VERSION = 1
+HEADER_SIZE = 4096
+_HEADER = struct.Struct("<8sIQI")
+
+# 메타데이터로 남길 SDR 속성
+SDR_META_ATTRS = (
+    "sample_rate",
+    "rx_lo",
+    "tx_lo",
+    "rx_rf_bandwidth",
+    "tx_rf_bandwidth",
+    "rx_buffer_size",
+    "gain_control_mode_chan0",
+    "rx_hardwaregain_chan0",
+    "tx_hardwaregain_chan0",
+)
+
+
+def record_dtype(buffer_size: int) -> np.dtype:
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("seq", "<u8"),
+        ("iq", "<c8", (int(buffer_size),)),
+    ])
+
+
+def sdr_metadata(sdr, **extra) -> dict:
+    """SDR 현재 설정 + chirp 파라미터 등 추가 정보"""
+    meta = {}
+    for attr in SDR_META_ATTRS:
+        try:
+            value = getattr(sdr, attr)
+        except Exception:
+            continue
+        meta[attr] = value if isinstance(value, str) else float(value)
+    meta.update(extra)
+    meta.setdefault("created", time.time())
+    return meta
+
+
+def _write_header(f, n_records: int, meta: dict):
+    body = json.dumps(meta).encode("utf-8")
+    if _HEADER.size + len(body) > HEADER_SIZE:
+        raise ValueError("IQ 메타데이터가 너무 큽니다")
+    f.seek(0)
+    f.write(_HEADER.pack(IQ_MAGIC, IQ_VERSION, n_records, len(body)))
+    f.write(body)
+    f.write(b"\0" * (HEADER_SIZE - _HEADER.size - len(body)))
+
+
+def read_header(path: str):
+    """(meta, n_records) 반환"""
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_SIZE)
+    magic, version, n_records, meta_len = _HEADER.unpack_from(raw, 0)
+    if magic != IQ_MAGIC:
+        raise ValueError(f"IQ 녹화 파일이 아닙니다: {path}")
+    meta = json.loads(raw[_HEADER.size:_HEADER.size + meta_len].decode("utf-8"))
+    return meta, n_records
+
+
+class IQRecorder:
+    """
+    sdr.rx() 버퍼를 memory-mapped 파일에 그대로 이어 붙이는 녹화기
+    - 파일은 grow_records 단위로 늘리고 np.memmap 에 직접 복사 (append-only)
+    - close() 시 실제 레코드 수만큼 잘라내고 헤더의 n_records 갱신
+    """
+    def __init__(self, path: str, buffer_size: int, meta: dict = None,
+                 grow_records: int = 64):
+        self.path = path
+        self.buffer_size = int(buffer_size)
+        self.meta = dict(meta or {})
+        self.meta["rx_buffer_size"] = float(self.buffer_size)
+        self.grow_records = grow_records
+        self.dtype = record_dtype(self.buffer_size)
+
+        self.count = 0
+        self._capacity = 0
+        self._map = None
+
+        with open(self.path, "wb") as f:
+            _write_header(f, 0, self.meta)
+        self._grow()
+
+    def _grow(self):
+        if self._map is not None:
+            self._map.flush()
+            del self._map
+        self._capacity += self.grow_records
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self._capacity * self.dtype.itemsize)
+        self._map = np.memmap(self.path, dtype=self.dtype, mode="r+",
+                              offset=HEADER_SIZE, shape=(self._capacity,))
+
+    def append(self, iq, timestamp: float = None):
+        data = np.asarray(iq)
+        if data.size != self.buffer_size:
+            # 짧게 읽힌 버퍼는 녹화하지 않는다 (재생 시 reshape 실패 방지)
+            return False
+        if self.count >= self._capacity:
+            self._grow()
+        rec = self._map[self.count]
+        rec["timestamp"] = time.time() if timestamp is None else timestamp
+        rec["seq"] = self.count
+        rec["iq"] = data
+        self.count += 1
+        return True
+
+    def flush(self):
+        if self._map is not None:
+            self._map.flush()
+        with open(self.path, "r+b") as f:
+            _write_header(f, self.count, self.meta)
+
+    def close(self):
+        if self._map is None:
+            return
+        self._map.flush()
+        del self._map
+        self._map = None
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+            _write_header(f, self.count, self.meta)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RecordingSDR:
+    """
+    SDR 래퍼: 설정/송신은 그대로 전달하고 rx() 결과만 IQRecorder 로 복사
+    - 녹화 파일은 첫 rx() 시점에 그 순간의 SDR 설정으로 생성
+    """
+    def __init__(self, sdr, path: str, **meta_extra):
+        object.__setattr__(self, "_sdr", sdr)
+        object.__setattr__(self, "_path", path)
+        object.__setattr__(self, "_meta_extra", meta_extra)
+        object.__setattr__(self, "recorder", None)
+
+    def __getattr__(self, name):
+        return getattr(self._sdr, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._sdr, name, value)
+
+    def rx(self):
+        data = self._sdr.rx()
+        if self.recorder is None:
+            meta = sdr_metadata(self._sdr, **self._meta_extra)
+            recorder = IQRecorder(self._path, len(data), meta)
+            object.__setattr__(self, "recorder", recorder)
+        self.recorder.append(data)
+        return data
+
+    def rx_destroy_buffer(self):
+        if self.recorder is not None:
+            self.recorder.flush()
+        self._sdr.rx_destroy_buffer()
+
+    def close(self):
+        if self.recorder is not None:
+            self.recorder.close()
+
+
+class IQReplay:
+    """
+    녹화 파일을 SDR 처럼 재생하는 소스 (adi.Pluto / PlutoInterface 대체)
+    - rx() 는 memmap 레코드의 view 를 그대로 반환 (복사 없음)
+    - 설정 속성 쓰기는 무시, 읽기는 녹화 당시 값
+    - 끝에 도달하면 빈 배열 반환 (loop=True 면 처음부터 반복)
+    - realtime=True 면 녹화된 timestamp 간격대로 재생
+    """
+    def __init__(self, path: str, loop: bool = False, realtime: bool = False):
+        self.path = path
+        self.meta, self.count = read_header(path)
+        self.buffer_size = int(self.meta["rx_buffer_size"])
+        self.loop = loop
+        self.realtime = realtime
+
+        dtype = record_dtype(self.buffer_size)
+        if self.count:
+            self._records = np.memmap(path, dtype=dtype, mode="r",
+                                      offset=HEADER_SIZE, shape=(self.count,))
+        else:
+            self._records = np.zeros(0, dtype=dtype)
+
+        self.position = 0
+        self._t0_wall = None
+        self._t0_rec = None
+
+    # adi.Pluto 호환 속성 (읽기 전용 취급)
+    def __getattr__(self, name):
+        meta = self.__dict__.get("meta", {})
+        if name in meta:
+            return meta[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        if name in SDR_META_ATTRS or name == "tx_cyclic_buffer":
+            return
+        object.__setattr__(self, name, value)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._records["timestamp"]
+
+    def record(self, index: int) -> np.ndarray:
+        return self._records["iq"][index]
+
+    def tx(self, samples):
+        pass
+
+    def tx_destroy_buffer(self):
+        pass
+
+    def rx_destroy_buffer(self):
+        pass
+
+    def rewind(self):
+        self.position = 0
+        self._t0_wall = None
+
+    def _pace(self, index: int):
+        ts = float(self._records["timestamp"][index])
+        now = time.perf_counter()
+        if self._t0_wall is None or index == 0:
+            self._t0_wall, self._t0_rec = now, ts
+            return
+        delay = (ts - self._t0_rec) - (now - self._t0_wall)
+        if delay > 0:
+            time.sleep(delay)
+
+    def rx(self) -> np.ndarray:
+        if self.position >= self.count:
+            if not self.loop or self.count == 0:
+                return np.zeros(0, dtype=np.complex64)
+            self.rewind()
+
+        index = self.position
+        self.position += 1
+        if self.realtime:
+            self._pace(index)
+        return self._records["iq"][index]
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self._records["iq"][index]
+
+    def close(self):
+        self._records = np.zeros(0, dtype=self._records.dtype)
+        self.count = 0
+
+
+def parse_replay_uri(uri: str) -> dict:
+    """
+    "replay:" URI 파싱
+    예) replay:/data/walk.iq,loop,realtime
+    """
+    spec = uri.split(":", 1)[1]
+    parts = [p.strip() for p in spec.split(",")]
+    opts = {"path": os.path.expanduser(parts[0])}
+    for token in parts[1:]:
+        if token == "loop":
+            opts["loop"] = True
+        elif token == "realtime":
+            opts["realtime"] = True
+    return opts
@@ -1,7 +1,65 @@
 import numpy as np
-import adi
+import os
 import time
 
+try:
+    import adi
+    HAS_HARDWARE = True
+except ImportError:
+    HAS_HARDWARE = False
+
+from .sim_pluto import SimulatedPluto, parse_sim_uri
+from .iq_record import IQReplay, RecordingSDR, parse_replay_uri
+
+SIM_PREFIX = "sim:"
+REPLAY_PREFIX = "replay:"
+
+
+def open_pluto(uri: str, record_to: str = None, **sim_kwargs):
+    """
+    adi.Pluto 대신 쓰는 공용 진입점
+    - "replay:<파일>[,loop][,realtime]" → 녹화 파일 재생 (IQReplay)
+    - "sim:..." URI 이거나 pyadi-iio 가 없으면 SimulatedPluto 반환
+      (pyadi-iio 가 없어 대신 쓰는 경우는 실제 장치처럼 버퍼 주기에 맞춰 대기)
+    - 그 외에는 실제 adi.Pluto(uri)
+    - record_to (또는 환경변수 PLUTO_RECORD) 를 주면 rx() 버퍼를 IQ 파일로 녹화
+      모드 전환 / 재연결 / 장치 여러 대가 같은 경로로 열 때 이전 녹화를 덮어쓰지 않도록
+      이미 있는 파일이면 "<이름>-1.iq", "<이름>-2.iq" ... 처럼 번호를 붙인 새 파일에 기록
+    """
+    if uri.startswith(REPLAY_PREFIX):
+        return IQReplay(**parse_replay_uri(uri))
+
+    if uri.startswith(SIM_PREFIX) or not HAS_HARDWARE:
+        if not uri.startswith(SIM_PREFIX):
+            print(f"⚠️ [Pluto] pyadi-iio 없음 → 시뮬레이터 사용 ({uri})")
+            uri = SIM_PREFIX + "realtime"
+        opts = parse_sim_uri(uri)
+        opts.update(sim_kwargs)
+        sdr = SimulatedPluto(uri, **opts)
+    else:
+        sdr = adi.Pluto(uri)
+
+    record_to = record_to or os.environ.get("PLUTO_RECORD")
+    if record_to:
+        record_to = _claim_record_path(record_to)
+        print(f"⏺ [Pluto] IQ 녹화 → {record_to}")
+        sdr = RecordingSDR(sdr, record_to, uri=uri)
+    return sdr
+
+
+def _claim_record_path(path: str) -> str:
+    """아직 없는 녹화 파일 경로를 골라 빈 파일로 선점 (동시에 여러 개 열어도 겹치지 않음)"""
+    root, ext = os.path.splitext(path)
+    n = 0
+    while True:
+        candidate = path if n == 0 else f"{root}-{n}{ext}"
+        try:
+            os.close(os.open(candidate, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return candidate
+        except FileExistsError:
+            n += 1
+
+
 class PlutoInterface:
     """
     Hardware interface for Pluto SDR.
@@ -12,7 +70,7 @@ class PlutoInterface:
 
     def connect(self):
         print(f"[Pluto] Connecting to {self.uri} ...")
-        self.sdr = adi.Pluto(self.uri)
+        self.sdr = open_pluto(self.uri)
         print("[Pluto] Connected.")
 
     def configure_common(self, sample_rate: float):
@@ -34,12 +92,15 @@ class PlutoInterface:
         self.sdr.tx(samples)
 
     def rx(self) -> np.ndarray:
-        return np.array(self.sdr.rx(), dtype=np.complex64)
+        # 이미 complex64 면 복사하지 않음 (IQReplay memmap view 그대로 전달)
+        return np.asarray(self.sdr.rx(), dtype=np.complex64)
 
     def close(self):
         try:
             self.sdr.rx_destroy_buffer()
         except Exception:
             pass
+        if isinstance(self.sdr, (RecordingSDR, IQReplay)):
+            self.sdr.close()
         self.sdr = None
         time.sleep(0.05)
\ No newline at end of file
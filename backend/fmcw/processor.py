@@ -1,4 +1,4 @@
-import numpy as np
+from .dsp_engine import RangeDopplerEngine
 
 class FMCWProcessor:
     """
@@ -10,6 +10,8 @@ class FMCWProcessor:
         self.fft_size = cfg.fft_size
         # 한 Chirp당 샘플 수 (버퍼 크기 / 첩 개수)
         self.samples_per_chirp = int(cfg.rx_buffer_size / cfg.num_chirps)
+        # 윈도우/작업 버퍼 재사용 엔진 (complex64, 제자리 연산)
+        self.engine = RangeDopplerEngine(self.num_chirps, self.samples_per_chirp, self.fft_size)
 
     def collect_frame(self, pluto, chirp):
         """
@@ -30,18 +32,7 @@ class FMCWProcessor:
     def doppler_fft(self, frame):
         """
         2D FFT 수행 (Range-Doppler Map 생성)
+        - Hanning Window (거리/속도 양방향) 로 사이드로브 억제
+        - 반환값은 엔진 내부 버퍼 (다음 프레임에서 덮어씀)
         """
-        # 1. Range FFT (거리) - 가로 방향
-        # Hanning Window를 적용하여 사이드로브 억제
-        win_range = np.hanning(frame.shape[1])
-        range_profile = np.fft.fft(frame * win_range, n=self.fft_size, axis=1)
-        
-        # 2. Doppler FFT (속도) - 세로 방향
-        win_doppler = np.hanning(self.num_chirps)
-        # Broadcasting을 위해 차원 맞춤
-        win_doppler = win_doppler.reshape(-1, 1)
-        
-        doppler_map = np.fft.fft(range_profile * win_doppler, axis=0)
-        doppler_map = np.fft.fftshift(doppler_map, axes=0)
-        
-        return np.abs(doppler_map)
+        return self.engine.doppler_map(frame)
@@ -0,0 +1,182 @@
+"""
+라벨이 붙은 프로파일(마이크로 도플러 등) 기록 - 백그라운드 writer 스레드
+
+    writer = ProfileLogWriter("micro_doppler_walk_stand", n_bins=128)
+    writer.write(label, profile_db)      # 수신 루프: 큐에 넣기만 함 (파일 I/O 없음)
+    writer.close()                       # 남은 행 기록 후 스레드 종료
+
+디렉터리 구조 (열 단위 청크, 시간순 정렬되는 파일명)
+    <dir>/chunk_<세션 시작 시각>_<번호>.npz
+        label      int16   [rows]          (-1 = 라벨 없음)
+        timestamp  float64 [rows]          UNIX 시각
+        profile    float32 [rows, n_bins]
+
+기존 CSV 도구용으로 export_csv() 제공 (label, doppler_0 .. doppler_{n-1}).
+"""
+import csv
+import glob
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+CHUNK_PATTERN = "chunk_*.npz"
+
+
+class ProfileLogWriter:
+    def __init__(self, directory: str, n_bins: int, chunk_rows: int = 512,
+                 flush_interval: float = 2.0, queue_size: int = 4096):
+        self.directory = directory
+        self.n_bins = int(n_bins)
+        self.chunk_rows = int(chunk_rows)
+        self.flush_interval = flush_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._session = time.strftime("%Y%m%d-%H%M%S")
+        self._chunk_index = 0
+
+        # 청크 버퍼 (writer 스레드 전용)
+        self._labels = np.empty(self.chunk_rows, dtype=np.int16)
+        self._timestamps = np.empty(self.chunk_rows, dtype=np.float64)
+        self._profiles = np.empty((self.chunk_rows, self.n_bins), dtype=np.float32)
+        self._rows = 0
+
+        self.written = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="profile-log", daemon=True)
+        self._thread.start()
+
+    # --------------------------------------------------
+    # 생산자 (수신 루프)
+    # --------------------------------------------------
+    def write(self, label: int, profile, timestamp: float = None) -> bool:
+        """행 1개를 큐에 넣음. 큐가 가득 차면 버리고 False (수신 루프는 절대 멈추지 않음)"""
+        row = (
+            -1 if label is None else int(label),
+            time.time() if timestamp is None else float(timestamp),
+            np.array(profile, dtype=np.float32, copy=True),
+        )
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 10.0):
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --------------------------------------------------
+    # writer 스레드
+    # --------------------------------------------------
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                row = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                row = False
+
+            if row is None:
+                self._flush()
+                return
+
+            if row is not False:
+                label, timestamp, profile = row
+                i = self._rows
+                self._labels[i] = label
+                self._timestamps[i] = timestamp
+                self._profiles[i] = profile[:self.n_bins]
+                self._rows += 1
+
+            now = time.monotonic()
+            if self._rows >= self.chunk_rows or (
+                self._rows and now - last_flush >= self.flush_interval
+            ):
+                self._flush()
+                last_flush = now
+
+    def _flush(self):
+        rows = self._rows
+        if rows == 0:
+            return
+        name = f"chunk_{self._session}_{self._chunk_index:05d}.npz"
+        path = os.path.join(self.directory, name)
+        tmp = path + ".tmp.npz"
+        try:
+            np.savez(
+                tmp,
+                label=self._labels[:rows],
+                timestamp=self._timestamps[:rows],
+                profile=self._profiles[:rows],
+            )
+            os.replace(tmp, path)
+            self.written += rows
+            self._chunk_index += 1
+        except Exception as e:
+            print(f"\n⚠️ [Log] 청크 저장 실패 ({path}): {e}")
+        self._rows = 0
+
+
+# ------------------------------------------------------
+# 읽기 / 내보내기
+# ------------------------------------------------------
+def chunk_paths(directory: str):
+    return sorted(glob.glob(os.path.join(directory, CHUNK_PATTERN)))
+
+
+def iter_chunks(directory: str):
+    """청크 단위로 (label, timestamp, profile) 반환"""
+    for path in chunk_paths(directory):
+        with np.load(path) as data:
+            yield data["label"], data["timestamp"], data["profile"]
+
+
+def load_log(directory: str):
+    """전체 기록을 (label, timestamp, profile) 배열로 합쳐서 반환"""
+    labels, timestamps, profiles = [], [], []
+    for label, timestamp, profile in iter_chunks(directory):
+        labels.append(label)
+        timestamps.append(timestamp)
+        profiles.append(profile)
+    if not labels:
+        return (np.zeros(0, dtype=np.int16), np.zeros(0),
+                np.zeros((0, 0), dtype=np.float32))
+    return np.concatenate(labels), np.concatenate(timestamps), np.concatenate(profiles)
+
+
+def export_csv(directory: str, csv_path: str, with_timestamp: bool = False,
+               append: bool = False) -> int:
+    """
+    기존 형식 CSV 로 내보내기 (label, doppler_0 ..)
+    with_timestamp=True 면 label 다음에 timestamp 열 추가
+    반환: 기록한 행 수
+    """
+    rows = 0
+    write_header = not (append and os.path.exists(csv_path))
+    with open(csv_path, "a" if append else "w", newline="") as f:
+        writer = csv.writer(f)
+        for label, timestamp, profile in iter_chunks(directory):
+            if write_header:
+                header = ["label"] + (["timestamp"] if with_timestamp else [])
+                header += [f"doppler_{i}" for i in range(profile.shape[1])]
+                writer.writerow(header)
+                write_header = False
+            for i in range(len(label)):
+                row = [int(label[i])]
+                if with_timestamp:
+                    row.append(f"{timestamp[i]:.6f}")
+                row.extend(profile[i].tolist())
+                writer.writerow(row)
+            rows += len(label)
+    return rows
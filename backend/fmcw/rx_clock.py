@@ -0,0 +1,85 @@
+"""
+수신 버퍼 번호 / 캡처 시각 / 누락(overrun) 추정
+
+Pluto 는 rx_buffer_size / sample_rate 초마다 버퍼 1개를 채우고, 커널 큐(기본 4개)가
+가득 찬 상태에서 처리가 밀리면 새 버퍼를 버린다. 호스트는 이를 알려주지 않으므로
+sdr.rx() 가 돌아온 시각과 예상 주기를 비교해 하드웨어가 만든 버퍼 수를 추정한다.
+
+    clock = RxClock(sample_rate, rx_buffer_size, mode="FMCW", uri=ip)
+    rx = sdr.rx()
+    stamp = clock.tick()      # {"seq", "capture_time", "dropped", "overruns"}
+    ...
+    clock.discard()           # 짧은 버퍼 / 처리 실패로 결과 없이 버린 경우
+    clock.reset()             # 캘리브레이션 등으로 수신이 끊겼다 다시 시작할 때
+
+seq 는 하드웨어 버퍼 번호 추정값이라 누락된 만큼 건너뛴다 (클라이언트가 seq 차이로 손실 확인).
+rx() 가 블로킹으로 돌아오는 순간 = 그 버퍼가 다 찬 순간이므로, 기준 시각은
+"이 시각보다 늦을 수 없다" 는 조건으로만 앞당겨 맞춘다 (밀린 버퍼가 몰려 나올 때도 안전).
+"""
+import time
+
+from .metrics import REGISTRY
+
+# libiio 기본 커널 버퍼 수 (이만큼은 처리가 밀려도 잃지 않음)
+KERNEL_BUFFERS = 4
+
+
+class RxClock:
+    def __init__(self, sample_rate: float, buffer_size: int,
+                 kernel_buffers: int = KERNEL_BUFFERS, tolerance: float = 0.5, **labels):
+        self.period = float(buffer_size) / float(sample_rate)
+        self.kernel_buffers = kernel_buffers
+        self.tolerance = tolerance      # 주기 지터 허용 (주기 단위)
+
+        self.seq = -1
+        self.dropped = 0                # 추정 누락 + 버린 버퍼 (누적)
+        self.overruns = 0               # 누락이 발생한 횟수
+        self._t0 = None                 # 버퍼 0 이 다 찬 시각 (monotonic)
+        self._n = 0                     # 마지막 버퍼의 하드웨어 번호 (reset 이후)
+        self._wall = 0.0                # monotonic → UNIX 시각 변환 오프셋
+
+        self.m_buffers = REGISTRY.counter(
+            "radar_rx_buffers_total", "수신한 rx 버퍼 수", **labels)
+        self.m_dropped = REGISTRY.counter(
+            "radar_rx_dropped_total", "누락(overrun 추정) 또는 버린 rx 버퍼 수", **labels)
+        self.m_overruns = REGISTRY.counter(
+            "radar_rx_overruns_total", "처리가 밀려 하드웨어 버퍼가 넘친 횟수 (추정)", **labels)
+
+    def reset(self):
+        """수신이 끊겼다 재개될 때 (seq / 누적 값은 유지, 기준 시각만 다시 잡음)"""
+        self._t0 = None
+
+    def tick(self, now: float = None) -> dict:
+        """sdr.rx() 직후 호출 → 이 버퍼의 stamp"""
+        now = time.monotonic() if now is None else now
+        self.seq += 1
+        self.m_buffers.inc()
+        if self._t0 is None:
+            self._t0 = now
+            self._n = 0
+            self._wall = time.time() - now
+        else:
+            self._n += 1
+            # 버퍼 n 은 now 이전에 다 찼어야 함 → 기준 시각은 그보다 늦을 수 없다
+            self._t0 = min(self._t0, now - self._n * self.period)
+            produced = int((now - self._t0) / self.period - self.tolerance)
+            backlog = produced - self._n
+            if backlog > self.kernel_buffers:
+                lost = backlog - self.kernel_buffers
+                self._n += lost
+                self.seq += lost
+                self.dropped += lost
+                self.overruns += 1
+                self.m_dropped.inc(lost)
+                self.m_overruns.inc()
+        return {
+            "seq": self.seq,
+            "capture_time": self._wall + self._t0 + self._n * self.period,
+            "dropped": self.dropped,
+            "overruns": self.overruns,
+        }
+
+    def discard(self):
+        """마지막 tick 의 버퍼를 결과 없이 버림"""
+        self.dropped += 1
+        self.m_dropped.inc()
@@ -0,0 +1,177 @@
+"""
+Pluto 연결 공유 세션
+
+모드 전환(CW ↔ FMCW) 때마다 연결을 끊고 새로 여는 대신
+하나의 연결을 유지한 채 달라진 설정만 다시 기록한다.
+
+    session = get_session("ip:192.168.2.1")
+    sdr = session.open()
+    session.configure({"rx_lo": ..., "rx_buffer_size": ...})   # 바뀐 속성만 기록
+    session.set_tx(key, make_waveform)                          # 같은 파형이면 생략
+    session.store_calibration(kind, config, state) / session.calibration(kind, config)
+
+캘리브레이션은 메모리(이 프로세스에서 검증됨)와 디스크(CalibrationStore)에 함께 저장된다.
+"""
+import threading
+
+from .calib_store import CalibrationStore, config_hash
+from .pluto_iface import open_pluto
+
+# 값이 바뀌면 기존 버퍼를 버려야 새 설정이 적용되는 속성
+_RX_BUFFER_ATTRS = ("rx_buffer_size",)
+
+
+class SDRSession:
+    def __init__(self, uri: str, opener=open_pluto, store: CalibrationStore = None):
+        self.uri = uri
+        self._opener = opener
+        self.store = store
+        self.sdr = None
+
+        # 마지막으로 기록한 설정 (읽어오면 반올림 등으로 값이 달라질 수 있으므로 쓴 값을 기억)
+        self._applied = {}
+        self._tx_key = None
+        self._waveforms = {}
+        self._calibrations = {}
+        self.lock = threading.RLock()
+
+    # --------------------------------------------------
+    # 연결
+    # --------------------------------------------------
+    @property
+    def is_open(self) -> bool:
+        return self.sdr is not None
+
+    def open(self):
+        with self.lock:
+            if self.sdr is None:
+                print(f">>> [Session] PlutoSDR({self.uri}) 연결")
+                self.sdr = self._opener(self.uri)
+                self._applied.clear()
+                self._tx_key = None
+                # 이전 프로세스가 남긴 버퍼 정리
+                self._destroy("tx_destroy_buffer")
+                self._destroy("rx_destroy_buffer")
+            return self.sdr
+
+    def close(self):
+        with self.lock:
+            if self.sdr is None:
+                return
+            self._destroy("tx_destroy_buffer")
+            self._destroy("rx_destroy_buffer")
+            if hasattr(self.sdr, "close"):
+                try:
+                    self.sdr.close()
+                except Exception:
+                    pass
+            self.sdr = None
+            self._applied.clear()
+            self._tx_key = None
+
+    def _destroy(self, name: str):
+        try:
+            getattr(self.sdr, name)()
+        except Exception:
+            pass
+
+    # --------------------------------------------------
+    # 설정
+    # --------------------------------------------------
+    def configure(self, settings: dict) -> list:
+        """
+        settings 의 순서대로 기록하되 이미 같은 값이면 건너뜀
+        반환: 실제로 기록한 속성 이름 목록
+        """
+        with self.lock:
+            sdr = self.open()
+            changed = []
+            for name, value in settings.items():
+                if name in self._applied and self._applied[name] == value:
+                    continue
+                if name in _RX_BUFFER_ATTRS:
+                    self._destroy("rx_destroy_buffer")
+                setattr(sdr, name, value)
+                self._applied[name] = value
+                changed.append(name)
+            if changed:
+                print(f"🔧 [Session] 설정 변경: {', '.join(changed)}")
+            return changed
+
+    def set_tx(self, key, factory):
+        """
+        cyclic TX 파형 설정. key 가 현재 송신 중인 파형과 같으면 아무것도 하지 않는다.
+        factory() 결과는 key 별로 캐시된다.
+        """
+        with self.lock:
+            sdr = self.open()
+            if key == self._tx_key:
+                return False
+            waveform = self._waveforms.get(key)
+            if waveform is None:
+                waveform = factory()
+                self._waveforms[key] = waveform
+            self._destroy("tx_destroy_buffer")
+            sdr.tx_cyclic_buffer = True
+            sdr.tx(waveform)
+            self._tx_key = key
+            return True
+
+    # --------------------------------------------------
+    # 캘리브레이션 캐시
+    # --------------------------------------------------
+    def calibration(self, kind: str, config: dict):
+        """
+        (state, verified) 반환
+        - verified=True  : 이 프로세스에서 학습/검증한 값 → 그대로 사용
+        - verified=False : 디스크에서 읽은 값 → 호출자가 간단히 확인 후 사용
+        - 없으면 (None, False)
+        """
+        key = (kind, config_hash(config))
+        state = self._calibrations.get(key)
+        if state is not None:
+            return state, True
+        if self.store is not None:
+            state = self.store.load(kind, config)
+            if state is not None:
+                return state, False
+        return None, False
+
+    def store_calibration(self, kind: str, config: dict, state, persist: bool = True):
+        self._calibrations[(kind, config_hash(config))] = state
+        if persist and self.store is not None:
+            try:
+                self.store.save(kind, config, state)
+            except Exception as e:
+                print(f"⚠️ [Session] 캘리브레이션 저장 실패: {e}")
+
+    def forget_calibration(self, kind: str = None, config: dict = None):
+        if kind is None:
+            self._calibrations.clear()
+            return
+        self._calibrations.pop((kind, config_hash(config)), None)
+        if self.store is not None:
+            self.store.remove(kind, config)
+
+
+# ------------------------------------------------------
+# URI 별 공용 세션
+# ------------------------------------------------------
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(uri: str) -> SDRSession:
+    with _sessions_lock:
+        session = _sessions.get(uri)
+        if session is None:
+            session = SDRSession(uri, store=CalibrationStore())
+            _sessions[uri] = session
+        return session
+
+
+def close_all():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
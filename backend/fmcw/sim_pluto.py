@@ -0,0 +1,256 @@
+import time
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+
+C = 3e8
+REF_RANGE = 2.0  # SimTarget.amplitude 기준 거리 (m)
+
+
+@dataclass
+class SimTarget:
+    """
+    시뮬레이션 점 표적
+    - range_min ~ range_max 사이를 speed(m/s)로 왕복 (같으면 정지 표적)
+    - micro_amp / micro_hz : 팔다리 흔들림 같은 미세 운동 (micro-Doppler)
+    - amplitude : REF_RANGE 에서의 수신 진폭 (거리 제곱에 반비례)
+    """
+    range_min: float = 2.0
+    range_max: float = 6.0
+    speed: float = 1.0
+    amplitude: float = 60.0
+    micro_amp: float = 0.0
+    micro_hz: float = 1.5
+    phase0: float = 0.0
+
+    def ranges(self, t: np.ndarray) -> np.ndarray:
+        """시각 t(초) 배열에 대한 거리(m)"""
+        span = self.range_max - self.range_min
+        if span <= 0 or self.speed == 0:
+            r = np.full(t.shape, self.range_min, dtype=np.float64)
+        else:
+            # 삼각파 왕복 운동
+            u = np.mod(t * abs(self.speed) + self.phase0 * span, 2 * span)
+            r = self.range_min + np.where(u < span, u, 2 * span - u)
+        if self.micro_amp:
+            r = r + self.micro_amp * np.sin(2 * np.pi * self.micro_hz * t)
+        return r
+
+    def amplitudes(self, r: np.ndarray) -> np.ndarray:
+        return self.amplitude * (REF_RANGE / np.maximum(r, 0.5)) ** 2
+
+
+def default_scene() -> List[SimTarget]:
+    """정지 클러터 2개 + 걷는 사람 1명"""
+    return [
+        SimTarget(range_min=1.0, range_max=1.0, speed=0.0, amplitude=300.0),
+        SimTarget(range_min=4.5, range_max=4.5, speed=0.0, amplitude=80.0),
+        SimTarget(range_min=2.0, range_max=6.0, speed=1.0, amplitude=60.0,
+                  micro_amp=0.05, micro_hz=1.8),
+    ]
+
+
+class SimulatedPluto:
+    """
+    adi.Pluto 대체용 하드웨어 없는 가상 SDR
+    - adi.Pluto 와 같은 속성(sample_rate, rx_lo, rx_buffer_size, ...)과
+      tx() / rx() / *_destroy_buffer() 를 제공
+    - tx() 로 받은 파형을 분석해 FMCW(chirp) / CW(tone) 를 자동 판별
+    - FMCW: 표적마다 dechirp 된 beat 신호 (chirp 간 위상 회전 = Doppler)
+    - CW  : 송신 톤 + Doppler 편이된 반사 신호
+    - realtime=True 면 rx() 가 실제 버퍼 주기(rx_buffer_size / sample_rate)에 맞춰 대기
+    """
+    def __init__(self, uri: str = "sim:", targets: List[SimTarget] = None,
+                 noise_std: float = 4.0, realtime: bool = False, seed: int = None,
+                 chirp_bandwidth: float = 50e6, chirp_duration: float = 1e-4,
+                 samples_per_chirp: int = 1024):
+        self.uri = uri
+        self.targets = default_scene() if targets is None else list(targets)
+        self.noise_std = noise_std
+        self.realtime = realtime
+        self._rng = np.random.default_rng(seed)
+
+        # adi.Pluto 호환 속성
+        self.sample_rate = int(2e6)
+        self.rx_lo = int(2.4e9)
+        self.tx_lo = int(2.4e9)
+        self.rx_rf_bandwidth = int(2e6)
+        self.tx_rf_bandwidth = int(2e6)
+        self.rx_buffer_size = 1024 * 16
+        self.gain_control_mode_chan0 = "manual"
+        self.rx_hardwaregain_chan0 = 60
+        self.tx_hardwaregain_chan0 = 0
+        self.tx_cyclic_buffer = False
+
+        # tx 파형에서 추정할 수 없을 때 쓰는 chirp 기본값 (FMCWDetector 와 동일)
+        self.chirp_bandwidth = chirp_bandwidth
+        self.chirp_duration = chirp_duration
+        self.samples_per_chirp = samples_per_chirp
+
+        self.tx_mode = None      # None / "CW" / "FMCW"
+        self.tx_tone_hz = 0.0
+        self.chirp_slope = chirp_bandwidth / chirp_duration
+
+        self._t = 0.0            # 샘플 클록 기준 시각
+        self._next_deadline = None
+
+    # --------------------------------------------------
+    # TX
+    # --------------------------------------------------
+    def tx(self, samples):
+        x = np.asarray(samples)
+        self._analyze_tx(x)
+
+    def _analyze_tx(self, x: np.ndarray):
+        fs = float(self.sample_rate)
+        if x.size < 4:
+            self.tx_mode = None
+            return
+
+        if not np.iscomplexobj(x):
+            # 실수 cos 톤 (run_doppler_speed.py) → 스펙트럼 피크로 주파수 추정
+            spec = np.abs(np.fft.rfft(x))
+            self.tx_mode = "CW"
+            self.tx_tone_hz = float(np.argmax(spec[1:]) + 1) * fs / x.size
+            return
+
+        # 1차 위상차 = 순간 주파수, 2차 위상차 = chirp 기울기
+        d1 = x[1:] * np.conj(x[:-1])
+        d2 = np.angle(d1[1:] * np.conj(d1[:-1]))
+        step = float(np.median(d2))
+
+        if abs(step) < 1e-6:
+            self.tx_mode = "CW"
+            self.tx_tone_hz = float(np.median(np.angle(d1))) * fs / (2 * np.pi)
+            return
+
+        self.tx_mode = "FMCW"
+        self.chirp_slope = step * fs * fs / (2 * np.pi)
+
+        # chirp 경계(주파수 리셋)에서 2차 위상차가 튄다 → 주기 추정
+        # (경계에서 위상이 연속이면 알 수 없으므로 설정값 samples_per_chirp 유지)
+        jumps = np.flatnonzero(np.abs(d2 - step) > 0.5)
+        if jumps.size >= 2:
+            self.samples_per_chirp = int(np.median(np.diff(jumps)))
+        elif jumps.size == 1:
+            self.samples_per_chirp = int(jumps[0] + 2)
+
+    def tx_destroy_buffer(self):
+        self.tx_mode = None
+
+    def rx_destroy_buffer(self):
+        self._next_deadline = None
+
+    # --------------------------------------------------
+    # RX
+    # --------------------------------------------------
+    def _gain(self) -> float:
+        rx_db = float(self.rx_hardwaregain_chan0) - 60.0
+        tx_db = float(self.tx_hardwaregain_chan0)
+        return 10 ** ((rx_db + tx_db) / 20.0)
+
+    def _noise(self, n: int) -> np.ndarray:
+        out = np.empty(n, dtype=np.complex64)
+        out.real = self._rng.normal(0.0, self.noise_std, n)
+        out.imag = self._rng.normal(0.0, self.noise_std, n)
+        return out
+
+    def _pace(self, period: float):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next_deadline is None or now - self._next_deadline > period:
+            self._next_deadline = now
+        self._next_deadline += period
+        delay = self._next_deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def rx(self) -> np.ndarray:
+        n = int(self.rx_buffer_size)
+        fs = float(self.sample_rate)
+        period = n / fs
+        self._pace(period)
+
+        out = self._noise(n)
+        if self.tx_mode == "FMCW":
+            out += self._fmcw_returns(n, fs)
+        elif self.tx_mode == "CW":
+            out += self._cw_returns(n, fs)
+
+        self._t += period
+        return out
+
+    def _fmcw_returns(self, n: int, fs: float) -> np.ndarray:
+        spc = max(int(self.samples_per_chirp), 1)
+        num_chirps = -(-n // spc)
+        lam = C / float(self.rx_lo)
+        gain = self._gain()
+
+        t_fast = np.arange(spc) / fs
+        t_chirp = self._t + np.arange(num_chirps) * (spc / fs)
+
+        sig = np.zeros((num_chirps, spc), dtype=np.complex64)
+        for target in self.targets:
+            r = target.ranges(t_chirp)
+            amp = gain * target.amplitudes(r)[:, None]
+            # dechirp 후 beat 주파수 = 2 R k / c, chirp 간 위상 = -4 pi R / lambda
+            # (지연 2R/c 인 반사파 → 접근하면 위상 증가 = + Doppler, 실제 Pluto 와 같은 극성)
+            fb = 2.0 * r * self.chirp_slope / C
+            phase = (2 * np.pi * np.outer(fb, t_fast)
+                     - (4 * np.pi / lam * r)[:, None])
+            sig += (amp * np.exp(1j * phase)).astype(np.complex64)
+
+        return sig.ravel()[:n]
+
+    def _cw_returns(self, n: int, fs: float) -> np.ndarray:
+        lam = C / float(self.rx_lo)
+        gain = self._gain()
+        t = self._t + np.arange(n) / fs
+        base = 2 * np.pi * self.tx_tone_hz * t
+
+        sig = np.zeros(n, dtype=np.complex64)
+        for target in self.targets:
+            r = target.ranges(t)
+            amp = gain * target.amplitudes(r)
+            # 거리 변화 → 위상 변화 = Doppler 편이 (2 v / lambda, 접근하면 +)
+            sig += (amp * np.exp(1j * (base - 4 * np.pi / lam * r))).astype(np.complex64)
+
+        return sig
+
+
+def parse_sim_uri(uri: str) -> dict:
+    """
+    "sim:" URI 옵션 파싱
+    예) sim:realtime,seed=3,noise=2,targets=2
+    """
+    opts = {}
+    spec = uri.split(":", 1)[1] if ":" in uri else ""
+    for token in filter(None, (t.strip() for t in spec.split(","))):
+        key, _, value = token.partition("=")
+        key = key.lower()
+        if key == "realtime":
+            opts["realtime"] = value.lower() not in ("0", "false", "no")
+        elif key == "fast":
+            opts["realtime"] = False
+        elif key == "seed":
+            opts["seed"] = int(value)
+        elif key == "noise":
+            opts["noise_std"] = float(value)
+        elif key == "targets":
+            # 걷는 사람 수 조절 (정지 클러터는 유지)
+            scene = default_scene()
+            walker = scene[-1]
+            people = [
+                SimTarget(range_min=walker.range_min + 0.5 * i,
+                          range_max=walker.range_max + 0.5 * i,
+                          speed=walker.speed * (1 + 0.3 * i),
+                          amplitude=walker.amplitude,
+                          micro_amp=walker.micro_amp,
+                          micro_hz=walker.micro_hz,
+                          phase0=0.37 * i)
+                for i in range(int(value))
+            ]
+            opts["targets"] = scene[:-1] + people
+    return opts
@@ -0,0 +1,74 @@
+import threading
+
+import numpy as np
+
+
+class SpectrogramRing:
+    """
+    시간축 원형 스펙트로그램 버퍼 (np.roll 대체)
+    - 내부 배열을 2배 길이로 잡고 i, i+capacity 두 곳에 같은 열을 기록
+      → 최근 capacity 개 열이 항상 메모리에 연속으로 존재
+    - append: O(bins), 전체 이력 복사 없음
+    - view(): 복사 없는 시간순 [bins, time] view (오래된 것 → 최신)
+
+    내부는 [time, bins] (행 단위 연속 기록), view 는 .T 로 [bins, time] 을 돌려준다.
+    view 는 다음 append 에서 바뀔 수 있으므로 다른 스레드에 넘길 때는 snapshot() 사용.
+    """
+    def __init__(self, n_bins: int, capacity: int, dtype=np.float32, fill: float = 0.0):
+        self.n_bins = int(n_bins)
+        self.capacity = int(capacity)
+        if self.capacity < 1:
+            raise ValueError(f"capacity 는 1 이상이어야 합니다: {capacity}")
+        self._buf = np.full((2 * self.capacity, self.n_bins), fill, dtype=dtype)
+        self._times = np.zeros(2 * self.capacity, dtype=np.float64)
+        self._head = 0          # 다음에 기록할 위치 (= 가장 오래된 열)
+        self.count = 0          # 지금까지 append 된 열 수
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, column, timestamp: float = 0.0):
+        with self._lock:
+            i = self._head
+            self._buf[i] = column
+            self._buf[i + self.capacity] = column
+            self._times[i] = timestamp
+            self._times[i + self.capacity] = timestamp
+            self._head = (i + 1) % self.capacity
+            self.count += 1
+
+    def clear(self, fill: float = 0.0):
+        with self._lock:
+            self._buf.fill(fill)
+            self._times.fill(0.0)
+            self._head = 0
+            self.count = 0
+
+    # --------------------------------------------------
+    # 읽기
+    # --------------------------------------------------
+    def _window(self, n: int):
+        n = self.capacity if n is None else max(0, min(int(n), self.capacity))
+        end = self._head + self.capacity
+        return end - n, end
+
+    def view(self, n: int = None) -> np.ndarray:
+        """최근 n 개 열의 [bins, n] view (복사 없음, 채워지지 않은 열은 fill 값)"""
+        start, end = self._window(n)
+        return self._buf[start:end].T
+
+    def times(self, n: int = None) -> np.ndarray:
+        start, end = self._window(n)
+        return self._times[start:end]
+
+    def snapshot(self, n: int = None, filled_only: bool = True):
+        """
+        (data [bins, n], timestamps [n]) 복사본
+        filled_only=True 면 아직 기록되지 않은 열은 제외
+        """
+        with self._lock:
+            if filled_only:
+                n = min(len(self), self.capacity if n is None else n)
+            start, end = self._window(n)
+            return self._buf[start:end].T.copy(), self._times[start:end].copy()
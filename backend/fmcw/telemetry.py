@@ -0,0 +1,279 @@
+"""
+UDP 텔레메트리 (젯슨 → 라즈베리파이 등)
+
+매 프레임 텍스트를 보내는 대신 상태가 바뀔 때(이벤트)와 주기적으로(하트비트)만
+작은 바이너리 데이터그램을 보낸다. 데이터그램 하나에 여러 지표를 묶는다.
+
+    tx = TelemetrySender(("10.0.0.5", 5005), heartbeat=1.0)
+    tx.update(is_detected, score=..., energy=...)       # 프레임마다 호출, 보낼 때만 실제 전송
+
+    rx = TelemetryReceiver()
+    packet = rx.feed(datagram)                           # 손실 / 순서 / 지연 통계 자동 갱신
+    rx.stats()
+
+데이터그램 구조 (little-endian)
+    [HEADER][RECORD x n_records]
+
+    HEADER
+        magic       4s   b"RDTM"
+        version     B    TELEMETRY_VERSION
+        kind        B    1=이벤트(상태 변화), 2=하트비트
+        n_records   H    뒤에 붙는 레코드 수
+        seq         I    데이터그램 번호 (송신기마다 0부터, 손실 검출용)
+        session     I    송신기 실행 id (시작할 때마다 새로 뽑음 → 바뀌면 수신측이 seq 추적을 초기화)
+        timestamp   d    송신 UNIX 시각 (지연 계산용, 양쪽 시계가 NTP 로 맞춰져 있어야 의미 있음)
+
+    RECORD
+        key         B    METRICS 의 번호 (0=state)
+        timestamp   d    측정 UNIX 시각
+        value       f    값 (state 는 1=감지, 0=정상)
+"""
+import os
+import socket
+import struct
+import time
+
+import numpy as np
+
+TELEMETRY_MAGIC = b"RDTM"
+TELEMETRY_VERSION = 2
+
+HEADER = struct.Struct("<4sBBHIId")
+RECORD = struct.Struct("<B3xdf")
+
+KIND_EVENT = 1
+KIND_HEARTBEAT = 2
+KIND_NAMES = {KIND_EVENT: "event", KIND_HEARTBEAT: "heartbeat"}
+
+# 레코드 key (순서 고정 — 바꾸면 TELEMETRY_VERSION 올릴 것)
+METRICS = ("state", "score", "energy", "diff", "baseline", "probability", "peak")
+METRIC_CODES = {name: i for i, name in enumerate(METRICS)}
+
+# 일반 이더넷 MTU 안에 들어가는 최대 레코드 수
+MAX_RECORDS = (1400 - HEADER.size) // RECORD.size
+
+
+# ------------------------------------------------------
+# 직렬화
+# ------------------------------------------------------
+def encode(kind: int, seq: int, records, timestamp: float = None, session: int = 0) -> bytes:
+    """records: [(이름 또는 key, 값, 측정 시각)] → 데이터그램"""
+    records = list(records)[:MAX_RECORDS]
+    parts = [HEADER.pack(TELEMETRY_MAGIC, TELEMETRY_VERSION, kind, len(records),
+                         seq & 0xFFFFFFFF, session & 0xFFFFFFFF,
+                         time.time() if timestamp is None else timestamp)]
+    for key, value, ts in records:
+        code = METRIC_CODES[key] if isinstance(key, str) else int(key)
+        parts.append(RECORD.pack(code, ts, value))
+    return b"".join(parts)
+
+
+def decode(data: bytes) -> dict:
+    """데이터그램 → {"kind", "seq", "session", "timestamp", "metrics": {이름: (값, 측정 시각)}}"""
+    if len(data) < HEADER.size:
+        raise ValueError("데이터그램이 너무 짧음")
+    magic, version, kind, n, seq, session, timestamp = HEADER.unpack_from(data, 0)
+    if magic != TELEMETRY_MAGIC:
+        raise ValueError(f"magic 불일치: {magic!r}")
+    if version != TELEMETRY_VERSION:
+        raise ValueError(f"지원하지 않는 버전: {version}")
+    if len(data) < HEADER.size + n * RECORD.size:
+        raise ValueError("레코드가 잘림")
+
+    metrics = {}
+    offset = HEADER.size
+    for _ in range(n):
+        code, ts, value = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        name = METRICS[code] if code < len(METRICS) else f"key_{code}"
+        metrics[name] = (value, ts)
+    return {
+        "kind": KIND_NAMES.get(kind, kind),
+        "seq": seq,
+        "session": session,
+        "timestamp": timestamp,
+        "metrics": metrics,
+        "detected": bool(metrics["state"][0]) if "state" in metrics else None,
+    }
+
+
+# ------------------------------------------------------
+# 송신
+# ------------------------------------------------------
+class TelemetrySender:
+    """
+    상태 변화는 즉시, 그 외에는 heartbeat 초마다 한 번만 전송
+    legacy_text=True 면 같은 시점에 기존 "DETECTED"/"SECURE" 텍스트도 보냄 (구형 수신기 호환)
+    """
+    def __init__(self, address, heartbeat: float = 1.0, legacy_text: bool = False, sock=None):
+        self.address = address
+        self.heartbeat = heartbeat
+        self.legacy_text = legacy_text
+        self._sock = sock or socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._owns_sock = sock is None
+
+        self.seq = 0
+        self.session = int.from_bytes(os.urandom(4), "little")
+        self.state = None
+        self._last_send = 0.0
+        self.sent = 0
+        self.events = 0
+        self.errors = 0
+
+    def update(self, detected: bool, timestamp: float = None, **metrics) -> bool:
+        """프레임마다 호출. 실제로 전송했으면 True"""
+        detected = bool(detected)
+        now = time.monotonic()
+        if detected != self.state:
+            kind = KIND_EVENT
+        elif now - self._last_send >= self.heartbeat:
+            kind = KIND_HEARTBEAT
+        else:
+            return False
+
+        self.state = detected
+        ts = time.time() if timestamp is None else timestamp
+        records = [("state", 1.0 if detected else 0.0, ts)]
+        records += [(name, float(value), ts) for name, value in metrics.items()
+                    if name in METRIC_CODES and value is not None]
+        self.send(kind, records)
+        if kind == KIND_EVENT:
+            self.events += 1
+        return True
+
+    def send(self, kind: int, records):
+        self._last_send = time.monotonic()
+        try:
+            self._sock.sendto(encode(kind, self.seq, records, session=self.session), self.address)
+            if self.legacy_text:
+                self._sock.sendto(b"DETECTED" if self.state else b"SECURE", self.address)
+            self.sent += 1
+        except OSError:
+            # 네트워크 일시 장애로 수신 루프가 멈추면 안 됨 (seq 는 증가 → 수신측에서 손실로 보임)
+            self.errors += 1
+        self.seq += 1
+
+    def close(self):
+        if self._owns_sock:
+            self._sock.close()
+
+
+# ------------------------------------------------------
+# 수신
+# ------------------------------------------------------
+class TelemetryReceiver:
+    """
+    seq 로 손실 / 중복 / 순서 뒤바뀜, 송신 시각으로 단방향 지연을 추적
+    (지연 값은 송수신 시계 차이를 포함하므로 NTP 동기화 전제)
+    송신기가 재시작하면 (session 변경, 또는 MAX_TRACKED_GAP 보다 크게 seq 가 되돌아감)
+    seq 추적을 처음부터 다시 시작한다. 누적 통계는 유지.
+    """
+    MAX_TRACKED_GAP = 1024          # 늦게 도착할 수 있는 것으로 기억해 둘 빠진 seq 수
+
+    def __init__(self, latency_window: int = 1024):
+        self.expected = None        # 다음에 올 seq
+        self.session = None         # 현재 송신기 실행 id
+        self._missing = set()
+        self.received = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.reordered = 0
+        self.restarts = 0
+        self.invalid = 0
+        self.events = 0
+        self.state = None
+        self.last_packet = None
+        self.last_recv = None
+        self._latency = np.zeros(latency_window)
+        self._latency_count = 0
+
+    def feed(self, data: bytes, recv_time: float = None):
+        """데이터그램 1개 처리 → 디코드된 패킷 (잘못된 데이터그램이면 None)"""
+        recv_time = time.time() if recv_time is None else recv_time
+        try:
+            packet = decode(data)
+        except (ValueError, struct.error):
+            self.invalid += 1
+            return None
+
+        packet["latency"] = recv_time - packet["timestamp"]
+        seq = packet["seq"]
+        packet["restart"] = False
+        if self.expected is not None:
+            gap = (seq - self.expected) & 0xFFFFFFFF
+            if (packet["session"] != self.session
+                    or (gap >= 0x80000000 and 0x100000000 - gap > self.MAX_TRACKED_GAP)):
+                # 송신기 재시작 → 이전 seq 기준은 버림
+                self.restarts += 1
+                self.expected = None
+                self._missing.clear()
+                packet["restart"] = True
+        if self.expected is not None:
+            if gap >= 0x80000000:
+                # 이미 지난 seq: 빠졌던 것이 늦게 왔으면 순서 뒤바뀜, 아니면 중복
+                if seq in self._missing:
+                    self._missing.discard(seq)
+                    self.lost -= 1
+                    self.reordered += 1
+                    self.received += 1
+                else:
+                    self.duplicates += 1
+                return packet
+            self.lost += gap
+            if gap <= self.MAX_TRACKED_GAP:
+                self._missing.update((self.expected + i) & 0xFFFFFFFF for i in range(gap))
+                while len(self._missing) > self.MAX_TRACKED_GAP:
+                    self._missing.discard(min(self._missing))
+        self.expected = (seq + 1) & 0xFFFFFFFF
+        self.session = packet["session"]
+
+        self.received += 1
+        if packet["kind"] == "event":
+            self.events += 1
+        if packet["detected"] is not None:
+            self.state = packet["detected"]
+        self._latency[self._latency_count % len(self._latency)] = packet["latency"]
+        self._latency_count += 1
+        self.last_packet = packet
+        self.last_recv = recv_time
+        return packet
+
+    def stats(self) -> dict:
+        n = min(self._latency_count, len(self._latency))
+        lat = self._latency[:n] * 1e3
+        total = self.received + self.lost
+        return {
+            "received": self.received,
+            "lost": self.lost,
+            "loss_rate": self.lost / total if total else 0.0,
+            "duplicates": self.duplicates,
+            "reordered": self.reordered,
+            "restarts": self.restarts,
+            "invalid": self.invalid,
+            "events": self.events,
+            "state": self.state,
+            "latency_ms_p50": float(np.percentile(lat, 50)) if n else None,
+            "latency_ms_p95": float(np.percentile(lat, 95)) if n else None,
+            "latency_ms_max": float(lat.max()) if n else None,
+            "silence_s": None if self.last_recv is None else time.time() - self.last_recv,
+        }
+
+
+def listen(port: int, host: str = "0.0.0.0", timeout: float = 1.0):
+    """
+    UDP 포트를 열고 (소켓, 수신 데이터그램 반복자) 반환
+    반복자는 timeout 마다 None 을 내보내 호출측이 하트비트 끊김을 확인할 수 있게 함
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((host, port))
+    sock.settimeout(timeout)
+
+    def datagrams():
+        while True:
+            try:
+                data, _ = sock.recvfrom(65535)
+                yield data
+            except socket.timeout:
+                yield None
+
+    return sock, datagrams()
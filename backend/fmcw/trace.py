@@ -0,0 +1,116 @@
+"""
+프레임 단계별 span 기록 (Chrome / Perfetto trace JSON 으로 내보내기)
+
+    from fmcw.trace import TRACER
+    TRACER.enabled = True                    # 또는 환경변수 RADAR_TRACE=1
+    TRACER.record("serialize", t0, t1)       # time.perf_counter() 값
+    json.dumps(TRACER.export(seconds=5))     # chrome://tracing / ui.perfetto.dev 에서 열기
+
+metrics.Stages.lap() 이 켜져 있을 때 같은 구간을 span 으로도 남기므로
+검출기 코드는 따로 손대지 않는다. 꺼져 있으면 lap 마다 bool 확인 1번뿐.
+
+고정 크기 링 (기본 65536 span) 에 (이름, 시작, 길이, pid, tid, args) 를 덮어쓴다.
+시각은 perf_counter (Linux 에서는 CLOCK_MONOTONIC, 프로세스 간 공통) 기준.
+"""
+import os
+import threading
+import time
+
+TRACE_CAPACITY = int(os.environ.get("RADAR_TRACE_CAPACITY", 65536))
+
+
+class Tracer:
+    def __init__(self, capacity: int = TRACE_CAPACITY, enabled: bool = False):
+        self.capacity = int(capacity)
+        self.enabled = enabled
+        self.process_name = None
+        self._buf = [None] * self.capacity
+        self._count = 0
+        self._threads = {}          # (pid, tid) → 스레드 이름
+        self._processes = {}        # pid → 프로세스 이름
+        self._lock = threading.Lock()
+
+    # --------------------------------------------------
+    # 기록
+    # --------------------------------------------------
+    def record(self, name: str, start: float, end: float, **args):
+        tid = threading.get_native_id()
+        pid = os.getpid()
+        if (pid, tid) not in self._threads:
+            self._threads[(pid, tid)] = threading.current_thread().name
+        with self._lock:
+            self._buf[self._count % self.capacity] = (name, start, end - start, pid, tid, args or None)
+            self._count += 1
+
+    def extend(self, spans, threads=None, processes=None):
+        """다른 프로세스에서 받은 span 목록 추가 (drain() 결과)"""
+        if threads:
+            self._threads.update(threads)
+        if processes:
+            self._processes.update(processes)
+        with self._lock:
+            for span in spans:
+                self._buf[self._count % self.capacity] = span
+                self._count += 1
+
+    def clear(self):
+        with self._lock:
+            self._buf = [None] * self.capacity
+            self._count = 0
+
+    # --------------------------------------------------
+    # 읽기
+    # --------------------------------------------------
+    def spans(self, since: float = None):
+        """시간순 span 목록 (since: perf_counter 기준 시작 시각 하한)"""
+        with self._lock:
+            count = self._count
+            n = min(count, self.capacity)
+            start = count - n
+            items = [self._buf[i % self.capacity] for i in range(start, count)]
+        if since is not None:
+            items = [s for s in items if s[1] >= since]
+        return items
+
+    def drain(self, cursor: int):
+        """
+        cursor 이후 새로 기록된 span (프로세스 간 전달용)
+        반환: (span 목록, 새 cursor, 스레드 이름, 프로세스 이름)
+        """
+        with self._lock:
+            count = self._count
+            first = max(cursor, count - self.capacity)
+            items = [self._buf[i % self.capacity] for i in range(first, count)]
+        return items, count, dict(self._threads), self._names()
+
+    def _names(self) -> dict:
+        names = dict(self._processes)
+        if self.process_name:
+            names[os.getpid()] = self.process_name
+        return names
+
+    def export(self, seconds: float = None, extra=()) -> dict:
+        """
+        최근 seconds 초 (None 이면 링 전체) → Chrome trace JSON dict
+        extra: 다른 프로세스에서 받은 export()["traceEvents"] 목록들
+        """
+        since = None if seconds is None else time.perf_counter() - seconds
+        events = []
+        for name, start, dur, pid, tid, args in self.spans(since):
+            event = {"name": name, "ph": "X", "ts": start * 1e6, "dur": dur * 1e6,
+                     "pid": pid, "tid": tid}
+            if args:
+                event["args"] = args
+            events.append(event)
+        for pid, name in self._names().items():
+            events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}})
+        for (pid, tid), name in self._threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": name}})
+        for other in extra:
+            events.extend(other)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+# 프로세스 전역 tracer (자식 프로세스는 환경변수로 켜진 상태를 물려받음)
+TRACER = Tracer(enabled=os.environ.get("RADAR_TRACE", "0") == "1")
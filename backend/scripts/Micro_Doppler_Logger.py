@@ -1,11 +1,18 @@
-import adi
-import numpy as np
+import os
 import sys
+import numpy as np
 import time
-import csv
-import os
 from collections import deque
 
+# fmcw 패키지 경로 (backend/) — "sim:" URI 또는 pyadi-iio 미설치 시 시뮬레이터 사용
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+from fmcw.pluto_iface import open_pluto
+from fmcw.dsp_engine import RangeDopplerEngine
+from fmcw.profile_log import ProfileLogWriter
+from fmcw.spectrogram import SpectrogramRing
+
 # SSH 환경에서 그래프 저장을 위해 백엔드 설정 (창 안 띄움)
 import matplotlib
 matplotlib.use('Agg') 
@@ -34,7 +41,7 @@ else:
 # ==========================================
 # 1. 설정 (run_motion_fmcw.py 참고)
 # ==========================================
-SDR_IP = "ip:192.168.2.1"
+SDR_IP = os.environ.get("PLUTO_URI", "ip:192.168.2.1")
 SAMPLE_RATE = 2000000     # 2MHz
 CENTER_FREQ = 2400000000  # 2.4GHz
 BANDWIDTH = 50000000      # 50MHz (변경됨)
@@ -43,19 +50,22 @@ CHIRP_DURATION = 1e-4     # 0.1ms (변경됨)
 NUM_CHIRPS = 128          # 속도(Doppler) 축 (변경됨)
 N_SAMPLES = 1024          # 거리(Range) 축
 
-# 데이터 저장 파일명
-DATA_FILENAME = "micro_doppler_walk_stand.csv"
+# 데이터 저장 디렉터리 (npz 청크, CSV 가 필요하면 run_profile_export.py csv)
+DATA_DIR = "micro_doppler_walk_stand"
+
+# 스냅샷 저장용 버퍼 설정 (원형 버퍼 → 수 분 길이도 프레임당 비용 동일)
+TIME_WINDOW = int(os.environ.get("SPECTROGRAM_FRAMES", 100))
+spectrogram = SpectrogramRing(NUM_CHIRPS, TIME_WINDOW)
 
-# 스냅샷 저장용 버퍼 설정
-TIME_WINDOW = 100
-spectrogram_buffer = np.zeros((NUM_CHIRPS, TIME_WINDOW))
+# 마이크로 도플러 프로파일 계산 (fmcw_logic 실시간 분류와 같은 함수 → 학습/추론 특징 일치)
+ENGINE = RangeDopplerEngine(NUM_CHIRPS, N_SAMPLES)
 
 # ==========================================
 # 2. PlutoSDR 연결
 # ==========================================
 print(f">>> PlutoSDR({SDR_IP}) 연결 중...")
 try:
-    sdr = adi.Pluto(SDR_IP)
+    sdr = open_pluto(SDR_IP)
     sdr.sample_rate = int(SAMPLE_RATE)
     sdr.rx_lo = int(CENTER_FREQ)
     sdr.tx_lo = int(CENTER_FREQ)
@@ -76,24 +86,19 @@ except Exception as e:
     print("❌ 연결 실패.")
     sys.exit()
 
-# 배경 학습
+# 배경 학습 (FMCWDetector.calibrate 와 같은 빈 방 complex 평균 프레임)
 print(">>> 배경 학습 중 (3초)...")
-clutter_avg = np.zeros((NUM_CHIRPS, N_SAMPLES), dtype=complex)
+clutter_avg = np.zeros((NUM_CHIRPS, N_SAMPLES), dtype=np.complex64)
 for _ in range(30):
     rx = sdr.rx()
-    frame = rx.reshape(NUM_CHIRPS, N_SAMPLES)
-    clutter_avg += frame
+    clutter_avg += ENGINE.frame_view(rx)
 clutter_avg /= 30
 print(">>> 준비 완료!")
 
 # ==========================================
-# 3. CSV 초기화
+# 3. 기록기 (백그라운드 스레드가 청크 단위로 저장)
 # ==========================================
-if not os.path.exists(DATA_FILENAME):
-    with open(DATA_FILENAME, mode='w', newline='') as f:
-        writer = csv.writer(f)
-        header = ["label"] + [f"doppler_{i}" for i in range(NUM_CHIRPS)]
-        writer.writerow(header)
+log_writer = ProfileLogWriter(DATA_DIR, n_bins=NUM_CHIRPS)
 
 print("------------------------------------------------------------")
 print(" [SSH용 마이크로 도플러 수집기] ")
@@ -110,24 +115,16 @@ labels = ["Walking", "Standing"]
 
 try:
     while True:
-        # 1. 데이터 수신 & 배경 제거
+        # 1. 데이터 수신
         rx = sdr.rx()
-        frame = rx.reshape(NUM_CHIRPS, N_SAMPLES)
-        frame = frame - clutter_avg 
-        
-        # 2. 2D FFT (Range-Doppler)
-        range_fft = np.fft.fft(frame, axis=1)
-        doppler_fft = np.fft.fft(range_fft, axis=0)
-        doppler_shifted = np.fft.fftshift(doppler_fft, axes=0)
-        
-        # 3. 마이크로 도플러 추출 (Range 축 Sum)
-        mag_data = np.abs(doppler_shifted)
-        velocity_profile = np.sum(mag_data, axis=1)
-        velocity_profile_db = 20 * np.log10(velocity_profile + 1e-9)
-        
+        frame = ENGINE.frame_view(rx)
+
+        # 2~3. 배경 제거 → 2D FFT → 마이크로 도플러 (Range 축 Sum, dB)
+        #      (내부 버퍼이므로 보관하는 곳에서는 복사)
+        velocity_profile_db = ENGINE.micro_doppler_profile(frame, clutter_avg)
+
         # 4. 스냅샷용 버퍼 업데이트
-        spectrogram_buffer = np.roll(spectrogram_buffer, -1, axis=1)
-        spectrogram_buffer[:, -1] = velocity_profile_db
+        spectrogram.append(velocity_profile_db, time.time())
         
         # 5. 움직임 강도 계산 (터미널 표시용)
         # 도플러 맵 전체 에너지의 평균을 대략적인 '움직임'으로 표시
@@ -144,11 +141,8 @@ try:
         if recording_frames_left > 0:
             status = f"\033[91m [REC: {labels[recording_label]}]\033[0m"
             
-            # 파일 저장
-            with open(DATA_FILENAME, mode='a', newline='') as f:
-                writer = csv.writer(f)
-                row = [recording_label] + velocity_profile_db.tolist()
-                writer.writerow(row)
+            # 큐에 넣기만 함 (파일 I/O / 포맷팅은 writer 스레드)
+            log_writer.write(recording_label, velocity_profile_db)
             
             recording_frames_left -= 1
             if recording_frames_left == 0:
@@ -173,7 +167,7 @@ try:
             elif key == 's':
                 print("\n>>> 스펙트로그램 캡쳐 중...")
                 plt.figure(figsize=(10, 5))
-                plt.imshow(spectrogram_buffer, aspect='auto', cmap='jet', origin='lower')
+                plt.imshow(spectrogram.view(), aspect='auto', cmap='jet', origin='lower')
                 plt.title("Snapshot: Micro-Doppler Spectrogram")
                 plt.ylabel("Velocity (Doppler)")
                 plt.xlabel("Time")
@@ -185,4 +179,6 @@ try:
 except KeyboardInterrupt:
     print("\n종료합니다.")
 finally:
-    sdr.tx_destroy_buffer()
\ No newline at end of file
+    sdr.tx_destroy_buffer()
+    log_writer.close()
+    print(f">>> 기록 {log_writer.written}행 저장 ({DATA_DIR}), 버린 행 {log_writer.dropped}")
\ No newline at end of file
@@ -1,9 +1,15 @@
 # 파일명: jetson_sdr_client.py (젯슨나노에서 실행)
-import adi
-import numpy as np
+import os
 import sys
+import numpy as np
 import time
-import socket  # [추가] 통신 라이브러리
+
+# fmcw 패키지 경로 (backend/) — "sim:" URI 또는 pyadi-iio 미설치 시 시뮬레이터 사용
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+from fmcw.pluto_iface import open_pluto
+from fmcw.telemetry import TelemetrySender
 
 # ==========================================
 # 1. 설정 및 통신 준비
@@ -11,22 +17,26 @@ import socket  # [추가] 통신 라이브러리
 # ★ 중요: 여기에 라즈베리파이 IP 주소를 적으세요 ★
 RPI_IP = "10.204.220.184"  # 예: "192.168.0.15" (따옴표 필수)
 RPI_PORT = 5005          # 라즈베리파이 코드와 같은 포트 번호
+# 상태가 바뀌면 즉시, 그 외에는 HEARTBEAT 초마다 한 번만 전송 (수신: run_telemetry_receiver.py)
+HEARTBEAT = float(os.environ.get("TELEMETRY_HEARTBEAT", 1.0))
+# 1 이면 기존 "DETECTED"/"SECURE" 텍스트도 함께 전송 (구형 라즈베리파이 코드 호환)
+LEGACY_TEXT = os.environ.get("TELEMETRY_LEGACY_TEXT", "0") == "1"
 
-SDR_IP = "ip:192.168.2.1"
+SDR_IP = os.environ.get("PLUTO_URI", "ip:192.168.2.1")
 THRESHOLD = 15.0 
 DETECT_LIMIT = 10.0 
 MAX_SCORE = 20.0 
 ADAPTATION_RATE = 0.05 
 
-# [추가] 통신 소켓 생성 (우체부 준비)
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+# 텔레메트리 송신기 (바이너리: seq + 타임스탬프 + 지표 묶음)
+telemetry = TelemetrySender((RPI_IP, RPI_PORT), heartbeat=HEARTBEAT, legacy_text=LEGACY_TEXT)
 
 # ==========================================
 # 2. PlutoSDR 초기화 (기존 코드 동일)
 # ==========================================
 print(f">>> PlutoSDR({SDR_IP}) 연결 및 설정 중...")
 try:
-    sdr = adi.Pluto(SDR_IP)
+    sdr = open_pluto(SDR_IP)
 except Exception as e:
     print("❌ 연결 실패: 케이블을 확인하거나 IP를 확인하세요.")
     sys.exit()
@@ -79,6 +89,7 @@ try:
     while True:
         # 데이터 수신 및 에너지 계산
         data = sdr.rx()
+        captured = time.time()
         current_energy = np.mean(np.abs(data))
         diff = abs(current_energy - current_baseline)
         
@@ -95,7 +106,6 @@ try:
             
         is_detected = current_score > DETECT_LIMIT
         
-        # === [추가된 부분: 라즈베리파이로 신호 쏘기] ===
         if is_detected:
             msg = "DETECTED"
             status = "🚨 DETECTED!"
@@ -107,8 +117,11 @@ try:
             color = "\033[92m"
             bar_color = "\033[90m"
 
-        # 라즈베리파이 IP로 메시지 전송 (한 줄로 끝!)
-        sock.sendto(msg.encode(), (RPI_IP, RPI_PORT))
+        # 라즈베리파이로 전송 (상태 변화 / 하트비트일 때만 실제로 보냄)
+        telemetry.update(
+            is_detected, timestamp=captured,
+            score=current_score, energy=current_energy, diff=diff, baseline=current_baseline,
+        )
         
         # 화면 출력 (기존 시각화 유지)
         bar_len = int(current_score * 2.0)
@@ -117,11 +130,11 @@ try:
         space = " " * (40 - bar_len)
         reset = "\033[0m"
         
-        info = f"전송중:{msg} | 점수:{current_score:4.1f}"
+        info = f"상태:{msg} | 점수:{current_score:4.1f} | 전송:{telemetry.sent}"
         print(f"\r{color}[{status}]{reset} {info} |{bar_color}{bar}{space}{reset}|", end="")
 
 except KeyboardInterrupt:
     print("\n\n>>> 시스템을 종료합니다.")
 finally:
     sdr.tx_destroy_buffer()
-    sock.close()
\ No newline at end of file
+    telemetry.close()
\ No newline at end of file
@@ -1,64 +1,94 @@
 import numpy as np
-import time
+import os
 import sys
 
-try:
-    import adi
-    HAS_HARDWARE = True
-except ImportError:
-    HAS_HARDWARE = False
+# fmcw 패키지 경로 (backend/)
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+
+from fmcw.calib_store import CalibrationStore
+from fmcw.metrics import REGISTRY, Stages
+from fmcw.rx_clock import RxClock
+from fmcw.sdr_session import SDRSession
 
 
 class MotionDetector:
-    def __init__(self, ip="ip:192.168.2.1"):
+    def __init__(self, ip="ip:192.168.2.1", session=None):
         self.SDR_IP = ip
         self.THRESHOLD = 15.0       # 감지 민감도
         self.DETECT_LIMIT = 10.0    # 감지 판정 점수
         self.MAX_SCORE = 20.0       # 점수 최대값
         self.ADAPTATION_RATE = 0.05 # baseline 적응 비율
+        self.CAL_BUFFERS = 50       # 기준값 학습 버퍼 수
+        self.CAL_SETTLE_BUFFERS = 4 # 설정 직후 버릴 버퍼 수 (커널 버퍼 대기열)
+        self.CAL_CHECK_BUFFERS = 8  # 저장된 기준값 확인용 버퍼 수
+        self.CAL_CHECK_TOLERANCE = 0.2  # 이 비율 이상 달라지면 환경 변화로 보고 재학습
+        self.BUFFER_SIZE = 1024 * 16    # rx 버퍼 길이 (샘플)
+        self.SAMPLE_RATE = int(2e6)
+
+        # 공유 세션을 받으면 close() 때 연결을 끊지 않는다
+        self.session = session or SDRSession(ip, store=CalibrationStore())
+        self._owns_session = session is None
 
         self.sdr = None
         self.current_baseline = 0.0
         self.current_score = 0.0
 
-    def connect(self):
-        if not HAS_HARDWARE:
-            return True
+        # 단계별 지표 (/metrics)
+        labels = {"mode": "CW", "uri": ip}
+        self.stages = Stages("radar_stage_seconds", ("rx", "energy", "score"), **labels)
+        self.m_frames = REGISTRY.counter("radar_frames_total", "처리한 프레임 수", **labels)
+        self.m_short = REGISTRY.counter(
+            "radar_short_reads_total", "길이가 rx_buffer_size 와 다른 rx 버퍼 수", **labels)
+        self.m_rx_errors = REGISTRY.counter(
+            "radar_errors_total", "처리 중 무시한 예외 수", stage="rx", **labels)
+        self.m_errors = REGISTRY.counter(
+            "radar_errors_total", "처리 중 무시한 예외 수", stage="process", **labels)
+        # rx 버퍼 번호 / 캡처 시각 / 누락 추정 (주기 = BUFFER_SIZE / SAMPLE_RATE)
+        self.rx_clock = RxClock(self.SAMPLE_RATE, self.BUFFER_SIZE, **labels)
+
+        # 계산할 product (wire_format.PRODUCTS, None 이면 전부)
+        self.products = None
+
+    def wants(self, product: str) -> bool:
+        products = self.products
+        return products is None or product in products
+
+    def sdr_settings(self) -> dict:
+        """CW 모드 RF 설정 (기록 순서 유지: gain mode → gain)"""
+        return {
+            "sample_rate": self.SAMPLE_RATE,
+            "rx_lo": int(2400e6),
+            "tx_lo": int(2400e6),
+            "rx_rf_bandwidth": int(2e6),
+            "tx_rf_bandwidth": int(2e6),
+            "rx_buffer_size": self.BUFFER_SIZE,
+            "gain_control_mode_chan0": "manual",
+            "rx_hardwaregain_chan0": 60,
+            "tx_hardwaregain_chan0": 0,
+        }
+
+    def calibration_config(self) -> dict:
+        """기준값에 영향을 주는 설정 (캐시 키, 장치마다 배경이 다르므로 URI 포함)"""
+        return dict(self.sdr_settings(), uri=self.SDR_IP)
+
+    def _make_tx(self):
+        settings = self.sdr_settings()
+        fs = settings["sample_rate"]
+        t = np.arange(0, settings["rx_buffer_size"]) / fs
+        fc = 100000
+        return np.exp(1j * 2 * np.pi * fc * t) * (2**14)
 
+    def connect(self):
         print(f">>> [CW] PlutoSDR({self.SDR_IP}) 연결 중...")
         try:
-            self.sdr = adi.Pluto(self.SDR_IP)
-
-            # 혹시 남아 있을지 모르는 이전 버퍼 제거
-            try:
-                self.sdr.tx_destroy_buffer()
-            except:
-                pass
-            try:
-                self.sdr.rx_destroy_buffer()
-            except:
-                pass
-
-            # CW 설정
-            self.sdr.sample_rate = int(2e6)
-            self.sdr.rx_lo = int(2400e6)
-            self.sdr.tx_lo = int(2400e6)
-            self.sdr.rx_rf_bandwidth = int(2e6)
-            self.sdr.tx_rf_bandwidth = int(2e6)
-            self.sdr.rx_buffer_size = 1024 * 16
-
-            self.sdr.gain_control_mode_chan0 = "manual"
-            self.sdr.rx_hardwaregain_chan0 = 60
-            self.sdr.tx_hardwaregain_chan0 = 0
+            # 세션이 연결을 유지 → 모드 전환 시 달라진 설정만 기록
+            self.sdr = self.session.open()
+            self.session.configure(self.sdr_settings())
 
-            fs = int(self.sdr.sample_rate)
-            t = np.arange(0, self.sdr.rx_buffer_size) / fs
-            fc = 100000
-            tx_signal = np.exp(1j * 2 * np.pi * fc * t) * (2**14)
-
-            # 전송 시작 전에 cyclic 모드 설정
-            self.sdr.tx_cyclic_buffer = True
-            self.sdr.tx(tx_signal)
+            # 전송 시작 전에 cyclic 모드 설정 (같은 파형이면 재전송 생략)
+            self.session.set_tx(("CW", 100000), self._make_tx)
 
             print("✅ [CW] 하드웨어 설정 완료")
             return True
@@ -67,40 +97,88 @@ class MotionDetector:
             self.sdr = None
             return False
 
-    def calibrate(self):
-        print(">>> [CW] 기준값 측정 중... (3초)")
+    def calibrate(self, force: bool = False, progress=None) -> bool:
+        """
+        기준값 학습. 버퍼를 쉬지 않고 연속으로 읽는다 (고정 sleep 없음)
+        progress(done, total) 콜백으로 진행률 보고
+        """
         if not self.sdr:
             self.current_baseline = 500.0
-            return
+            return True
+
+        # 같은 설정으로 학습한 기준값이 있으면 재사용 (디스크 값은 간단히 확인)
+        if not force:
+            cached, verified = self.session.calibration("CW", self.calibration_config())
+            if cached is not None and (verified or self._baseline_matches(cached, progress)):
+                self.current_baseline = float(cached)
+                print(f">>> [CW] 저장된 기준값 사용: {self.current_baseline:.2f}")
+                return True
+
+        print(f">>> [CW] 기준값 측정 중... ({self.CAL_BUFFERS} 버퍼)")
+        total = self.CAL_SETTLE_BUFFERS + self.CAL_BUFFERS
 
         baseline_list = []
-        for i in range(50):
+        for i in range(total):
             try:
                 data = self.sdr.rx()
-                energy = np.mean(np.abs(data))
-                baseline_list.append(energy)
-                time.sleep(0.01)
+                # 설정 변경 직후 커널에 남아있던 버퍼는 버림
+                if i >= self.CAL_SETTLE_BUFFERS and len(data) > 0:
+                    baseline_list.append(np.mean(np.abs(data)))
             except:
-                continue
+                self.m_rx_errors.inc()
+            if progress:
+                progress(i + 1, total)
+
+        if not baseline_list:
+            print("❌ [CW] 기준값 측정 실패 (수신 없음)")
+            return False
 
-        self.current_baseline = np.mean(baseline_list)
+        self.current_baseline = float(np.mean(baseline_list))
+        self.session.store_calibration("CW", self.calibration_config(), self.current_baseline)
         print(f">>> [CW] 측정 완료: {self.current_baseline:.2f}")
+        return True
+
+    def _baseline_matches(self, baseline: float, progress=None) -> bool:
+        """버퍼 몇 개의 평균 에너지가 저장된 기준값과 비슷한지 확인"""
+        total = self.CAL_SETTLE_BUFFERS + self.CAL_CHECK_BUFFERS
+        energies = []
+        for i in range(total):
+            try:
+                data = self.sdr.rx()
+                if i >= self.CAL_SETTLE_BUFFERS and len(data) > 0:
+                    energies.append(np.mean(np.abs(data)))
+            except:
+                self.m_rx_errors.inc()
+            if progress:
+                progress(i + 1, total)
+        if not energies or baseline <= 0:
+            return False
+
+        change = abs(float(np.mean(energies)) - baseline) / baseline
+        if change > self.CAL_CHECK_TOLERANCE:
+            print(f">>> [CW] 환경 변화 감지 ({change * 100:.0f}%) → 재학습")
+            return False
+        return True
 
     def process_frame(self):
+        stamp = None
         try:
-            if self.sdr:
-                raw_data = self.sdr.rx()
-            else:
-                noise = np.random.normal(500, 50, 4096)
-                if np.random.rand() > 0.95:
-                    noise += 1000
-                raw_data = noise
+            if not self.sdr:
+                return None
+            self.stages.start()
+            raw_data = self.sdr.rx()
+            stamp = self.rx_clock.tick()
+            self.stages.lap("rx")
 
+            if len(raw_data) != self.BUFFER_SIZE:
+                self.m_short.inc()
             if len(raw_data) == 0:
+                self.rx_clock.discard()
                 return None
 
             current_energy = np.mean(np.abs(raw_data))
             diff = abs(current_energy - self.current_baseline)
+            self.stages.lap("energy")
 
             if diff > self.THRESHOLD:
                 self.current_score += 2.0
@@ -118,30 +196,32 @@ class MotionDetector:
                 self.current_score = self.MAX_SCORE
 
             is_detected = self.current_score > self.DETECT_LIMIT
+            self.stages.lap("score")
+            self.m_frames.inc()
 
-            return {
-                "signal": np.abs(raw_data)[::8].tolist(),
+            result = {
                 "score": self.current_score,
                 "max_score": self.MAX_SCORE,
                 "is_detected": bool(is_detected),
                 "diff": diff,
                 "baseline": self.current_baseline,
+                **stamp,
             }
+            if self.wants("cw_envelope"):
+                # 배열 그대로 전달 → 직렬화는 wire_format 에서 (JSON/바이너리)
+                result["signal"] = np.abs(raw_data[::8]).astype(np.float32)
+            return result
         except:
+            self.m_errors.inc()
+            if stamp is not None:
+                self.rx_clock.discard()
             return None
 
     def close(self):
-        if self.sdr:
-            try:
-                self.sdr.tx_destroy_buffer()
-            except:
-                pass
-            try:
-                self.sdr.rx_destroy_buffer()
-            except:
-                pass
-            try:
-                del self.sdr
-            except:
-                pass
-            self.sdr = None
\ No newline at end of file
+        if self.sdr is None:
+            return
+        # 적응된 기준값을 남겨두면 다음 전환 때 바로 사용
+        self.session.store_calibration("CW", self.calibration_config(), self.current_baseline)
+        self.sdr = None
+        if self._owns_session:
+            self.session.close()
@@ -1,16 +1,29 @@
 import numpy as np
+import os
 import time
 import sys
 
-try:
-    import adi
-    HAS_HARDWARE = True
-except ImportError:
-    HAS_HARDWARE = False
+# fmcw 패키지 경로 (backend/)
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+
+from fmcw.calib_store import CalibrationStore
+from fmcw.sdr_session import SDRSession
+from fmcw.dsp_engine import RangeDopplerEngine
+from fmcw.cfar import CFAR_2D, detect_1d
+from fmcw.activity import ActivityClassifier, ActivityModel
+from fmcw.metrics import REGISTRY, Stages
+from fmcw.rx_clock import RxClock
+
+# 걷기/서 있기 분류 모델 (run_activity_train.py 로 생성, 없으면 분류 단계 생략)
+ACTIVITY_MODEL = os.environ.get(
+    "ACTIVITY_MODEL", os.path.join(backend_dir, "models", "activity_model.npz")
+)
 
 
 class FMCWDetector:
-    def __init__(self, ip="ip:192.168.2.1"):
+    def __init__(self, ip="ip:192.168.2.1", session=None):
         self.SDR_IP = ip
         self.SAMPLE_RATE = 2_000_000
         self.CENTER_FREQ = 2_400_000_000
@@ -24,60 +37,129 @@ class FMCWDetector:
         self.ALPHA_RISE = 0.3
         self.ALPHA_FALL = 0.02
 
+        # 배경 학습
+        self.CAL_FRAMES = 20
+        self.CAL_SETTLE_FRAMES = 4     # 설정 직후 버릴 프레임 수 (커널 버퍼 대기열)
+        self.CAL_CHECK_FRAMES = 3      # 저장된 배경 확인용 프레임 수
+        self.CAL_CHECK_DB = 6.0        # bin 별 허용 편차 (dB)
+        self.CAL_CHECK_FRACTION = 0.2  # 편차를 넘는 bin 비율이 이보다 크면 재학습
+
+        # CFAR 검출 파라미터 (클러터 제거된 range 프로파일, 선형 전력 기준)
+        self.CFAR_METHOD = "CA"        # "CA" 또는 "OS"
+        self.CFAR_GUARD = 2
+        self.CFAR_TRAIN = 8
+        self.CFAR_PFA = 1e-4
+        self.MAX_DETECTIONS = 8
+
+        # Range-Doppler 모드 (chirp 축 2차 FFT)
+        self.RD_ENABLED = True         # 검출별 속도 계산
+        self.RD_MAP_HZ = 5.0           # RD 맵 전송 주기 (0 이면 전송 안 함)
+        self.RD_DECIMATE = (2, 4)      # (doppler, range) max-pooling 배수
+        self.RD_REMOVE_STATIC = True   # 정지 클러터(0 Hz) 제거
+        self.RD_CFAR_GUARD = (1, 2)    # RD 맵 2D CFAR (doppler, range) guard / 학습 셀
+        self.RD_CFAR_TRAIN = (4, 8)
+        self.VELOCITY_MIN_DB = 10.0    # Doppler 피크가 열(column) 잡음(중앙값)보다 이만큼 커야 속도 보고
+
         # FFT/버퍼 설정
         self.N_SAMPLES = 1024
         self.NUM_CHIRPS = 128
         self.TOTAL_SAMPLES = self.N_SAMPLES * self.NUM_CHIRPS
 
-        # 상태 변수
+        # 속도 해상도: λ / (2 · chirp 수 · chirp 주기)
+        self.CHIRP_PERIOD = self.N_SAMPLES / self.SAMPLE_RATE
+        wavelength = 3e8 / self.CENTER_FREQ
+        self.VELOCITY_RES = wavelength / (2 * self.NUM_CHIRPS * self.CHIRP_PERIOD)
+
+        # 상태 변수 (공유 세션을 받으면 close() 때 연결을 끊지 않는다)
+        self.session = session or SDRSession(ip, store=CalibrationStore())
+        self._owns_session = session is None
         self.sdr = None
         self.clutter_map = None
-        self.smoothed_profile = np.zeros(self.N_SAMPLES)
+        self.background = None         # 빈 방 complex 평균 프레임 (마이크로 도플러 특징용)
+        self.smoothed_profile = np.zeros(self.N_SAMPLES, dtype=np.float32)
         self.stable_peak_val = self.MIN_DB_FOR_BAR
 
-    def connect(self):
-        if not HAS_HARDWARE:
-            # 하드웨어 없으면 시뮬레이션 모드로 그냥 True
-            return True
+        # DSP 엔진 (윈도우 캐시 + complex64 작업 버퍼) 및 프레임 작업 버퍼
+        self.engine = RangeDopplerEngine(self.NUM_CHIRPS, self.N_SAMPLES)
+        self._diff = np.empty(self.N_SAMPLES, dtype=np.float32)
+        self._scratch = np.empty(self.N_SAMPLES, dtype=np.float32)
+        self._db = np.empty(self.N_SAMPLES // 2 - 1, dtype=np.float32)
+        self._power = np.empty(self.N_SAMPLES // 2 - 1, dtype=np.float32)
+        self._last_rd_time = 0.0
+
+        # 활동 분류 (빈 방 배경을 뺀 마이크로 도플러 프로파일, Micro_Doppler_Logger 와 같은 정의)
+        self.activity = self._load_activity(ACTIVITY_MODEL)
+
+        # 단계별 지표 (/metrics)
+        labels = {"mode": "FMCW", "uri": ip}
+        self.stages = Stages(
+            "radar_stage_seconds",
+            ("rx", "reshape", "window", "range_fft", "profile_ema", "clutter",
+             "cfar", "doppler", "peak"),
+            **labels,
+        )
+        self.m_frames = REGISTRY.counter("radar_frames_total", "처리한 프레임 수", **labels)
+        self.m_short = REGISTRY.counter(
+            "radar_short_reads_total", "길이가 rx_buffer_size 와 다른 rx 버퍼 수", **labels)
+        self.m_rx_errors = REGISTRY.counter(
+            "radar_errors_total", "처리 중 무시한 예외 수", stage="rx", **labels)
+        self.m_errors = REGISTRY.counter(
+            "radar_errors_total", "처리 중 무시한 예외 수", stage="process", **labels)
+        # rx 버퍼 번호 / 캡처 시각 / 누락 추정 (주기 = TOTAL_SAMPLES / SAMPLE_RATE)
+        self.rx_clock = RxClock(self.SAMPLE_RATE, self.TOTAL_SAMPLES, **labels)
+
+        # 계산할 product (wire_format.PRODUCTS, None 이면 전부)
+        # 서버는 구독자들이 원하는 것만 넣어 CFAR / Doppler FFT 등을 건너뛴다
+        self.products = None
+
+    def wants(self, product: str) -> bool:
+        products = self.products
+        return products is None or product in products
+
+    def sdr_settings(self) -> dict:
+        """FMCW 모드 RF 설정 (기록 순서 유지: gain mode → gain)"""
+        return {
+            "sample_rate": int(self.SAMPLE_RATE),
+            "rx_lo": int(self.CENTER_FREQ),
+            "tx_lo": int(self.CENTER_FREQ),
+            "rx_rf_bandwidth": int(self.BANDWIDTH),
+            "tx_rf_bandwidth": int(self.BANDWIDTH),
+            # RX 버퍼 크기 (한 프레임 = NUM_CHIRPS × N_SAMPLES)
+            "rx_buffer_size": int(self.TOTAL_SAMPLES),
+            "gain_control_mode_chan0": "manual",
+            "rx_hardwaregain_chan0": 70,
+            "tx_hardwaregain_chan0": 0,
+        }
+
+    def calibration_config(self) -> dict:
+        """clutter map 에 영향을 주는 설정 (캐시 키, 장치마다 배경이 다르므로 URI 포함)"""
+        return dict(
+            self.sdr_settings(),
+            uri=self.SDR_IP,
+            n_samples=self.N_SAMPLES,
+            num_chirps=self.NUM_CHIRPS,
+            chirp_duration=self.CHIRP_DURATION,
+        )
+
+    def _make_tx(self):
+        # FMCW chirp 생성
+        t = np.arange(self.N_SAMPLES) / self.SAMPLE_RATE
+        k = self.BANDWIDTH / self.CHIRP_DURATION  # sweep rate
+        chirp = np.exp(1j * np.pi * k * t**2) * (2**14)
+        return np.tile(chirp, self.NUM_CHIRPS)
 
+    def connect(self):
+        # "sim:" URI 이거나 pyadi-iio 가 없으면 SimulatedPluto 로 동작
         print(f">>> [FMCW] PlutoSDR({self.SDR_IP}) 연결 중...")
         try:
-            self.sdr = adi.Pluto(self.SDR_IP)
-
-            # 혹시 기존 버퍼가 살아있다면 정리
-            try:
-                self.sdr.tx_destroy_buffer()
-            except:
-                pass
-            try:
-                self.sdr.rx_destroy_buffer()
-            except:
-                pass
-
-            # 기본 RF 설정
-            self.sdr.sample_rate = int(self.SAMPLE_RATE)
-            self.sdr.rx_lo = int(self.CENTER_FREQ)
-            self.sdr.tx_lo = int(self.CENTER_FREQ)
-            self.sdr.rx_rf_bandwidth = int(self.BANDWIDTH)
-            self.sdr.tx_rf_bandwidth = int(self.BANDWIDTH)
-
-            # RX 버퍼 크기 (한 프레임 = NUM_CHIRPS × N_SAMPLES)
-            self.sdr.rx_buffer_size = int(self.TOTAL_SAMPLES)
-
-            # 이득 설정
-            self.sdr.gain_control_mode_chan0 = "manual"
-            self.sdr.rx_hardwaregain_chan0 = 70
-            self.sdr.tx_hardwaregain_chan0 = 0
+            # 세션이 연결을 유지 → 모드 전환 시 달라진 설정만 기록
+            self.sdr = self.session.open()
+            self.session.configure(self.sdr_settings())
 
-            # FMCW chirp 생성
-            t = np.arange(self.N_SAMPLES) / self.SAMPLE_RATE
-            k = self.BANDWIDTH / self.CHIRP_DURATION  # sweep rate
-            chirp = np.exp(1j * np.pi * k * t**2) * (2**14)
-            tx_waveform = np.tile(chirp, self.NUM_CHIRPS)
-
-            # ✅ 버퍼 생성 전에 cyclic 모드 설정
-            self.sdr.tx_cyclic_buffer = True
-            self.sdr.tx(tx_waveform)
+            # ✅ 버퍼 생성 전에 cyclic 모드 설정 (같은 chirp 이면 재전송 생략)
+            tx_key = ("FMCW", self.N_SAMPLES, self.NUM_CHIRPS, self.SAMPLE_RATE,
+                      self.BANDWIDTH, self.CHIRP_DURATION)
+            self.session.set_tx(tx_key, self._make_tx)
 
             print("✅ [FMCW] 하드웨어 설정 완료")
             return True
@@ -86,70 +168,206 @@ class FMCWDetector:
             self.sdr = None
             return False
 
-    def calibrate(self):
-        print(">>> [FMCW] 배경 학습 시작 (3초 대기)...")
+    def calibrate(self, force: bool = False, progress=None) -> bool:
+        """
+        배경(clutter map) 학습. 프레임을 쉬지 않고 연속으로 읽는다 (고정 sleep 없음)
+        progress(done, total) 콜백으로 진행률 보고
+        """
         if not self.sdr:
             # 하드웨어 없으면 그냥 0으로 초기화
-            self.clutter_map = np.zeros(self.N_SAMPLES)
-            return
-
-        time.sleep(2)
+            self.clutter_map = np.zeros(self.N_SAMPLES, dtype=np.float32)
+            self.background = None
+            return True
 
-        clutter_sum = np.zeros(self.N_SAMPLES)
-        for _ in range(20):
+        # 같은 설정으로 학습한 clutter map 이 있으면 재사용 (디스크 값은 간단히 확인)
+        if not force:
+            config = self.calibration_config()
+            cached, verified = self.session.calibration("FMCW", config)
+            background, _ = self.session.calibration("FMCW_BG", config)
+            if (cached is not None and background is not None
+                    and (verified or self._background_matches(cached, progress))):
+                self.clutter_map = np.array(cached, dtype=np.float32)
+                self.background = np.array(background, dtype=np.complex64)
+                print(">>> [FMCW] 저장된 배경 사용")
+                return True
+
+        print(f">>> [FMCW] 배경 학습 시작 ({self.CAL_FRAMES} 프레임)...")
+        total = self.CAL_SETTLE_FRAMES + self.CAL_FRAMES
+
+        clutter_sum = np.zeros(self.N_SAMPLES, dtype=np.float32)
+        background_sum = np.zeros((self.NUM_CHIRPS, self.N_SAMPLES), dtype=np.complex64)
+        count = 0
+        for i in range(total):
             try:
                 rx = self.sdr.rx()
-                if len(rx) != self.TOTAL_SAMPLES:
-                    continue
+                # 설정 변경 직후 커널에 남아있던 버퍼는 버림 (기존 sleep(2) 대체)
+                if i >= self.CAL_SETTLE_FRAMES and len(rx) == self.TOTAL_SAMPLES:
+                    frame = self.engine.frame_view(rx)
+                    clutter_sum += self.engine.range_profile(frame)
+                    background_sum += frame
+                    count += 1
+            except:
+                self.m_rx_errors.inc()
+            if progress:
+                progress(i + 1, total)
 
-                frame = rx.reshape(self.NUM_CHIRPS, self.N_SAMPLES)
-                win = np.hanning(self.N_SAMPLES)
-                fft_data = np.fft.fft(frame * win, axis=1)
-                mag_data = np.abs(fft_data)
+        if count == 0:
+            print("❌ [FMCW] 배경 학습 실패 (수신 없음)")
+            return False
 
-                clutter_sum += np.mean(mag_data, axis=0)
-                time.sleep(0.01)
+        self.clutter_map = clutter_sum / count
+        # Micro_Doppler_Logger 와 같은 빈 방 배경 (raw complex 프레임 평균)
+        self.background = background_sum / np.float32(count)
+        config = self.calibration_config()
+        self.session.store_calibration("FMCW", config, self.clutter_map.copy())
+        self.session.store_calibration("FMCW_BG", config, self.background)
+        print(">>> [FMCW] 학습 완료!")
+        return True
+
+    def _background_matches(self, clutter_map, progress=None) -> bool:
+        """
+        프레임 몇 개의 range 프로파일을 저장된 clutter map 과 비교
+        - 사람 한두 명은 일부 bin 만 바꾸므로 통과, 가구 배치 / 안테나 이동처럼
+          넓은 구간이 바뀐 경우에만 재학습
+        """
+        if clutter_map is None or len(clutter_map) != self.N_SAMPLES:
+            return False
+
+        total = self.CAL_SETTLE_FRAMES + self.CAL_CHECK_FRAMES
+        profile = np.zeros(self.N_SAMPLES, dtype=np.float32)
+        count = 0
+        for i in range(total):
+            try:
+                rx = self.sdr.rx()
+                if i >= self.CAL_SETTLE_FRAMES and len(rx) == self.TOTAL_SAMPLES:
+                    profile += self.engine.range_profile(self.engine.frame_view(rx))
+                    count += 1
             except:
-                continue
+                self.m_rx_errors.inc()
+            if progress:
+                progress(i + 1, total)
+        if count == 0:
+            return False
 
-        self.clutter_map = clutter_sum / 20
-        print(">>> [FMCW] 학습 완료!")
+        valid = slice(1, self.N_SAMPLES // 2)
+        ratio_db = 20 * np.log10(
+            np.maximum(profile[valid] / count, 1e-9) / np.maximum(clutter_map[valid], 1e-9)
+        )
+        changed = float(np.mean(np.abs(ratio_db) > self.CAL_CHECK_DB))
+        if changed > self.CAL_CHECK_FRACTION:
+            print(f">>> [FMCW] 환경 변화 감지 ({changed * 100:.0f}% bin) → 재학습")
+            return False
+        return True
 
     def process_frame(self):
+        """SDR 에서 버퍼 1개 수신 후 처리"""
         try:
             # 1) 데이터 수신
-            if self.sdr:
-                rx = self.sdr.rx()
-            else:
-                rx = np.random.normal(0, 10, self.TOTAL_SAMPLES)
-
+            if not self.sdr:
+                return None
+            self.stages.start()
+            rx = self.sdr.rx()
+            stamp = self.rx_clock.tick()
+            self.stages.lap("rx")
+        except Exception:
+            self.m_rx_errors.inc()
+            return None
+        result = self.process_buffer(rx)
+        if result is None:
+            self.rx_clock.discard()
+        else:
+            result.update(stamp)
+        return result
+
+    def process_buffer(self, rx):
+        """
+        rx 버퍼 1개 처리 (수신과 분리 → 녹화 재생 / 별도 수신 스레드에서도 사용)
+        - 엔진과 작업 버퍼를 재사용하므로 프레임당 큰 배열 할당이 없다
+        """
+        try:
             if len(rx) != self.TOTAL_SAMPLES:
+                self.m_short.inc()
                 return None
-
-            # 2) 프레임 reshape & FFT
-            frame = rx.reshape(self.NUM_CHIRPS, self.N_SAMPLES)
-            win = np.hanning(self.N_SAMPLES)
-            fft_data = np.fft.fft(frame * win, axis=1)
-            raw_profile = np.mean(np.abs(fft_data), axis=0)
-
-            # 3) 프로파일 smoothing
-            self.smoothed_profile = (
-                self.smoothed_profile * (1 - self.ALPHA_PROFILE)
-                + raw_profile * self.ALPHA_PROFILE
-            )
+            stages = self.stages
+            stages.start()
+
+            # 2) 프레임 reshape & FFT (complex64, 제자리)
+            frame = self.engine.frame_view(rx)
+            stages.lap("reshape")
+            self.engine.apply_range_window(frame)
+            stages.lap("window")
+            self.engine.range_fft_inplace()
+            raw_profile = self.engine.spectrum_profile()
+            stages.lap("range_fft")
+
+            # 3) 프로파일 smoothing (smoothed = smoothed*(1-a) + raw*a)
+            raw_profile *= np.float32(self.ALPHA_PROFILE)
+            self.smoothed_profile *= np.float32(1 - self.ALPHA_PROFILE)
+            self.smoothed_profile += raw_profile
+            stages.lap("profile_ema")
 
             # 4) 클러터 제거
             if self.clutter_map is not None:
-                diff_profile = np.abs(self.smoothed_profile - self.clutter_map)
+                diff_profile = np.subtract(self.smoothed_profile, self.clutter_map, out=self._diff)
+                np.abs(diff_profile, out=diff_profile)
             else:
                 diff_profile = self.smoothed_profile
 
             # 5) 유효 구간(양쪽 대칭 중 절반만 사용)
             valid_len = self.N_SAMPLES // 2
             valid_data = diff_profile[1:valid_len]
-            diff_db = 20 * np.log10(np.maximum(valid_data, 1e-9))
-
-            # 6) 피크 탐지 및 지수적 추적
+            diff_db = np.maximum(valid_data, 1e-9, out=self._db)
+            np.log10(diff_db, out=diff_db)
+            diff_db *= np.float32(20)
+            stages.lap("clutter")
+
+            # 6) CFAR 다중 표적 검출 (bin 번호는 peak_idx 와 같은 기준, 원하는 구독자가 있을 때만)
+            want_detections = self.wants("detections")
+            detections = []
+            if want_detections:
+                power = np.multiply(valid_data, valid_data, out=self._power)
+                detections = detect_1d(
+                    power,
+                    method=self.CFAR_METHOD,
+                    guard=self.CFAR_GUARD,
+                    train=self.CFAR_TRAIN,
+                    pfa=self.CFAR_PFA,
+                    max_detections=self.MAX_DETECTIONS,
+                )
+                stages.lap("cfar")
+
+            # 7) Range-Doppler: 검출 속도 / RD 맵(보낼 차례) 이 필요할 때만 2차 FFT
+            #    활동 분류 / 스펙트로그램은 학습 데이터와 같은 정의(engine.micro_doppler_profile)
+            rd_map = None
+            spectrogram = None
+            activity, activity_conf = None, 0.0
+            now = time.monotonic()
+            rd_due = (self.RD_ENABLED and self.RD_MAP_HZ > 0 and self.wants("rd_map")
+                      and now - self._last_rd_time >= 1.0 / self.RD_MAP_HZ)
+            # 분류기는 창(window) 상태를 가지므로 구독이 끊긴 동안은 갱신을 멈춘다
+            classify = self.activity is not None and self.wants("activity")
+            want_spectrogram = self.wants("spectrogram")
+            doppler = False
+            if (self.RD_ENABLED and detections) or rd_due:
+                rd = self.engine.doppler_from_spectrum(remove_static=self.RD_REMOVE_STATIC)
+                rd_valid = rd[:, 1:valid_len]
+                if self.RD_ENABLED:
+                    self._add_velocity(detections, rd_valid)
+                if rd_due:
+                    rd_map = self._decimate_rd(rd_valid)
+                    self._last_rd_time = now
+                doppler = True
+            if classify or want_spectrogram:
+                profile = self.engine.micro_doppler_profile(frame, self.background)
+                if classify:
+                    activity, activity_conf = self.activity.update(profile)
+                if want_spectrogram:
+                    spectrogram = profile.copy()
+                doppler = True
+            if doppler:
+                stages.lap("doppler")
+
+            # 8) 피크 탐지 및 지수적 추적
             current_peak_idx = int(np.argmax(diff_db))
             current_peak_val = float(diff_db[current_peak_idx])
 
@@ -166,7 +384,7 @@ class FMCWDetector:
                     + current_peak_val * self.ALPHA_FALL
                 )
 
-            # 7) 감지 여부 & bar 비율
+            # 9) 감지 여부 & bar 비율
             is_detected = self.stable_peak_val >= self.MIN_DB_FOR_BAR
             ratio = (self.stable_peak_val - self.MIN_DB_FOR_BAR) / (
                 self.MAX_DB_FOR_BAR - self.MIN_DB_FOR_BAR
@@ -176,38 +394,103 @@ class FMCWDetector:
             if ratio > 1:
                 ratio = 1.0
 
-            # 8) 감지 안 된 상태에서 약한 신호가 계속 들어오면 clutter 업데이트
+            # 10) 감지 안 된 상태에서 약한 신호가 계속 들어오면 clutter 업데이트
             if (
                 not is_detected
                 and current_peak_val < self.MIN_DB_FOR_BAR
                 and self.clutter_map is not None
             ):
-                self.clutter_map = self.clutter_map * 0.98 + self.smoothed_profile * 0.02
+                self.clutter_map *= np.float32(0.98)
+                np.multiply(self.smoothed_profile, np.float32(0.02), out=self._scratch)
+                self.clutter_map += self._scratch
+            stages.lap("peak")
+            self.m_frames.inc()
 
-            return {
+            result = {
                 "mode": "FMCW",
-                "signal": diff_db.tolist(),
                 "peak_val": float(self.stable_peak_val),
                 "ratio": float(ratio),
                 "is_detected": bool(is_detected),
                 "peak_idx": int(current_peak_idx),
             }
+            if self.wants("range_profile"):
+                # 배열 그대로 전달 → 직렬화는 wire_format 에서 (JSON/바이너리)
+                # (작업 버퍼는 다음 프레임에서 덮어쓰므로 복사본 전달)
+                result["signal"] = diff_db.copy()
+            if want_detections:
+                result["detections"] = detections
+            if spectrogram is not None:
+                result["spectrogram"] = spectrogram
+            if activity is not None:
+                result["activity"] = activity
+                result["activity_confidence"] = activity_conf
+            if rd_map is not None:
+                result["rd_map"] = rd_map
+                result["velocity_res"] = float(self.VELOCITY_RES)
+            return result
 
         except Exception:
+            self.m_errors.inc()
+            return None
+
+    def _load_activity(self, path):
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            model = ActivityModel.load(path)
+        except Exception as e:
+            print(f"⚠️ [FMCW] 활동 분류 모델 로드 실패 ({path}): {e}")
             return None
+        if model.n_bins != self.NUM_CHIRPS:
+            print(f"⚠️ [FMCW] 활동 분류 모델 bin 수 불일치 ({model.n_bins} != {self.NUM_CHIRPS})")
+            return None
+        print(f"✅ [FMCW] 활동 분류 모델 로드: {path} (window={model.window})")
+        return ActivityClassifier(model)
+
+    def _add_velocity(self, detections, rd_valid):
+        """
+        검출 bin 의 Doppler 스펙트럼 피크 → 속도 (m/s, +: 접근 / -: 멀어짐)
+        RD 맵 2D CFAR 로 검출된 셀 중 그 range 열에서 가장 큰 Doppler bin 을 쓰고,
+        검출 셀이 없거나 피크가 열의 잡음(중앙값)보다 VELOCITY_MIN_DB 이상 크지 않으면
+        (정지 표적: MTI 로 0 Hz 가 지워져 잡음만 남음) 속도를 넣지 않는다.
+        """
+        power = np.square(rd_valid, dtype=np.float64)
+        mask, _, noise = CFAR_2D[self.CFAR_METHOD.upper()](
+            power, guard=self.RD_CFAR_GUARD, train=self.RD_CFAR_TRAIN, pfa=self.CFAR_PFA)
+        center = self.NUM_CHIRPS // 2
+        gate = 10.0 ** (self.VELOCITY_MIN_DB / 20.0)   # 크기(|.|) 비율
+        for det in detections:
+            col = det["bin"]
+            column = rd_valid[:, col]
+            hits = np.flatnonzero(mask[:, col])
+            if hits.size == 0:
+                continue
+            doppler_bin = int(hits[np.argmax(column[hits])])
+            if column[doppler_bin] <= gate * float(np.median(column)):
+                continue
+            det["doppler_bin"] = doppler_bin
+            det["doppler_snr_db"] = float(
+                10 * np.log10(power[doppler_bin, col] / max(noise[doppler_bin, col], 1e-30)))
+            # 수신 위상 = exp(-j·4πR/λ) → 거리가 줄면(접근) +주파수
+            det["velocity"] = float((doppler_bin - center) * self.VELOCITY_RES)
+
+    def _decimate_rd(self, rd_valid):
+        """RD 맵 max-pooling 축소 + 1 dB 단위 양자화 → int16 [doppler][range]"""
+        fd, fr = self.RD_DECIMATE
+        rows = rd_valid.shape[0] // fd * fd
+        cols = rd_valid.shape[1] // fr * fr
+        pooled = rd_valid[:rows, :cols].reshape(rows // fd, fd, cols // fr, fr).max(axis=(1, 3))
+        np.maximum(pooled, 1e-9, out=pooled)
+        np.log10(pooled, out=pooled)
+        pooled *= np.float32(20)
+        return np.rint(pooled).astype(np.int16)
 
     def close(self):
-        if self.sdr:
-            try:
-                self.sdr.tx_destroy_buffer()
-            except:
-                pass
-            try:
-                self.sdr.rx_destroy_buffer()
-            except:
-                pass
-            try:
-                del self.sdr
-            except:
-                pass
-            self.sdr = None
\ No newline at end of file
+        if self.sdr is None:
+            return
+        # 적응된 clutter map 을 남겨두면 다음 전환 때 바로 사용
+        if self.clutter_map is not None:
+            self.session.store_calibration("FMCW", self.calibration_config(), self.clutter_map.copy())
+        self.sdr = None
+        if self._owns_session:
+            self.session.close()
@@ -0,0 +1,169 @@
+# 파일명: run_activity_train.py
+# 기능: Micro_Doppler_Logger 데이터로 걷기/서 있기 분류 모델 학습 (오프라인)
+#
+# 사용 예)
+#   python run_activity_train.py --log micro_doppler_walk_stand
+#   python run_activity_train.py --csv ../../micro_doppler_walk_stand.csv --window 16
+#   python run_activity_train.py --dataset walk_stand.ds     # run_profile_export.py dataset 으로 변환한 것
+#
+# 큰 수집 데이터는 --dataset 사용 권장: 메모리맵에서 창을 배치 단위로 읽어 특징만 메모리에 남긴다.
+#
+# 결과 모델(npz)은 기본적으로 backend/models/activity_model.npz 에 저장되고
+# FMCWDetector 가 시작할 때 자동으로 불러온다 (환경변수 ACTIVITY_MODEL 로 변경 가능).
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+
+from fmcw.activity import CLASS_NAMES, ActivityModel, doppler_features, sliding_windows
+from fmcw.dataset import ProfileDataset, segment_ids
+from fmcw.profile_log import load_log
+
+DEFAULT_OUT = os.path.join(backend_dir, "models", "activity_model.npz")
+
+
+# ------------------------------------------------------
+# 데이터 읽기
+# ------------------------------------------------------
+def read_csv(path: str):
+    """기존 CSV (label, [timestamp,] doppler_0..) → (labels, timestamps 또는 None, profiles)"""
+    with open(path) as f:
+        header = f.readline().strip().split(",")
+    data = np.loadtxt(path, delimiter=",", skiprows=1, dtype=np.float32, ndmin=2)
+    if data.shape[0] == 0:
+        return np.zeros(0, np.int16), None, np.zeros((0, len(header) - 1), np.float32)
+    labels = data[:, 0].astype(np.int16)
+    if len(header) > 1 and header[1] == "timestamp":
+        return labels, data[:, 1].astype(np.float64), data[:, 2:]
+    return labels, None, data[:, 1:]
+
+
+def load_sources(args):
+    """모든 입력 → (특징 [N, F], 라벨 [N], segment [N], n_bins, 예시 창 1개)"""
+    sets = []
+    for path in args.csv or ():
+        sets.append((path,) + read_csv(path))
+    for path in args.log or ():
+        sets.append((path,) + load_log(path))
+
+    feats, labels, groups = [], [], []
+    n_bins, sample = None, None
+    group_offset = 0
+
+    def add(path, X, y, g, rows, n_seg):
+        nonlocal group_offset
+        g = g.astype(np.int64) + group_offset
+        print(f">>> {path}: {rows}행 → 창 {len(y)}개 (segment {n_seg})")
+        feats.append(X)
+        labels.append(y)
+        groups.append(g)
+        group_offset = g.max() + 1 if len(g) else group_offset
+
+    for path, lab, ts, prof in sets:
+        if len(lab) == 0:
+            print(f"⚠️ 데이터 없음: {path}")
+            continue
+        seg = segment_ids(lab, ts, args.max_gap)
+        w, y, starts = sliding_windows(prof, lab, args.window, args.stride, seg)
+        n_bins = prof.shape[1]
+        if len(y) and sample is None:
+            sample = np.array(w[0])
+        add(path, doppler_features(w), y, seg[starts], len(lab), seg.max() + 1)
+
+    # 메모리맵 데이터셋: 창을 배치로 읽고 특징만 보관
+    for path in args.dataset or ():
+        ds = ProfileDataset(path)
+        if len(ds) == 0:
+            print(f"⚠️ 데이터 없음: {path}")
+            continue
+        seg = ds.segments(args.max_gap)
+        starts = ds.window_starts(args.window, args.stride, args.max_gap)
+        X, y = [], []
+        for w, lab in ds.iter_windows(starts, args.window):
+            X.append(doppler_features(w))
+            y.append(lab)
+        n_bins = ds.n_bins
+        if len(starts) and sample is None:
+            sample = np.array(ds.window(starts[0], args.window))
+        if not X:
+            continue
+        add(path, np.concatenate(X), np.concatenate(y), seg[starts], len(ds), seg.max() + 1)
+
+    if not feats:
+        return None, None, None, None, None
+    return np.concatenate(feats), np.concatenate(labels), np.concatenate(groups), n_bins, sample
+
+
+# ------------------------------------------------------
+# 학습 / 평가
+# ------------------------------------------------------
+def confusion(y_true, y_pred, k):
+    m = np.zeros((k, k), dtype=np.int64)
+    np.add.at(m, (y_true, y_pred), 1)
+    return m
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="걷기/서 있기 분류 모델 학습")
+    parser.add_argument("--csv", nargs="*", help="Logger CSV (label, doppler_0..)")
+    parser.add_argument("--log", nargs="*", help="Logger npz 청크 디렉터리")
+    parser.add_argument("--dataset", nargs="*", help="메모리맵 데이터셋 디렉터리 (run_profile_export.py dataset)")
+    parser.add_argument("--window", type=int, default=16, help="창 길이 (프레임)")
+    parser.add_argument("--stride", type=int, default=2, help="창 간격 (프레임)")
+    parser.add_argument("--max-gap", type=float, default=0.5, help="segment 분리 시간 간격 (초)")
+    parser.add_argument("--val", type=float, default=0.2, help="검증 segment 비율")
+    parser.add_argument("--l2", type=float, default=1e-3)
+    parser.add_argument("--epochs", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    if not args.csv and not args.log and not args.dataset:
+        parser.error("--csv, --log 또는 --dataset 필요")
+
+    X, y, groups, n_bins, one = load_sources(args)
+    if X is None or len(y) == 0:
+        print("❌ 학습할 창이 없습니다.")
+        return 1
+
+    # segment 단위 분할 (겹치는 창이 train/val 에 동시에 들어가지 않도록)
+    rng = np.random.default_rng(args.seed)
+    unique = np.unique(groups)
+    val_groups = rng.choice(unique, size=int(round(len(unique) * args.val)), replace=False)
+    is_val = np.isin(groups, val_groups)
+    if is_val.all() or not is_val.any():
+        is_val = rng.random(len(y)) < args.val
+
+    model = ActivityModel(n_bins, args.window, CLASS_NAMES)
+    model.fit(X[~is_val], y[~is_val], l2=args.l2, epochs=args.epochs)
+
+    k = len(CLASS_NAMES)
+    for name, mask in (("train", ~is_val), ("val", is_val)):
+        if not mask.any():
+            continue
+        pred = model.predict(X[mask])
+        acc = float(np.mean(pred == y[mask]))
+        print(f">>> {name}: {mask.sum()}개, 정확도 {acc * 100:.1f}%")
+        print(confusion(y[mask], pred, k))
+
+    # 프레임당 추론 시간 (특징 추출 + 예측, 창 1개)
+    t0 = time.perf_counter()
+    for _ in range(200):
+        model.predict_proba(doppler_features(one))
+    per_frame = (time.perf_counter() - t0) / 200 * 1e3
+    print(f">>> 추론 시간: {per_frame:.3f} ms/frame")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    model.save(args.out)
+    print(f">>> 저장됨: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+# 파일명: run_dsp_benchmark.py
+# 기능: DSP 핫패스 벤치마크 (하드웨어 불필요, SimulatedPluto 로 만든 프레임 사용)
+#
+# 사용 예)
+#   python run_dsp_benchmark.py --out bench_jetson.json
+#   python run_dsp_benchmark.py --compare bench_jetson.json --fail-over 10
+#
+# 측정 항목 (케이스별)
+#   fps, latency p50/p99/mean/max (ms), 프레임당 peak allocation (tracemalloc)
+# 결과 JSON 은 --compare 로 이전 결과와 비교할 수 있다.
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+root_dir = os.path.dirname(backend_dir)
+for path in (backend_dir, root_dir):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from fmcw.config import FMCWConfig
+from fmcw.fft_backend import get_backend
+from fmcw.processor import FMCWProcessor
+from fmcw.sim_pluto import SimulatedPluto
+from fmcw.waveform import make_frame
+from cw_logic import MotionDetector
+from fmcw_logic import FMCWDetector
+
+
+# ------------------------------------------------------
+# 입력 데이터
+# ------------------------------------------------------
+class CannedSDR:
+    """
+    미리 합성한 버퍼를 순환 반환하는 SDR
+    - rx() 비용이 0 에 가까워 DSP 시간만 측정된다
+    """
+    def __init__(self, buffers):
+        self.buffers = buffers
+        self.index = 0
+
+    def rx(self):
+        buf = self.buffers[self.index]
+        self.index = (self.index + 1) % len(self.buffers)
+        return buf
+
+    def tx_destroy_buffer(self):
+        pass
+
+    def rx_destroy_buffer(self):
+        pass
+
+
+def synth_buffers(mode: str, buffer_size: int, sample_rate: float, count: int = 8,
+                  samples_per_chirp: int = 1024, tx=None):
+    sim = SimulatedPluto("sim:", seed=0, samples_per_chirp=samples_per_chirp)
+    sim.sample_rate = int(sample_rate)
+    sim.rx_buffer_size = int(buffer_size)
+    sim.rx_hardwaregain_chan0 = 70 if mode == "FMCW" else 60
+    if tx is not None:
+        sim.tx(tx)
+    elif mode == "CW":
+        t = np.arange(buffer_size) / sample_rate
+        sim.tx(np.exp(1j * 2 * np.pi * 100e3 * t))
+    else:
+        t = np.arange(samples_per_chirp) / sample_rate
+        sim.tx(np.tile(np.exp(1j * np.pi * 5e11 * t**2), 4))
+    return [sim.rx() for _ in range(count)]
+
+
+# ------------------------------------------------------
+# 벤치마크 케이스
+# ------------------------------------------------------
+def case_processor_doppler_fft(num_chirps: int, samples: int):
+    cfg = FMCWConfig()
+    cfg.num_chirps = num_chirps
+    cfg.fft_size = samples
+    cfg.rx_buffer_size = num_chirps * samples
+    proc = FMCWProcessor(cfg)
+    sdr = CannedSDR(synth_buffers("FMCW", cfg.rx_buffer_size, cfg.sample_rate,
+                                  samples_per_chirp=samples,
+                                  tx=make_frame(cfg, 4).ravel()))
+
+    def step():
+        proc.doppler_fft(proc.collect_frame(sdr, None))
+    return step
+
+
+def case_fmcw_process_frame():
+    det = FMCWDetector("sim:")
+    det.sdr = CannedSDR(synth_buffers("FMCW", det.TOTAL_SAMPLES, det.SAMPLE_RATE,
+                                      samples_per_chirp=det.N_SAMPLES))
+    det.clutter_map = np.zeros(det.N_SAMPLES)
+    return det.process_frame
+
+
+def case_fmcw_offload():
+    """수신 + DSP 프로세스 파이프라인 (공유 메모리, 코어가 2개 이상일 때 이득)"""
+    from dsp_offload import OffloadedFMCW, get_worker
+    det = FMCWDetector("sim:")
+    buffers = synth_buffers("FMCW", det.TOTAL_SAMPLES, det.SAMPLE_RATE,
+                            samples_per_chirp=det.N_SAMPLES)
+    det.sdr = CannedSDR(buffers)
+    det.clutter_map = np.zeros(det.N_SAMPLES, dtype=np.float32)
+    radar = OffloadedFMCW(det)
+    radar.worker = get_worker("sim:bench", det.TOTAL_SAMPLES)
+    radar.worker.request("clutter", det.clutter_map)
+    return radar.process_frame
+
+
+def case_fmcw_calibrate():
+    det = FMCWDetector("sim:")
+    det.sdr = CannedSDR(synth_buffers("FMCW", det.TOTAL_SAMPLES, det.SAMPLE_RATE,
+                                      samples_per_chirp=det.N_SAMPLES))
+    # 세션 캐시를 건너뛰고 매번 실제 학습을 측정
+    return lambda: det.calibrate(force=True)
+
+
+def case_cw_process_frame():
+    det = MotionDetector("sim:")
+    det.sdr = CannedSDR(synth_buffers("CW", 1024 * 16, 2e6))
+    det.current_baseline = 500.0
+    return det.process_frame
+
+
+def case_cw_speed_fft(n: int):
+    import run_doppler_speed as rds
+    win = np.hanning(n)
+    sdr = CannedSDR(synth_buffers("CW", n, rds.fs))
+
+    def step():
+        rds.doppler_speed(sdr.rx(), win=win, n=n)
+    return step
+
+
+CASES = {
+    "processor.doppler_fft[64x512]": (lambda: case_processor_doppler_fft(64, 512), 200),
+    "processor.doppler_fft[128x1024]": (lambda: case_processor_doppler_fft(128, 1024), 100),
+    "fmcw_logic.process_frame[128x1024]": (case_fmcw_process_frame, 100),
+    "dsp_offload.process_frame[128x1024]": (case_fmcw_offload, 100),
+    "fmcw_logic.calibrate[128x1024]": (case_fmcw_calibrate, 3),
+    "cw_logic.process_frame[16k]": (case_cw_process_frame, 500),
+    "run_doppler_speed.doppler_speed[4k]": (lambda: case_cw_speed_fft(4096), 500),
+    "run_doppler_speed.doppler_speed[16k]": (lambda: case_cw_speed_fft(16384), 300),
+}
+
+
+# ------------------------------------------------------
+# 측정
+# ------------------------------------------------------
+def measure(step, iterations: int, warmup: int = 3, alloc_iterations: int = 5) -> dict:
+    # 반복 수가 적은 (느린) 케이스는 warmup / 메모리 측정도 줄인다
+    warmup = min(warmup, max(1, iterations // 3))
+    alloc_iterations = min(alloc_iterations, max(1, iterations // 3))
+    for _ in range(warmup):
+        step()
+
+    # 1) 시간 측정 (tracemalloc 끔)
+    lat = np.empty(iterations)
+    t_start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        step()
+        lat[i] = time.perf_counter() - t0
+    total = time.perf_counter() - t_start
+
+    # 2) 메모리 측정 (tracemalloc 은 느리므로 몇 프레임만)
+    tracemalloc.start()
+    peak = 0
+    for _ in range(alloc_iterations):
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        step()
+        _, frame_peak = tracemalloc.get_traced_memory()
+        peak = max(peak, frame_peak - base)
+    tracemalloc.stop()
+
+    lat_ms = lat * 1e3
+    return {
+        "iterations": iterations,
+        "fps": iterations / total,
+        "p50_ms": float(np.percentile(lat_ms, 50)),
+        "p99_ms": float(np.percentile(lat_ms, 99)),
+        "mean_ms": float(lat_ms.mean()),
+        "max_ms": float(lat_ms.max()),
+        "peak_alloc_bytes": int(peak),
+    }
+
+
+def environment() -> dict:
+    info = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "fft_backend": get_backend().name,
+        "fft_workers": get_backend().workers,
+        "timestamp": time.time(),
+    }
+    try:
+        import scipy
+        info["scipy"] = scipy.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def compare(current: dict, previous: dict, fail_over: float = None) -> int:
+    """p50 기준 비교. fail_over(%) 를 넘는 회귀가 있으면 1 반환"""
+    print("\n>>> 이전 결과와 비교 (p50 latency)")
+    regressions = 0
+    for name, cur in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if old is None:
+            print(f"  {name:40s} (새 항목)")
+            continue
+        change = (cur["p50_ms"] - old["p50_ms"]) / old["p50_ms"] * 100
+        alloc = cur["peak_alloc_bytes"] - old["peak_alloc_bytes"]
+        mark = ""
+        if fail_over is not None and change > fail_over:
+            mark = "  ❌ 회귀"
+            regressions += 1
+        print(f"  {name:40s} {old['p50_ms']:8.2f} → {cur['p50_ms']:8.2f} ms "
+              f"({change:+6.1f}%)  alloc {alloc / 1e6:+7.2f} MB{mark}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="DSP 핫패스 벤치마크")
+    parser.add_argument("--out", default="dsp_benchmark.json", help="결과 JSON 경로")
+    parser.add_argument("--only", nargs="*", help="이름에 포함된 케이스만 실행")
+    parser.add_argument("--scale", type=float, default=1.0, help="반복 횟수 배율")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--fail-over", type=float,
+                        help="p50 회귀가 이 %% 를 넘으면 종료코드 1")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'case':40s} {'fps':>9s} {'p50':>8s} {'p99':>8s} {'peak alloc':>11s}")
+    for name, (factory, iterations) in CASES.items():
+        if args.only and not any(key in name for key in args.only):
+            continue
+        step = factory()
+        n = max(1, int(iterations * args.scale))
+        r = measure(step, n)
+        results[name] = r
+        print(f"{name:40s} {r['fps']:9.1f} {r['p50_ms']:7.2f}ms {r['p99_ms']:7.2f}ms "
+              f"{r['peak_alloc_bytes'] / 1e6:9.2f}MB")
+
+    report = {"environment": environment(), "results": results}
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\n>>> 저장됨: {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            previous = json.load(f)
+        return compare(report, previous, args.fail_over)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,146 @@
+# 파일명: run_iq_capture.py
+# 기능: Raw IQ 녹화 / 재생(재처리) / 정보 확인
+#
+# 사용 예)
+#   python run_iq_capture.py record --mode FMCW --frames 300 --out walk.iq
+#   python run_iq_capture.py replay walk.iq --mode FMCW
+#   python run_iq_capture.py info walk.iq
+#
+# PLUTO_URI=sim: 으로 하드웨어 없이도 녹화 흐름을 확인할 수 있다.
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+
+from fmcw.iq_record import IQReplay, RecordingSDR, read_header
+from cw_logic import MotionDetector
+from fmcw_logic import FMCWDetector
+
+SDR_IP = os.environ.get("PLUTO_URI", "ip:192.168.2.1")
+
+
+def make_detector(mode: str, uri: str):
+    if mode == "CW":
+        return MotionDetector(uri)
+    return FMCWDetector(uri)
+
+
+def chirp_meta(detector) -> dict:
+    if isinstance(detector, FMCWDetector):
+        return {
+            "mode": "FMCW",
+            "chirp_bandwidth": detector.BANDWIDTH,
+            "chirp_duration": detector.CHIRP_DURATION,
+            "num_chirps": detector.NUM_CHIRPS,
+            "samples_per_chirp": detector.N_SAMPLES,
+        }
+    return {"mode": "CW"}
+
+
+def cmd_record(args):
+    detector = make_detector(args.mode, SDR_IP)
+    if not detector.connect():
+        return 1
+
+    # 설정은 detector.connect() 가 끝낸 상태 → rx 만 녹화기로 감싼다
+    sdr = RecordingSDR(detector.sdr, args.out, uri=SDR_IP, **chirp_meta(detector))
+    print(f">>> 녹화 시작: {args.frames} 버퍼 → {args.out}")
+    t0 = time.perf_counter()
+    try:
+        for i in range(args.frames):
+            sdr.rx()
+            sys.stdout.write(f"\r  {i + 1}/{args.frames}")
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sdr.close()
+        detector.close()
+
+    dt = time.perf_counter() - t0
+    count = sdr.recorder.count if sdr.recorder else 0
+    print(f"\n>>> 녹화 완료: {count} 버퍼 ({dt:.1f}s)")
+    return 0
+
+
+def cmd_replay(args):
+    meta, count = read_header(args.path)
+    mode = args.mode or meta.get("mode", "FMCW")
+
+    detector = make_detector(mode, SDR_IP)
+    detector.sdr = IQReplay(args.path, realtime=args.realtime)
+    if args.calibrate:
+        # 녹화가 calibrate 읽기 횟수보다 짧을 수 있으므로 반복 재생으로 학습
+        detector.sdr.loop = True
+        detector.calibrate()
+        detector.sdr.loop = False
+        detector.sdr.rewind()
+    elif mode == "FMCW":
+        detector.clutter_map = np.zeros(detector.N_SAMPLES)
+
+    print(f">>> 재생: {args.path} ({count} 버퍼, mode={mode})")
+    frames = 0
+    detections = 0
+    t0 = time.perf_counter()
+    while True:
+        result = detector.process_frame()
+        if result is None:
+            break
+        frames += 1
+        detections += int(result["is_detected"])
+    dt = time.perf_counter() - t0
+
+    fs = float(meta.get("sample_rate", 0)) or 1.0
+    realtime_fps = fs / float(meta["rx_buffer_size"])
+    fps = frames / dt if dt > 0 else float("inf")
+    print(f">>> {frames} 프레임 / {dt:.2f}s = {fps:.1f} fps "
+          f"(실시간 대비 x{fps / realtime_fps:.1f}), 감지 {detections} 프레임")
+    return 0
+
+
+def cmd_info(args):
+    meta, count = read_header(args.path)
+    print(f"파일: {args.path}")
+    print(f"버퍼 수: {count}")
+    for key in sorted(meta):
+        print(f"  {key}: {meta[key]}")
+    if count:
+        ts = IQReplay(args.path).timestamps
+        print(f"  녹화 길이: {ts[-1] - ts[0]:.2f}s")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Pluto Raw IQ 녹화/재생")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("record", help="sdr.rx() 버퍼 녹화")
+    p.add_argument("--mode", choices=["CW", "FMCW"], default="FMCW")
+    p.add_argument("--frames", type=int, default=300)
+    p.add_argument("--out", default="capture.iq")
+    p.set_defaults(func=cmd_record)
+
+    p = sub.add_parser("replay", help="녹화 파일을 detector 로 재처리")
+    p.add_argument("path")
+    p.add_argument("--mode", choices=["CW", "FMCW"])
+    p.add_argument("--realtime", action="store_true", help="녹화 속도대로 재생")
+    p.add_argument("--calibrate", action="store_true",
+                   help="앞부분 버퍼로 배경 학습 후 처음부터 재생")
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("info", help="헤더 정보 출력")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_info)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
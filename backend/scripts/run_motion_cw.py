@@ -1,12 +1,18 @@
-import adi
-import numpy as np
+import os
 import sys
+import numpy as np
 import time
 
+# fmcw 패키지 경로 (backend/) — "sim:" URI 또는 pyadi-iio 미설치 시 시뮬레이터 사용
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+from fmcw.pluto_iface import open_pluto
+
 # ==========================================
 # 1. 설정 (Sensitivity Tuning)
 # ==========================================
-SDR_IP = "ip:192.168.2.1"
+SDR_IP = os.environ.get("PLUTO_URI", "ip:192.168.2.1")
 
 # [감도 조절]
 # 아까 노이즈가 11.2였으므로, 그보다 높은 15.0을 넘어야만 움직임으로 인정합니다.
@@ -22,7 +28,7 @@ ADAPTATION_RATE = 0.05
 # ==========================================
 print(f">>> PlutoSDR({SDR_IP}) 연결 및 설정 중...")
 try:
-    sdr = adi.Pluto(SDR_IP)
+    sdr = open_pluto(SDR_IP)
 except Exception as e:
     print("❌ 연결 실패: 케이블을 확인하거나 IP를 확인하세요.")
     sys.exit()
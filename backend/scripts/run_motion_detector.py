@@ -1,13 +1,14 @@
 import numpy as np
+import os
 import time
 import sys
 
-# 하드웨어 라이브러리 체크
-try:
-    import adi
-    HAS_HARDWARE = True
-except ImportError:
-    HAS_HARDWARE = False
+# fmcw 패키지 경로 (backend/) — "sim:" URI 또는 pyadi-iio 미설치 시 시뮬레이터 사용
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+
+from fmcw.pluto_iface import open_pluto
 
 class MotionDetector:
     def __init__(self, ip="ip:192.168.2.1"):
@@ -26,13 +27,9 @@ class MotionDetector:
 
     def connect(self):
         """PlutoSDR 연결 및 설정 (run_motion_cw.py 코드 그대로)"""
-        if not HAS_HARDWARE:
-            print("⚠️ [Mock] 하드웨어 없음 -> 가상 모드로 동작")
-            return True
-
         print(f">>> PlutoSDR({self.SDR_IP}) 연결 및 설정 중...")
         try:
-            self.sdr = adi.Pluto(self.SDR_IP)
+            self.sdr = open_pluto(self.SDR_IP)
             
             # CW 모드 설정 (동일)
             self.sdr.sample_rate = int(2e6)
@@ -83,13 +80,8 @@ class MotionDetector:
     def process_frame(self):
         """메인 루프의 '한 바퀴' 로직"""
         # 1. 데이터 수신
-        if self.sdr:
-            raw_data = self.sdr.rx()
-        else:
-            # Mock 데이터 (테스트용)
-            noise = np.random.normal(500, 50, 4096)
-            if np.random.rand() > 0.95: noise += 1000 
-            raw_data = noise
+        if not self.sdr: return None
+        raw_data = self.sdr.rx()
 
         if len(raw_data) == 0: return None
 
@@ -1,12 +1,14 @@
 import numpy as np
+import os
 import time
 import sys
 
-try:
-    import adi
-    HAS_HARDWARE = True
-except ImportError:
-    HAS_HARDWARE = False
+# fmcw 패키지 경로 (backend/) — "sim:" URI 또는 pyadi-iio 미설치 시 시뮬레이터 사용
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+
+from fmcw.pluto_iface import open_pluto
 
 class FMCWDetector:
     def __init__(self, ip="ip:192.168.2.1"):
@@ -32,13 +34,9 @@ class FMCWDetector:
         self.stable_peak_val = self.MIN_DB_FOR_BAR 
 
     def connect(self):
-        if not HAS_HARDWARE:
-            print("⚠️ [FMCW Mock] 하드웨어 없음")
-            return True
-
         print(f">>> [FMCW] PlutoSDR({self.SDR_IP}) 연결 중...")
         try:
-            self.sdr = adi.Pluto(self.SDR_IP)
+            self.sdr = open_pluto(self.SDR_IP)
             self.sdr.sample_rate = int(self.SAMPLE_RATE)
             self.sdr.rx_lo = int(self.CENTER_FREQ)
             self.sdr.tx_lo = int(self.CENTER_FREQ)
@@ -90,18 +88,8 @@ class FMCWDetector:
     def process_frame(self):
         """한 프레임 처리"""
         # 1. 데이터 수신
-        if self.sdr:
-            rx = self.sdr.rx()
-        else:
-            # Mock Data (FMCW 흉내 - 특정 주파수 튐)
-            noise = np.random.normal(0, 10, self.N_SAMPLES * self.NUM_CHIRPS)
-            if np.random.rand() > 0.9: 
-                # 가짜 타겟 신호 생성
-                t = np.linspace(0, 100, self.N_SAMPLES * self.NUM_CHIRPS)
-                target = np.sin(2 * np.pi * 0.1 * t) * 5000
-                rx = noise + target
-            else:
-                rx = noise
+        if not self.sdr: return None
+        rx = self.sdr.rx()
 
         if len(rx) == 0: return None
 
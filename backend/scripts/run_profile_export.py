@@ -0,0 +1,90 @@
+# 파일명: run_profile_export.py
+# 기능: Micro_Doppler_Logger 가 남긴 npz 청크 기록 확인 / CSV 내보내기 / 메모리맵 데이터셋 변환
+#
+# 사용 예)
+#   python run_profile_export.py info micro_doppler_walk_stand
+#   python run_profile_export.py csv micro_doppler_walk_stand --out micro_doppler_walk_stand.csv
+#   python run_profile_export.py dataset micro_doppler_walk_stand.csv --out walk_stand.ds
+#   python run_profile_export.py dataset micro_doppler_walk_stand --out walk_stand.ds
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+
+from fmcw.dataset import convert_csv, convert_log
+from fmcw.profile_log import chunk_paths, export_csv, load_log
+
+LABELS = {0: "Walking", 1: "Standing", -1: "(없음)"}
+
+
+def cmd_info(args):
+    paths = chunk_paths(args.dir)
+    if not paths:
+        print(f"❌ 청크 없음: {args.dir}")
+        return 1
+    labels, timestamps, profiles = load_log(args.dir)
+    print(f">>> {args.dir}: 청크 {len(paths)}개, {len(labels)}행, bin {profiles.shape[1]}")
+    if len(timestamps):
+        print(f"    기간: {timestamps.min():.1f} ~ {timestamps.max():.1f} "
+              f"({timestamps.max() - timestamps.min():.1f}s)")
+    values, counts = np.unique(labels, return_counts=True)
+    for value, count in zip(values, counts):
+        print(f"    {LABELS.get(int(value), value)}: {count}")
+    return 0
+
+
+def cmd_csv(args):
+    out = args.out or args.dir.rstrip("/\\") + ".csv"
+    rows = export_csv(args.dir, out, with_timestamp=args.timestamp, append=args.append)
+    print(f">>> {rows}행 → {out}")
+    return 0
+
+
+def cmd_dataset(args):
+    src = args.src.rstrip("/\\")
+    out = args.out or os.path.splitext(src)[0] + ".ds"
+    t0 = time.perf_counter()
+    if os.path.isdir(src):
+        ds = convert_log(src, out)
+    else:
+        ds = convert_csv(src, out, chunk_rows=args.chunk_rows)
+    print(f">>> {len(ds)}행 × bin {ds.n_bins} → {out} ({time.perf_counter() - t0:.1f}s)")
+    values, counts = np.unique(np.asarray(ds.labels), return_counts=True)
+    for value, count in zip(values, counts):
+        print(f"    {LABELS.get(int(value), value)}: {count}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="마이크로 도플러 기록 도구")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("info", help="기록 요약")
+    p.add_argument("dir")
+    p.set_defaults(func=cmd_info)
+
+    p = sub.add_parser("csv", help="기존 형식 CSV 로 내보내기 (label, doppler_0..)")
+    p.add_argument("dir")
+    p.add_argument("--out", help="CSV 경로 (기본: <dir>.csv)")
+    p.add_argument("--timestamp", action="store_true", help="label 다음에 timestamp 열 추가")
+    p.add_argument("--append", action="store_true", help="기존 CSV 뒤에 이어쓰기")
+    p.set_defaults(func=cmd_csv)
+
+    p = sub.add_parser("dataset", help="CSV 또는 청크 디렉터리 → 메모리맵 데이터셋 (학습용)")
+    p.add_argument("src", help="Logger CSV 또는 npz 청크 디렉터리")
+    p.add_argument("--out", help="데이터셋 디렉터리 (기본: <src>.ds)")
+    p.add_argument("--chunk-rows", type=int, default=8192, help="CSV 파싱 단위 (행)")
+    p.set_defaults(func=cmd_dataset)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
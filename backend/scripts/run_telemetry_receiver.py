@@ -0,0 +1,86 @@
+# 파일명: run_telemetry_receiver.py
+# 기능: allinone.py 가 보내는 UDP 텔레메트리 수신 (라즈베리파이 등에서 실행)
+#       상태 변화 이벤트 출력 + 손실 / 지연 / 하트비트 끊김 주기적 표시
+#
+# 사용 예)
+#   python run_telemetry_receiver.py --port 5005
+#   python run_telemetry_receiver.py --port 5005 --stats 10 --timeout 3
+#
+# 라즈베리파이에 이 저장소 전체가 없다면 backend/fmcw/telemetry.py 한 파일만 복사해도 된다 (numpy 필요).
+import argparse
+import os
+import sys
+import time
+
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+
+try:
+    from fmcw.telemetry import TelemetryReceiver, listen
+except ImportError:
+    from telemetry import TelemetryReceiver, listen
+
+
+def fmt_ms(value):
+    return "-" if value is None else f"{value:.1f}ms"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="레이더 UDP 텔레메트리 수신기")
+    parser.add_argument("--port", type=int, default=5005)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--stats", type=float, default=5.0, help="통계 출력 주기 (초)")
+    parser.add_argument("--timeout", type=float, default=3.0, help="이 시간 동안 수신이 없으면 경고 (초)")
+    parser.add_argument("--verbose", action="store_true", help="하트비트도 모두 출력")
+    args = parser.parse_args()
+
+    receiver = TelemetryReceiver()
+    sock, datagrams = listen(args.port, args.host, timeout=min(1.0, args.timeout))
+    print(f">>> {args.host}:{args.port} 수신 대기")
+
+    last_stats = time.monotonic()
+    warned = False
+    try:
+        for data in datagrams:
+            if data is not None:
+                packet = receiver.feed(data)
+                if packet is not None and packet["restart"]:
+                    print(f"🔄 송신기 재시작 감지 (session {packet['session']:08x}, #{packet['seq']})")
+                if packet is None:
+                    # 바이너리가 아닌 데이터그램 (구형 "DETECTED"/"SECURE" 텍스트 등)
+                    if args.verbose:
+                        print(f"  (비 텔레메트리 {len(data)}B) {data[:16]!r}")
+                elif packet["kind"] == "event" or args.verbose:
+                    warned = False
+                    state = "🚨 DETECTED" if packet["detected"] else "✅ SECURE"
+                    metrics = " ".join(f"{k}={v:.2f}" for k, (v, _) in packet["metrics"].items()
+                                       if k != "state")
+                    print(f"[{packet['kind']:9s}] #{packet['seq']} {state} "
+                          f"({fmt_ms(packet['latency'] * 1e3)}) {metrics}")
+                else:
+                    warned = False
+
+            stats = receiver.stats()
+            silence = stats["silence_s"]
+            if silence is not None and silence > args.timeout and not warned:
+                print(f"⚠️ {silence:.1f}초 동안 수신 없음 (송신기 중단 또는 네트워크 장애)")
+                warned = True
+
+            now = time.monotonic()
+            if now - last_stats >= args.stats:
+                last_stats = now
+                print(f">>> 수신 {stats['received']} | 손실 {stats['lost']} "
+                      f"({stats['loss_rate'] * 100:.2f}%) | 순서 {stats['reordered']} | "
+                      f"중복 {stats['duplicates']} | 재시작 {stats['restarts']} | "
+                      f"지연 p50 {fmt_ms(stats['latency_ms_p50'])} "
+                      f"p95 {fmt_ms(stats['latency_ms_p95'])}")
+    except KeyboardInterrupt:
+        print("\n>>> 종료")
+    finally:
+        sock.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,11 @@
 import asyncio
-import json
 import sys
 import os
 import time
-import gc
+import numpy as np
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
 
 # ------------------------------------------------------
@@ -13,20 +13,17 @@ from pydantic import BaseModel
 # ------------------------------------------------------
 current_dir = os.path.dirname(os.path.abspath(__file__))
 scripts_dir = os.path.join(current_dir, "scripts")
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
 if scripts_dir not in sys.path:
     sys.path.append(scripts_dir)
 
-# ------------------------------------------------------
-# 모듈 임포트
-# ------------------------------------------------------
-try:
-    from cw_logic import MotionDetector as CWRadar
-    from fmcw_logic import FMCWDetector as FMCWRadar
-    print("✅ 모듈 로드 성공")
-except ImportError as e:
-    print(f"⚠️ 모듈 로드 실패: {e}")
-    CWRadar = None
-    FMCWRadar = None
+from devices import DeviceRegistry
+from fmcw import metrics
+from fmcw.sdr_session import close_all
+from fmcw.spectrogram import SpectrogramRing
+from fmcw.trace import TRACER
+import wire_format
 
 # ------------------------------------------------------
 # FastAPI 초기화
@@ -42,94 +39,204 @@ app.add_middleware(
 # ------------------------------------------------------
 # 글로벌 상태
 # ------------------------------------------------------
-current_radar = None
-current_mode = "CW"
-
-# 🔒 모드 변경 중복 방지 락
-mode_change_lock = asyncio.Lock()
+# 📡 장치(Pluto)별 레이더 — RADAR_DEVICES="left=ip:...;right=ip:..." (없으면 PLUTO_URI 하나)
+#    장치마다 별도 프로세스에서 수신/DSP, 이 프로세스는 프레임당 1회 직렬화 → WebSocket 팬아웃
+#    ("sim:" 으로 시작하는 URI 는 하드웨어 없이 시뮬레이터 사용)
+devices = DeviceRegistry.from_env()
+
+# 🌊 FMCW range 프로파일 waterfall (장치별 원형 버퍼, 기본 2048 프레임)
+WATERFALL_FRAMES = int(os.environ.get("WATERFALL_FRAMES", 2048))
+waterfalls = {}
+
+# ⏱ 클라이언트별 기본 전송 주기 상한 (Hz, 0 = 프레임이 나오는 대로) — ?rate=30 으로 덮어씀
+WS_RATE = float(os.environ.get("WS_RATE", 0))
+WS_RATE_MAX = 200.0
+
+
+def waterfall_listener(name):
+    def update_waterfall(seq, frame):
+        """수신 스레드에서 프레임당 1회 호출 (열 1개 기록, 이력 복사 없음)"""
+        if frame.get("current_mode") != "FMCW":
+            return
+        signal = frame.get("signal")
+        if signal is None:
+            return
+        ring = waterfalls.get(name)
+        if ring is None or ring.n_bins != len(signal):
+            ring = waterfalls[name] = SpectrogramRing(len(signal), WATERFALL_FRAMES)
+        ring.append(signal, frame.get("timestamp", 0.0))
+    return update_waterfall
+
+
+if WATERFALL_FRAMES > 0:
+    for _device in devices:
+        _device.add_listener(waterfall_listener(_device.name))
+        # waterfall 은 구독자가 없어도 FMCW range 프로파일을 계속 기록
+        _device.hub.require("range_profile")
 
 
 class ModeRequest(BaseModel):
     mode: str
 
 
+class TraceRequest(BaseModel):
+    enabled: bool
+
+
+def find_device(name: str = None):
+    """이름 / URI 로 장치 찾기 (None 이면 첫 번째 장치)"""
+    return devices.default if name is None else devices.get(name)
+
+
+def unknown_device(name: str):
+    return {"status": "Error", "message": f"Unknown device: {name}"}
+
+
+def client_rate(value: str = None):
+    """?rate= 값 → 전송 주기 상한 Hz (None = 제한 없음, 잘못된 값은 기본값)"""
+    try:
+        rate = float(value) if value else WS_RATE
+    except ValueError:
+        rate = WS_RATE
+    if not rate > 0:
+        return None
+    return min(rate, WS_RATE_MAX)
+
+
 # ------------------------------------------------------
 # 기본 정보
 # ------------------------------------------------------
 @app.get("/")
 def read_root():
-    return {"status": "Running", "mode": current_mode}
+    device = devices.default
+    return {
+        "status": "Running",
+        "mode": device.mode,
+        "clients": sum(d.hub.subscriber_count for d in devices),
+        "calibration": device.calibration,
+        "devices": [d.status() for d in devices],
+    }
+
+
+@app.get("/devices")
+def list_devices():
+    return {"devices": [d.status() for d in devices]}
 
 
 # ------------------------------------------------------
-# 🔥 모드 변경 (async + Lock 적용)
+# 📈 단계별 지표 (Prometheus text 포맷)
 # ------------------------------------------------------
-@app.post("/set_mode")
-async def set_mode(req: ModeRequest):
-    global current_radar, current_mode
+@app.get("/metrics")
+async def get_metrics():
+    snapshots = await asyncio.to_thread(devices.metrics_snapshots)
+    return PlainTextResponse(metrics.render(*snapshots), media_type="text/plain; version=0.0.4")
 
-    new_mode = req.mode.upper()
-    print(f"\n🔄 모드 변경 요청: {current_mode} -> {new_mode}")
 
-    # Lock 진입 (동시 요청 방지)
-    async with mode_change_lock:
+# ------------------------------------------------------
+# 🔍 프레임 단계별 trace (RADAR_TRACE=1 또는 POST /debug/trace 로 켬)
+#    GET 결과를 파일로 저장해 ui.perfetto.dev / chrome://tracing 에서 열기
+# ------------------------------------------------------
+@app.post("/debug/trace")
+async def set_trace(req: TraceRequest):
+    return await asyncio.to_thread(devices.set_tracing, req.enabled)
 
-        # 같은 모드는 변경 필요 없음
-        if new_mode == current_mode:
-            print("⏸ 이미 해당 모드입니다.")
-            return {"status": "Already in this mode"}
 
-        # 🔧 기존 레이더 종료
-        if current_radar:
-            try:
-                current_radar.close()
-            except:
-                pass
+@app.get("/debug/trace")
+async def get_trace(seconds: float = 5.0):
+    return await asyncio.to_thread(devices.trace, seconds)
 
-            del current_radar
-            current_radar = None
-            gc.collect()
-            time.sleep(1.5)  # 하드웨어 안정화 시간
 
-        # 🔧 새 모드 생성
-        if new_mode == "CW" and CWRadar:
-            current_radar = CWRadar()
-        elif new_mode == "FMCW" and FMCWRadar:
-            current_radar = FMCWRadar()
-        else:
-            return {"status": "Error", "message": "Module Not Found"}
+# ------------------------------------------------------
+# 🔥 모드 변경 (장치별 Lock, 블로킹 작업은 장치 프로세스에서)
+# ------------------------------------------------------
+async def change_mode(device, mode: str):
+    new_mode = mode.upper()
+    print(f"\n🔄 [{device.name}] 모드 변경 요청: {device.mode} -> {new_mode}")
+    reply = await device.set_mode(new_mode)
+    if reply.get("status") == "Mode Changed":
+        print(f"✔ [{device.name}] 모드 변경 완료 → {new_mode}")
+    else:
+        print(f"⏸ [{device.name}] {reply.get('status')}")
+    return reply
 
-        # 🔧 하드웨어 연결
-        if not current_radar.connect():
-            print("❌ 하드웨어 연결 실패")
-            return {"status": "Connection Failed"}
 
-        # 🔧 캘리브레이션
-        current_radar.calibrate()
+@app.post("/set_mode")
+async def set_mode(req: ModeRequest):
+    return await change_mode(devices.default, req.mode)
 
-        # 모드 갱신
-        current_mode = new_mode
 
-        print(f"✔ 모드 변경 완료 → {current_mode}")
-        return {"status": "Mode Changed", "current_mode": current_mode}
+@app.post("/devices/{device}/set_mode")
+async def set_device_mode(device: str, req: ModeRequest):
+    target = find_device(device)
+    if target is None:
+        return unknown_device(device)
+    return await change_mode(target, req.mode)
 
 
 # ------------------------------------------------------
-# 서버 시작 시 CW 레이더 초기화
+# 수동 재캘리브레이션 (진행 중에도 마지막 프레임은 계속 제공)
+# ------------------------------------------------------
+@app.post("/recalibrate")
+async def recalibrate():
+    return await devices.default.recalibrate()
+
+
+@app.post("/devices/{device}/recalibrate")
+async def recalibrate_device(device: str):
+    target = find_device(device)
+    if target is None:
+        return unknown_device(device)
+    return await target.recalibrate()
+
+
+# ------------------------------------------------------
+# 🌊 waterfall 스냅샷 (FMCW range-time)
+# ------------------------------------------------------
+def waterfall_snapshot(device, frames: int, step: int):
+    """
+    최근 frames 개 프레임의 range 프로파일 [time][range] (dB, 1 dB 단위)
+    step > 1 이면 시간축을 step 간격으로 솎아냄
+    """
+    ring = waterfalls.get(device.name)
+    if ring is None or len(ring) == 0:
+        return {"status": "Empty", "device": device.name, "mode": device.mode, "data": []}
+
+    data, times = ring.snapshot(max(1, frames))
+    step = max(1, step)
+    data = data[:, ::-step][:, ::-1]
+    times = times[::-step][::-1]
+    return {
+        "status": "OK",
+        "device": device.name,
+        "mode": device.mode,
+        "frames": int(data.shape[1]),
+        "bins": int(data.shape[0]),
+        "timestamps": times.tolist(),
+        "data": np.rint(data.T).astype(np.int16).tolist(),
+    }
+
+
+@app.get("/waterfall")
+def get_waterfall(frames: int = 300, step: int = 1):
+    return waterfall_snapshot(devices.default, frames, step)
+
+
+@app.get("/devices/{device}/waterfall")
+def get_device_waterfall(device: str, frames: int = 300, step: int = 1):
+    target = find_device(device)
+    if target is None:
+        return unknown_device(device)
+    return waterfall_snapshot(target, frames, step)
+
+
+# ------------------------------------------------------
+# 서버 시작 시 모든 장치를 CW 모드로 초기화
 # ------------------------------------------------------
 @app.on_event("startup")
 async def startup_event():
-    global current_radar, current_mode
-    print("\n>>> [System] 서버 시작 (기본: CW)")
-
-    if CWRadar:
-        current_radar = CWRadar()
-        if current_radar.connect():
-            current_radar.calibrate()
-            current_mode = "CW"
-            print("✔ 기본 CW 모드 준비완료")
-        else:
-            print("❌ 기본 CW 초기화 실패")
+    print(f"\n>>> [System] 서버 시작 (기본: CW, 장치 {len(devices)}개)")
+    TRACER.process_name = "server"
+    await devices.start(asyncio.get_running_loop(), mode="CW")
 
 
 # ------------------------------------------------------
@@ -137,56 +244,64 @@ async def startup_event():
 # ------------------------------------------------------
 @app.on_event("shutdown")
 async def shutdown_event():
-    global current_radar
-    if current_radar:
-        try:
-            current_radar.close()
-        except:
-            pass
+    await asyncio.to_thread(devices.stop)
+    close_all()
 
 
 # ------------------------------------------------------
 # WebSocket 실시간 데이터 스트림
 # ------------------------------------------------------
-@app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket):
-    await websocket.accept()
-    print("🔌 클라이언트 연결됨")
+async def stream(websocket: WebSocket, device):
+    # 전송 포맷 협상: ?format=json|f32|u8 또는 subprotocol "radar.f32" 등
+    fmt, subprotocol = wire_format.negotiate(
+        websocket.query_params.get("format"),
+        websocket.scope.get("subprotocols", ()),
+    )
+    if device is None:
+        await websocket.close(code=4404)
+        return
+    # 전송 주기: ?rate=30 (화면) / ?rate=5 (모바일) — 수신 속도와 무관하게 마감 시각 기준으로 맞춤
+    rate = client_rate(websocket.query_params.get("rate"))
+    # 받을 데이터: ?products=scalars,range_profile,rd_map (없으면 전부)
+    # 레이더는 구독자 누구도 원하지 않는 product (CFAR / RD 맵 / 스펙트로그램 등)를 계산하지 않는다
+    products = wire_format.parse_products(websocket.query_params.get("products"))
+    await websocket.accept(subprotocol=subprotocol)
+    print(f"🔌 [{device.name}] 클라이언트 연결됨 (format={fmt}, rate={rate or 'max'}, "
+          f"products={','.join(sorted(products))})")
+
+    # 프레임은 장치의 BroadcastHub 가 한 번만 처리/직렬화 → 여기서는 받아서 보내기만
+    sub = device.hub.subscribe(fmt, rate, products)
+    send_time = metrics.REGISTRY.histogram(
+        "radar_send_seconds", "WebSocket 전송 시간 (초, 네트워크 backpressure 포함)",
+        device=device.name, format=fmt)
 
     try:
         while True:
-            if current_radar:
-                try:
-                    result = current_radar.process_frame()
-
-                    if result:
-                        result["current_mode"] = current_mode
-
-                        # CW → probability 계산
-                        if current_mode == "CW":
-                            score = result.get("score", 0)
-                            max_score = result.get("max_score", 20)
-                            result["probability"] = min((score / max_score) * 100, 100)
-
-                        # FMCW → ratio 변환
-                        elif current_mode == "FMCW":
-                            ratio = result.get("ratio", 0)
-                            result["probability"] = min(ratio * 100, 100)
-
-                        await websocket.send_text(json.dumps(result))
+            seq, payload = await sub.get()
+            t0 = time.perf_counter()
+            if isinstance(payload, bytes):
+                await websocket.send_bytes(payload)
+            else:
+                await websocket.send_text(payload)
+            t1 = time.perf_counter()
+            send_time.observe(t1 - t0)
+            if TRACER.enabled:
+                TRACER.record("send", t0, t1, device=device.name, seq=seq)
 
-                    else:
-                        await asyncio.sleep(0.05)
+    except WebSocketDisconnect:
+        print(f"🔌 [{device.name}] 연결 끊김 (보냄 {sub.delivered}, 밀려서 버림 {sub.dropped}, "
+              f"주기 맞추느라 건너뜀 {sub.skipped})")
+    except Exception:
+        pass
+    finally:
+        device.hub.unsubscribe(sub)
 
-                except Exception:
-                    await asyncio.sleep(0.1)
 
-            else:
-                await asyncio.sleep(0.5)
+@app.websocket("/ws")
+async def websocket_endpoint(websocket: WebSocket):
+    await stream(websocket, devices.default)
 
-            await asyncio.sleep(0.03)
 
-    except WebSocketDisconnect:
-        print("🔌 연결 끊김")
-    except Exception:
-        pass
\ No newline at end of file
+@app.websocket("/ws/{device}")
+async def device_websocket_endpoint(websocket: WebSocket, device: str):
+    await stream(websocket, find_device(device))
@@ -0,0 +1,319 @@
+"""
+WebSocket 프레임 직렬화 (JSON / 바이너리)
+
+바이너리 프레임 구조 (little-endian)
+    [고정 헤더 HEADER.size 바이트][signal 배열][확장 블록 x n_blocks]
+
+    헤더 필드
+        magic       4s   b"RDRF"
+        version     B    WIRE_VERSION
+        mode        B    0=CW, 1=FMCW, 255=알 수 없음
+        dtype       B    0=float32, 1=uint8 (양자화)
+        flags       B    bit0 = is_detected
+        seq         I    rx 버퍼 번호 (누락된 버퍼만큼 건너뜀, 없으면 서버 프레임 번호)
+        timestamp   d    UNIX 시각 (초)
+        score       f    CW 점수
+        ratio       f    FMCW 게이지 비율 (0~1)
+        peak        f    FMCW peak_val / CW diff
+        probability f    0~100
+        peak_idx    i    FMCW 피크 bin (없으면 -1)
+        n           I    signal 원소 수
+        lo, hi      f f  uint8 역양자화 범위 (x = lo + q * (hi - lo) / 255)
+        n_blocks    H    뒤에 붙는 확장 블록 수
+        capture     d    rx 버퍼 캡처 UNIX 시각 (추정, 없으면 0)
+        dropped     I    누락(overrun 추정) + 버린 rx 버퍼 수 (누적)
+        overruns    I    하드웨어 버퍼가 넘친 횟수 (누적, 추정)
+
+    확장 블록 ([BLOCK 헤더][rows x cols 배열])
+        tag         2s   b"DT" = CFAR 검출 목록 (float32, 행마다 [bin, snr_db, velocity])
+                         b"RD" = range-Doppler 맵 dB ([doppler, range], u8 포맷이면 양자화)
+                         b"AC" = 활동 분류 ([[class index, confidence]], ACTIVITY_CLASSES 순서)
+                         b"SP" = 마이크로 도플러 스펙트로그램 열 dB ([1, chirp 수], fftshift 순서)
+                         DT velocity: m/s, +: 접근 / -: 멀어짐, NaN = 속도 없음 (정지 / 불확실)
+        dtype       B    0=float32, 1=uint8
+        rows, cols  I I  배열 크기
+        lo, hi      f f  uint8 역양자화 범위
+
+클라이언트는 ws://.../ws?format=f32 (또는 u8 / json) 로 선택하거나
+Sec-WebSocket-Protocol 에 "radar.f32" / "radar.u8" 를 넣어 협상한다.
+아무것도 지정하지 않으면 기존과 같은 JSON 텍스트를 받는다.
+
+?products=scalars,range_profile 처럼 필요한 데이터(PRODUCTS)만 고를 수 있다.
+scalars(감지 여부 / 점수 / seq 등 헤더 값)는 항상 포함, 지정하지 않으면 전부.
+고르지 않은 배열은 바이너리에서는 n=0 / 블록 생략, JSON 에서는 키가 빠진다.
+"""
+import json
+import struct
+
+import numpy as np
+
+WIRE_MAGIC = b"RDRF"
+WIRE_VERSION = 2
+
+HEADER = struct.Struct("<4sBBBBIdffffiIffH2xdII")
+BLOCK = struct.Struct("<2sBxIIff")
+
+BLOCK_DETECTIONS = b"DT"
+BLOCK_RD_MAP = b"RD"
+BLOCK_ACTIVITY = b"AC"
+BLOCK_SPECTROGRAM = b"SP"
+
+ACTIVITY_CLASSES = ("Walking", "Standing")
+
+FORMAT_JSON = "json"
+FORMAT_F32 = "f32"
+FORMAT_U8 = "u8"
+FORMATS = (FORMAT_JSON, FORMAT_F32, FORMAT_U8)
+
+SUBPROTOCOL_PREFIX = "radar."
+
+MODE_CODES = {"CW": 0, "FMCW": 1}
+MODE_NAMES = {v: k for k, v in MODE_CODES.items()}
+DTYPE_F32 = 0
+DTYPE_U8 = 1
+
+FLAG_DETECTED = 0x01
+
+# 클라이언트가 구독할 수 있는 데이터 (signal 배열은 모드에 따라 range_profile / cw_envelope)
+PRODUCTS = ("scalars", "range_profile", "cw_envelope", "detections", "rd_map",
+            "activity", "spectrogram")
+ALL_PRODUCTS = frozenset(PRODUCTS)
+SCALARS = frozenset(("scalars",))
+
+# product → 프레임 dict 키 (signal 은 모드별로 따로 처리)
+PRODUCT_KEYS = {
+    "detections": ("detections",),
+    "rd_map": ("rd_map", "velocity_res"),
+    "activity": ("activity", "activity_confidence"),
+    "spectrogram": ("spectrogram",),
+}
+SIGNAL_PRODUCTS = {"FMCW": "range_profile", "CW": "cw_envelope"}
+
+
+# ------------------------------------------------------
+# 협상
+# ------------------------------------------------------
+def negotiate(query_format: str = None, subprotocols=()):
+    """
+    (format, 수락할 subprotocol) 반환
+    - 쿼리 파라미터가 우선, 그다음 subprotocol, 기본은 JSON
+    """
+    if query_format:
+        fmt = query_format.lower()
+        if fmt in FORMATS:
+            return fmt, None
+
+    for proto in subprotocols or ():
+        if proto.startswith(SUBPROTOCOL_PREFIX):
+            fmt = proto[len(SUBPROTOCOL_PREFIX):].lower()
+            if fmt in FORMATS:
+                return fmt, proto
+
+    return FORMAT_JSON, None
+
+
+def parse_products(value: str = None) -> frozenset:
+    """"scalars,rd_map" → frozenset (없으면 전부, 모르는 이름은 무시, scalars 는 항상)"""
+    if not value:
+        return ALL_PRODUCTS
+    names = {name.strip().lower() for name in value.split(",")}
+    return frozenset(names & ALL_PRODUCTS) | SCALARS
+
+
+def select(frame: dict, products: frozenset) -> dict:
+    """구독한 product 만 남긴 프레임 (전부 구독이면 원본 그대로)"""
+    if products >= ALL_PRODUCTS:
+        return frame
+    drop = set()
+    for product, keys in PRODUCT_KEYS.items():
+        if product not in products:
+            drop.update(keys)
+    mode = frame.get("current_mode", frame.get("mode"))
+    if SIGNAL_PRODUCTS.get(mode) not in products:
+        drop.add("signal")
+    return {k: v for k, v in frame.items() if k not in drop}
+
+
+# ------------------------------------------------------
+# 인코딩
+# ------------------------------------------------------
+def _json_default(obj):
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def encode_json(frame: dict) -> str:
+    return json.dumps(frame, default=_json_default)
+
+
+def quantize_u8(values: np.ndarray):
+    """float 배열 → (uint8 배열, lo, hi)"""
+    if values.size == 0:
+        return np.zeros(0, dtype=np.uint8), 0.0, 0.0
+    lo = float(values.min())
+    hi = float(values.max())
+    span = hi - lo
+    if span <= 0:
+        return np.zeros(values.shape, dtype=np.uint8), lo, hi
+    q = (values - lo) * (255.0 / span)
+    return np.rint(q, out=q).astype(np.uint8), lo, hi
+
+
+def encode_binary(frame: dict, seq: int, fmt: str = FORMAT_F32, blocks=()) -> bytes:
+    signal = frame.get("signal")
+    if signal is None:
+        values = np.zeros(0, dtype=np.float32)
+    else:
+        values = np.asarray(signal, dtype=np.float32).ravel()
+
+    if fmt == FORMAT_U8:
+        body, lo, hi = quantize_u8(values)
+        dtype = DTYPE_U8
+    else:
+        body, lo, hi = values, 0.0, 0.0
+        dtype = DTYPE_F32
+
+    flags = FLAG_DETECTED if frame.get("is_detected") else 0
+    peak = frame.get("peak_val", frame.get("diff", 0.0))
+    peak_idx = frame.get("peak_idx", -1)
+
+    header = HEADER.pack(
+        WIRE_MAGIC,
+        WIRE_VERSION,
+        MODE_CODES.get(frame.get("current_mode", frame.get("mode")), 255),
+        dtype,
+        flags,
+        int(frame.get("seq", seq)) & 0xFFFFFFFF,
+        float(frame.get("timestamp", 0.0)),
+        float(frame.get("score", 0.0)),
+        float(frame.get("ratio", 0.0)),
+        float(peak),
+        float(frame.get("probability", 0.0)),
+        int(peak_idx),
+        body.size,
+        lo,
+        hi,
+        len(blocks),
+        float(frame.get("capture_time", 0.0)),
+        int(frame.get("dropped", 0)) & 0xFFFFFFFF,
+        int(frame.get("overruns", 0)) & 0xFFFFFFFF,
+    )
+    return b"".join([header, body.tobytes(), *blocks])
+
+
+def encode_block(tag: bytes, values: np.ndarray, fmt: str = FORMAT_F32) -> bytes:
+    """2차원 배열 → 확장 블록 (u8 포맷이면 양자화)"""
+    values = np.asarray(values, dtype=np.float32)
+    if values.ndim == 1:
+        values = values[:, None]
+    rows, cols = values.shape
+    if fmt == FORMAT_U8:
+        body, lo, hi = quantize_u8(values)
+        dtype = DTYPE_U8
+    else:
+        body, lo, hi = values, 0.0, 0.0
+        dtype = DTYPE_F32
+    return BLOCK.pack(tag, dtype, rows, cols, lo, hi) + body.tobytes()
+
+
+def frame_blocks(frame: dict, fmt: str = FORMAT_F32) -> list:
+    """프레임의 부가 데이터 → 확장 블록 목록"""
+    blocks = []
+    detections = frame.get("detections")
+    if detections:
+        # 검출 목록은 bin 번호가 깨지지 않도록 항상 float32
+        # (속도가 없는 검출은 NaN)
+        table = [[d["bin"], d["snr_db"], d.get("velocity", np.nan)] for d in detections]
+        blocks.append(encode_block(BLOCK_DETECTIONS, table, FORMAT_F32))
+    activity = frame.get("activity")
+    if activity in ACTIVITY_CLASSES:
+        row = [[ACTIVITY_CLASSES.index(activity), frame.get("activity_confidence", 0.0)]]
+        blocks.append(encode_block(BLOCK_ACTIVITY, row, FORMAT_F32))
+    rd_map = frame.get("rd_map")
+    if rd_map is not None:
+        blocks.append(encode_block(BLOCK_RD_MAP, rd_map, fmt))
+    spectrogram = frame.get("spectrogram")
+    if spectrogram is not None:
+        blocks.append(encode_block(BLOCK_SPECTROGRAM, np.asarray(spectrogram)[None, :], fmt))
+    return blocks
+
+
+def encode(frame: dict, seq: int, fmt: str):
+    """format 에 맞춰 str(JSON) 또는 bytes(바이너리) 반환"""
+    if fmt == FORMAT_JSON:
+        return encode_json(frame)
+    return encode_binary(frame, seq, fmt, blocks=frame_blocks(frame, fmt))
+
+
+# ------------------------------------------------------
+# 디코딩 (파이썬 클라이언트 / 디버깅용)
+# ------------------------------------------------------
+def decode_binary(data: bytes) -> dict:
+    fields = HEADER.unpack_from(data, 0)
+    (magic, version, mode, dtype, flags, seq, timestamp, score, ratio,
+     peak, probability, peak_idx, n, lo, hi, n_blocks,
+     capture_time, dropped, overruns) = fields
+
+    if magic != WIRE_MAGIC:
+        raise ValueError("not a radar frame")
+
+    offset = HEADER.size
+    if dtype == DTYPE_U8:
+        q = np.frombuffer(data, dtype=np.uint8, count=n, offset=offset)
+        offset += n
+        signal = lo + q.astype(np.float32) * ((hi - lo) / 255.0)
+    else:
+        signal = np.frombuffer(data, dtype=np.float32, count=n, offset=offset)
+        offset += 4 * n
+
+    blocks = {}
+    for _ in range(n_blocks):
+        tag, b_dtype, rows, cols, b_lo, b_hi = BLOCK.unpack_from(data, offset)
+        offset += BLOCK.size
+        count = rows * cols
+        if b_dtype == DTYPE_U8:
+            q = np.frombuffer(data, dtype=np.uint8, count=count, offset=offset)
+            offset += count
+            values = b_lo + q.astype(np.float32) * ((b_hi - b_lo) / 255.0)
+        else:
+            values = np.frombuffer(data, dtype=np.float32, count=count, offset=offset)
+            offset += 4 * count
+        blocks[tag.decode("ascii")] = values.reshape(rows, cols)
+
+    frame = {
+        "version": version,
+        "current_mode": MODE_NAMES.get(mode),
+        "seq": seq,
+        "timestamp": timestamp,
+        "capture_time": capture_time,
+        "dropped": dropped,
+        "overruns": overruns,
+        "score": score,
+        "ratio": ratio,
+        "peak_val": peak,
+        "probability": probability,
+        "is_detected": bool(flags & FLAG_DETECTED),
+        "peak_idx": peak_idx,
+        "signal": signal,
+        "n_blocks": n_blocks,
+        "blocks": blocks,
+    }
+    if "DT" in blocks:
+        frame["detections"] = []
+        for b, snr, velocity in blocks["DT"]:
+            det = {"bin": int(b), "snr_db": float(snr)}
+            if not np.isnan(velocity):
+                det["velocity"] = float(velocity)
+            frame["detections"].append(det)
+    if "AC" in blocks:
+        index, confidence = blocks["AC"][0]
+        frame["activity"] = ACTIVITY_CLASSES[int(index)]
+        frame["activity_confidence"] = float(confidence)
+    if "RD" in blocks:
+        frame["rd_map"] = blocks["RD"]
+    if "SP" in blocks:
+        frame["spectrogram"] = blocks["SP"][0]
+    return frame
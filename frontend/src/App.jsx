@@ -16,7 +16,8 @@ import './App.css'
 // 젯슨 IP
 const JETSON_IP = "10.204.220.59"; 
 const API_URL = `http://${JETSON_IP}:8000`;
-const WS_URL = `ws://${JETSON_IP}:8000/ws`;
+// 화면 갱신은 30 Hz 면 충분 → 서버가 그 이상 프레임은 최신 것만 남기고 건너뜀
+const WS_URL = `ws://${JETSON_IP}:8000/ws?rate=30`;
 
 ChartJS.register(CategoryScale, LinearScale, PointElement, LineElement, BarElement, Title, Tooltip, Filler);
 
@@ -110,6 +111,8 @@ function RangeDopplerCanvas({ rdMap }) {
 function App() {
   const [currentMode, setCurrentMode] = useState("CW");
   const [radarData, setRadarData] = useState(null);
+  const [rdMapLatest, setRdMapLatest] = useState(null); // RD 맵은 일부 프레임에만 포함됨
+  const [calibration, setCalibration] = useState(null);   // 서버 캘리브레이션 진행 상황
   const [cwHistory, setCwHistory] = useState(new Array(300).fill(0)); 
   const [isConnected, setIsConnected] = useState(false);
   const [connectionError, setConnectionError] = useState("");
@@ -117,6 +120,16 @@ function App() {
   const ws = useRef(null);
   const lastUpdateRef = useRef(0); // 프론트 업데이트 throttle 용
 
+  // 수동 재캘리브레이션 (진행률은 WebSocket 이벤트로 수신)
+  const recalibrate = async () => {
+    try {
+      const response = await fetch(`${API_URL}/recalibrate`, { method: 'POST' });
+      console.log("Recalibrate:", await response.json());
+    } catch (e) {
+      console.error("Recalibrate failed:", e);
+    }
+  };
+
   // 모드 변경 함수
   const changeMode = async (mode) => {
     if (mode === currentMode) return;
@@ -136,6 +149,7 @@ function App() {
         setCwHistory(new Array(300).fill(0));
       }
       setRadarData(null);
+      setRdMapLatest(null);
     } catch (e) {
       console.error("Mode change failed:", e);
       alert(`모드 변경 실패!\n서버 주소(${API_URL})에 연결할 수 없습니다.`);
@@ -159,6 +173,12 @@ function App() {
         try {
           const data = JSON.parse(event.data);
 
+          // 상태 이벤트 (프레임 아님)
+          if (data.type === "calibration") {
+            setCalibration(data);
+            return;
+          }
+
           // 서버 모드와 동기화
           if (data.current_mode && data.current_mode !== currentMode) {
             setCurrentMode(data.current_mode);
@@ -170,6 +190,11 @@ function App() {
             setCwHistory(prev => [...prev.slice(1), val]);
           }
 
+          // RD 맵은 서버가 낮은 주기로만 보내므로 throttle 과 무관하게 마지막 값을 유지
+          if (Array.isArray(data.rd_map) && data.rd_map.length > 0) {
+            setRdMapLatest(data.rd_map);
+          }
+
           // 렌더링 부하 줄이기 위해 상태 업데이트는 최대 10~12 FPS로 제한
           const now = performance.now();
           if (now - lastUpdateRef.current > 80) { // 80ms 이상일 때만
@@ -310,12 +335,7 @@ function App() {
   };
 
   // ---------------- Range–Doppler 맵 ----------------
-  const rdMap =
-    currentMode === "FMCW" &&
-    Array.isArray(radarData?.rd_map) &&
-    radarData.rd_map.length > 0
-      ? radarData.rd_map
-      : null;
+  const rdMap = currentMode === "FMCW" ? rdMapLatest : null;
 
   // ---------------- 공통 표시용 값 ----------------
   const isDet = radarData?.is_detected || false;
@@ -347,6 +367,12 @@ function App() {
           >
             FMCW MODE
           </button>
+          <button
+            onClick={recalibrate}
+            disabled={calibration?.state === "running"}
+          >
+            RECALIBRATE
+          </button>
         </div>
       </header>
 
@@ -362,6 +388,18 @@ function App() {
         </div>
       )}
 
+      {calibration?.state === "running" && (
+        <div style={{
+          backgroundColor: '#333',
+          color: '#00ffff',
+          padding: '6px',
+          width: '100%',
+          textAlign: 'center'
+        }}>
+          ⏳ 배경 학습 중 ({calibration.mode}) {Math.round((calibration.progress || 0) * 100)}%
+        </div>
+      )}
+
       <main>
         <div className="chart-container">
           {currentMode === "CW" ? (
@@ -409,6 +447,14 @@ function App() {
               />
             </div>
           </div>
+          {currentMode === "FMCW" && radarData?.activity && (
+            <div className="metric">
+              <span className="label">Activity</span>
+              <span className="value" style={{ color: '#00ffff' }}>
+                {radarData.activity} ({Math.round((radarData.activity_confidence || 0) * 100)}%)
+              </span>
+            </div>
+          )}
         </div>
       </main>
     </div>
@@ -1,12 +1,18 @@
-import adi
-import numpy as np
+import os
 import sys
+import numpy as np
 import time
 
+# fmcw 패키지 경로 (backend/) — "sim:" URI 또는 pyadi-iio 미설치 시 시뮬레이터 사용
+backend_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend")
+if backend_dir not in sys.path:
+    sys.path.append(backend_dir)
+from fmcw.pluto_iface import open_pluto
+
 # ==========================================
 # 1. 설정 (튜닝 영역)
 # ==========================================
-SDR_IP = "ip:192.168.2.1"
+SDR_IP = os.environ.get("PLUTO_URI", "ip:192.168.2.1")
 
 # [하드웨어 설정]
 SAMPLE_RATE = 2000000   # 2MHz
@@ -35,7 +41,7 @@ NUM_CHIRPS = 128
 # ==========================================
 print(f">>> PlutoSDR({SDR_IP}) 연결 중...")
 try:
-    sdr = adi.Pluto(SDR_IP)
+    sdr = open_pluto(SDR_IP)
 except Exception as e:
     print("❌ 연결 실패. IP나 케이블을 확인하세요.")
     sys.exit()